@@ -1,14 +1,33 @@
 // SearchResults class
+// With a search-index attribute (URL of the folder written by posts-to-webflow-csv.py --search-index),
+// the ?query= is also run against that prebuilt index: only meta.json, the term shards for the query's
+// words and the doc shards of the top hits are fetched, and the hits are listed in
+// .posts-search-index-results (created after the title if the page has none).
+const INDEX_RESULTS = 20;
+
+function indexTerms(text, tokenizer) {
+    const stopwords = new Set(tokenizer.stopwords);
+    const words = text.toLowerCase().normalize("NFKD").replace(/\p{M}/gu, "").match(/[\p{L}\p{N}]+/gu) || [];
+    return words.filter((word) => word.length >= tokenizer.min_length && !stopwords.has(word));
+}
+
+function shardKey(term) {
+    return /^[a-z0-9]/.test(term) ? term[0] : "_";
+}
+
 export class SearchResults {
     constructor(element) {
         this.element = element;
         this.elements();
         this.create();
+        this.searchIndex();
     }
 
     elements() {
         this.title = this.element.querySelector(".posts-search-title");
         this.posts = this.element.querySelectorAll(".posts-search-list");
+        this.indexUrl = this.element.getAttribute("search-index");
+        this.postPath = this.element.getAttribute("search-post-path") || "/post/";
     }
 
     create() {
@@ -17,12 +36,99 @@ export class SearchResults {
             const postSearchTerm = document.createElement("span");
             postSearchTerm.classList.add("post-search-term");
             postSearchTerm.innerHTML = window.location.search.split("?query=")[1];
-            this.title.insertAdjacentElement("beforeend", postSearchTerm);   
+            this.title.insertAdjacentElement("beforeend", postSearchTerm);
         }
         // Create a (n) with the number of posts found
         const postCount = document.createElement("span");
         postCount.classList.add("post-count");
         postCount.innerHTML = ` (${this.posts.length})`;
         this.title.insertAdjacentElement("beforeend", postCount);
+        this.postCount = postCount;
+    }
+
+    fetchIndexFile(name) {
+        return fetch(this.indexUrl.replace(/\/?$/, "/") + name).then((response) => {
+            if (!response.ok) throw new Error(`${name}: HTTP ${response.status}`);
+            return response.json();
+        });
+    }
+
+    async searchIndex() {
+        const query = new URLSearchParams(window.location.search).get("query");
+        if (!this.indexUrl || !query) return;
+        try {
+            const meta = await this.fetchIndexFile("meta.json");
+            const terms = [...new Set(indexTerms(query, meta.tokenizer))];
+            if (!terms.length) return;
+
+            const keys = [...new Set(terms.map(shardKey))].filter((key) => meta.term_shards.includes(key));
+            const shards = Object.fromEntries(
+                await Promise.all(keys.map(async (key) => [key, await this.fetchIndexFile(`terms-${key}.json`)]))
+            );
+
+            // Every query word must match; a word also matches longer terms it starts ("speec" -> "speech")
+            let scores = null;
+            for (const term of terms) {
+                const termScores = new Map();
+                for (const [indexed, postings] of Object.entries(shards[shardKey(term)] || {})) {
+                    if (!indexed.startsWith(term)) continue;
+                    const factor = indexed === term ? 1 : 0.5;
+                    let doc = 0;
+                    for (let i = 0; i < postings.length; i += 2) {
+                        doc += postings[i];
+                        termScores.set(doc, Math.max(termScores.get(doc) || 0, postings[i + 1] * factor));
+                    }
+                }
+                if (scores === null) {
+                    scores = termScores;
+                } else {
+                    for (const [doc, score] of scores) {
+                        if (termScores.has(doc)) scores.set(doc, score + termScores.get(doc));
+                        else scores.delete(doc);
+                    }
+                }
+            }
+
+            const hits = [...scores].sort((a, b) => b[1] - a[1] || a[0] - b[0]).slice(0, INDEX_RESULTS);
+            const shardOf = (doc) => Math.floor(doc / meta.doc_shard_size);
+            const docShardIds = [...new Set(hits.map(([doc]) => shardOf(doc)))];
+            const docShards = new Map(
+                await Promise.all(
+                    docShardIds.map(async (id) => [
+                        id,
+                        await this.fetchIndexFile(`docs-${String(id).padStart(4, "0")}.json`),
+                    ])
+                )
+            );
+            const docs = hits.map(([doc]) => docShards.get(shardOf(doc))[doc % meta.doc_shard_size]);
+            this.render(docs, scores.size);
+        } catch (error) {
+            console.warn("Search index unavailable:", error);
+        }
+    }
+
+    render(docs, total) {
+        let list = this.element.querySelector(".posts-search-index-results");
+        if (!list) {
+            list = document.createElement("ul");
+            list.classList.add("posts-search-index-results");
+            this.title.insertAdjacentElement("afterend", list);
+        }
+        list.replaceChildren(
+            ...docs.map(([slug, title, summary]) => {
+                const item = document.createElement("li");
+                const link = document.createElement("a");
+                link.href = this.postPath + slug;
+                link.textContent = title;
+                item.append(link);
+                if (summary) {
+                    const text = document.createElement("p");
+                    text.textContent = summary;
+                    item.append(text);
+                }
+                return item;
+            })
+        );
+        this.postCount.textContent = ` (${total})`;
     }
 }
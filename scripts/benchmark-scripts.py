@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""Benchmark the export scripts and the posts transforms on synthetic exports; save and compare results.
+
+For each size, a synthetic export is generated once (cached under --bench-dir/data). Then:
+- each script runs in its own process, recording wall time, posts/s, MB/s and peak RSS;
+- each transform in posts-to-webflow-csv.py runs in this process on up to --transform-sample Content
+  values, recording posts/s, MB/s and the largest per-call tracemalloc peak.
+Results are written to --bench-dir/results/<time>-<label>.json and compared with the previous file there.
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import compressed
+import wp_export
+
+generator = wp_export.load_script("generate-synthetic-export")
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+DEFAULT_BENCH_DIR = os.path.join(PROJECT_DIR, "benchmarks")
+
+# Script -> argv given (input CSV, scratch folder). Scripts that only rewrite in place get a copy.
+SCRIPTS = {
+    "posts-to-webflow-csv": lambda src, work: ["--input", src, "-o", os.path.join(work, "blog.csv")],
+    "authors-to-webflow-csv": lambda src, work: ["--input", src, "-o", os.path.join(work, "authors.csv")],
+    "categories-to-webflow-csv": lambda src, work: ["--input", src, "-o", os.path.join(work, "categories.csv")],
+    "export-to-webflow-csvs": lambda src, work: ["--input", src, "--output-dir", work],
+    "replace-font-headings-in-csv": lambda src, work: [os.path.join(work, "in-place.csv")],
+    "clean-ugly-html-csv": lambda src, work: [src, "-o", os.path.join(work, "cleaned.csv")],
+    "strong-to-h4-csv": lambda src, work: [src, "-o", os.path.join(work, "cleaned.csv")],
+    "wrap-loose-paragraphs-in-csv": lambda src, work: [src, "-o", os.path.join(work, "cleaned.csv")],
+    "run-migration-pipeline": lambda src, work: [src, "-o", os.path.join(work, "pipeline.csv")],
+}
+IN_PLACE_SCRIPTS = {"replace-font-headings-in-csv"}
+
+# Transforms in posts-to-webflow-csv.py that take the raw Content value
+TRANSFORMS = [
+    "first_image_url_from_html",
+    "strip_first_image",
+    "convert_font_size_to_headings",
+    "ensure_html_paragraphs",
+    "fix_paragraphs_ending_with_br",
+    "close_unclosed_paragraphs",
+    "balance_paragraphs",
+    "convert_text_align_center_to_class",
+    "strip_strong_from_headings",
+    "remove_leading_br_in_post_body",
+    "compact_post_body",
+    "strip_all_html",
+]
+
+# Runs a script as __main__ in a child process, then reports that process's peak RSS on stderr
+_RUNNER = """
+import os, runpy, sys
+path = sys.argv[1]
+sys.argv = sys.argv[1:]
+sys.path.insert(0, os.path.dirname(os.path.abspath(path)))
+try:
+    runpy.run_path(path, run_name="__main__")
+finally:
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak_mb = peak / 1e6 if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        peak_mb = None
+    sys.stderr.write(f"\\nPEAK_RSS_MB {peak_mb}\\n")
+"""
+
+
+def export_path(bench_dir, posts, seed):
+    """Generate (once) and return the synthetic export for this size and seed."""
+    path = os.path.join(bench_dir, "data", f"export-{posts}-seed{seed}.csv")
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        print(f"Generating {posts} posts -> {path}")
+        tmp_path = path + ".tmp"
+        generator.write_export(tmp_path, posts, seed=seed)
+        os.replace(tmp_path, path)
+    return path
+
+
+def _rates(posts, nbytes, seconds):
+    return {
+        "seconds": round(seconds, 4),
+        "posts_per_s": round(posts / seconds, 1) if seconds else None,
+        "mb_per_s": round(nbytes / 1e6 / seconds, 3) if seconds else None,
+    }
+
+
+def bench_script(name, src, posts, nbytes, work):
+    """Run one script on src in a child process; return its timing and peak memory."""
+    if os.path.isdir(work):
+        shutil.rmtree(work)
+    os.makedirs(work)
+    if name in IN_PLACE_SCRIPTS:
+        shutil.copyfile(src, os.path.join(work, "in-place.csv"))
+    script = os.path.join(SCRIPT_DIR, name + ".py")
+    cmd = [sys.executable, "-c", _RUNNER, script] + SCRIPTS[name](src, work)
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    seconds = time.perf_counter() - start
+    peak_mb = None
+    for line in proc.stderr.splitlines():
+        if line.startswith("PEAK_RSS_MB "):
+            value = line.split(" ", 1)[1]
+            peak_mb = None if value == "None" else round(float(value), 1)
+    result = _rates(posts, nbytes, seconds)
+    result["peak_rss_mb"] = peak_mb
+    if proc.returncode != 0:
+        result["error"] = proc.stderr.strip().splitlines()[-2:] or [f"exit {proc.returncode}"]
+    return result
+
+
+def bench_transforms(src, sample):
+    """Time each posts transform (and the full row conversion) on the first `sample` rows of src."""
+    posts = wp_export.load_script("posts-to-webflow-csv")
+    with compressed.open_text(src) as f_in:
+        rows = [row for _, row in zip(range(sample), csv.DictReader(f_in))]
+    contents = [row.get("Content", "") for row in rows]
+    nbytes = sum(len(c.encode("utf-8")) for c in contents)
+
+    cases = [(name, getattr(posts, name), contents) for name in TRANSFORMS]
+    cases.append(("post_body.rewrite (full chain)", posts.post_body.rewrite, contents))
+    cases.append(("convert_row", posts.convert_row, rows))
+
+    results = {}
+    for name, func, inputs in cases:
+        start = time.perf_counter()
+        for value in inputs:
+            func(value)
+        result = _rates(len(inputs), nbytes, time.perf_counter() - start)
+
+        # Separate pass: tracemalloc slows everything down, so it must not be in the timed loop
+        peak = 0
+        tracemalloc.start()
+        try:
+            for value in inputs:
+                tracemalloc.reset_peak()
+                func(value)
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+        result["peak_call_mb"] = round(peak / 1e6, 2)
+        results[name] = result
+    return results
+
+
+def git_label():
+    """Short commit hash of the working tree, or "unversioned"."""
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip() or "unversioned"
+    except (OSError, subprocess.CalledProcessError):
+        return "unversioned"
+
+
+def previous_results(results_dir, exclude):
+    names = sorted(n for n in os.listdir(results_dir) if n.endswith(".json") and n != os.path.basename(exclude))
+    if not names:
+        return None, None
+    path = os.path.join(results_dir, names[-1])
+    with open(path, "r", encoding="utf-8") as f:
+        return path, json.load(f)
+
+
+def _change(new, old):
+    if not new or not old:
+        return ""
+    pct = 100 * (new - old) / old
+    flag = "  <-- slower" if pct <= -10 else ""
+    return f"{pct:+.0f}%{flag}"
+
+
+def print_report(results, previous):
+    for size, data in results["sizes"].items():
+        print(f"\n{size} posts ({data['mb']:.1f} MB)")
+        for section in ("scripts", "transforms"):
+            if not data[section]:
+                continue
+            old_section = ((previous or {}).get("sizes", {}).get(size) or {}).get(section, {})
+            print(f"  {section}:")
+            for name, r in data[section].items():
+                memory = r.get("peak_rss_mb", r.get("peak_call_mb"))
+                old = old_section.get(name, {}).get("posts_per_s")
+                error = f"  FAILED: {' / '.join(r['error'])}" if r.get("error") else ""
+                print(
+                    f"    {name:36} {r['posts_per_s'] or 0:>10.1f} posts/s {r['mb_per_s'] or 0:>8.2f} MB/s "
+                    f"{memory if memory is not None else '?':>8} MB  {_change(r['posts_per_s'], old)}{error}"
+                )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--sizes", default="1k,10k", help="comma-separated post counts (default 1k,10k; e.g. 1k,10k,100k,1M)"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--bench-dir", default=DEFAULT_BENCH_DIR, help=f"data and results folder (default {DEFAULT_BENCH_DIR})"
+    )
+    parser.add_argument("--scripts", help=f"comma-separated subset of: {', '.join(SCRIPTS)}")
+    parser.add_argument("--transform-sample", type=int, default=2000, help="rows per size for transform timings")
+    parser.add_argument("--no-transforms", action="store_true", help="skip the per-transform timings")
+    parser.add_argument("--label", help="name for this run in the results file (default: git short hash)")
+    args = parser.parse_args(argv)
+
+    scripts = [s.strip() for s in args.scripts.split(",")] if args.scripts else list(SCRIPTS)
+    unknown = [s for s in scripts if s not in SCRIPTS]
+    if unknown:
+        parser.error(f"unknown script(s): {', '.join(unknown)}")
+
+    label = args.label or git_label()
+    results = {
+        "label": label,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "sizes": {},
+    }
+    work = os.path.join(args.bench_dir, "work")
+    for size in args.sizes.split(","):
+        posts = generator.parse_count(size)
+        src = export_path(args.bench_dir, posts, args.seed)
+        nbytes = os.path.getsize(src)
+        data = {"posts": posts, "mb": round(nbytes / 1e6, 2), "scripts": {}, "transforms": {}}
+        for name in scripts:
+            print(f"[{size}] {name} ...", flush=True)
+            data["scripts"][name] = bench_script(name, src, posts, nbytes, work)
+        if not args.no_transforms:
+            print(f"[{size}] transforms ...", flush=True)
+            data["transforms"] = bench_transforms(src, args.transform_sample)
+        results["sizes"][str(posts)] = data
+    shutil.rmtree(work, ignore_errors=True)
+
+    results_dir = os.path.join(args.bench_dir, "results")
+    os.makedirs(results_dir, exist_ok=True)
+    out_path = os.path.join(results_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{label}.json")
+    previous_path, previous = previous_results(results_dir, out_path)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    print_report(results, previous)
+    if previous_path:
+        print(f"\nChanges are posts/s against {previous_path}")
+    print(f"Saved {out_path}")
+
+
+if __name__ == "__main__":
+    main()
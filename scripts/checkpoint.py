@@ -0,0 +1,254 @@
+"""Progress journal that lets an interrupted conversion pick up where it stopped (--resume).
+
+Checkpointing is opt-in: a run given --checkpoint-every ROWS builds its output in <output>.partial. Every
+ROWS input rows it flushes
+and fsyncs that file, then appends one JSON line to <output>.journal: rows handled, the input byte offset
+just past the last of them, the output size and any state the script needs to carry on (counters, slug
+assignments). --resume truncates the partial output to the last checkpoint, seeks the input to the
+recorded offset and appends from there (checkpointing every DEFAULT_EVERY rows unless told otherwise), so
+the finished file, renamed over the output as with wp_export.atomic_write, is byte-identical to an
+uninterrupted run. Runs without either option write their output directly, as before.
+
+The journal's first line pins the input (path, size, mtime) and the script/transform version, so a
+journal is never applied to a different input or a changed transform. Compressed output cannot be
+appended byte for byte, and WXR input has no row offsets; such runs are not checkpointed.
+"""
+import contextlib
+import csv
+import json
+import os
+import sys
+from collections import deque
+
+import compressed
+import export_snapshot
+import wp_export
+import wxr
+
+JOURNAL_VERSION = 1
+# Checkpoint interval of a --resume run given no --checkpoint-every
+DEFAULT_EVERY = 1000
+
+
+class ResumeError(Exception):
+    """A run cannot be resumed (no journal, or one written for another input/version)."""
+
+
+def add_checkpoint_arguments(parser):
+    """Add --resume and --checkpoint-every to an argparse parser."""
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue an interrupted run from the last checkpoint in <output>.journal",
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        metavar="ROWS",
+        help="flush the output and record a checkpoint every ROWS input rows, so an interrupted run can be "
+        f"resumed (default: off; {DEFAULT_EVERY} with --resume)",
+    )
+
+
+def unsupported(input_path, output_path):
+    """Why a run from input_path to output_path cannot be checkpointed, or None."""
+    if compressed.codec(output_path):
+        return "compressed output"
+    if wxr.is_wxr(input_path):
+        return "WXR input"
+    return None
+
+
+def journal_for(args, input_path, output_path, identity, reason=None):
+    """The Journal for a run with --resume/--checkpoint-every, or None when it is not checkpointed.
+
+    identity: JSON-able values (script name, transform version) a resumed run must share. reason: the
+    caller's option that rules out checkpointing, if any (e.g. "sharded output"). Raises ResumeError
+    when --resume cannot be honoured.
+    """
+    every = DEFAULT_EVERY if args.checkpoint_every is None and args.resume else args.checkpoint_every
+    reason = reason or unsupported(input_path, output_path)
+    if reason is None and not every:
+        reason = "--checkpoint-every 0"
+    if reason is not None:
+        if args.resume:
+            raise ResumeError(f"Cannot --resume with {reason}")
+        return None
+    return Journal(output_path, input_path, identity, every=every, resume=args.resume)
+
+
+class CsvRecords:
+    """csv.reader over a (possibly compressed) CSV file that knows the byte offset of each record's end.
+
+    .header is the first record. Iteration yields the records after it, or from `offset` (a value of
+    .offset saved earlier) when given; .offset is the position just past the last record yielded.
+    Lines must end in \n or \r\n (not a bare \r).
+    """
+
+    def __init__(self, path, offset=None):
+        self._file = compressed.open_binary(path)
+        self._position = 0
+        self._reader = csv.reader(self._lines())
+        self.header = next(self._reader, None)
+        if offset is not None:
+            self._file.seek(offset)
+            self._position = offset
+        self.offset = self._position
+
+    def _lines(self):
+        # Binary lines, so offsets are exact bytes; UTF-8 never has a newline byte inside a character
+        for line in self._file:
+            self._position += len(line)
+            yield line.decode("utf-8")
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        record = next(self._reader)
+        self.offset = self._position
+        return record
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_records(path, offset=None):
+    """CsvRecords of a CSV, or SnapshotRecords (same offsets) of its export_snapshot when that is current."""
+    snapshot = export_snapshot.current(path)
+    return CsvRecords(path, offset) if snapshot is None else export_snapshot.SnapshotRecords(snapshot, offset)
+
+
+class Journal:
+    """Checkpoints of one run writing output_path from input_path; see the module docstring."""
+
+    def __init__(self, output_path, input_path, identity, every=DEFAULT_EVERY, resume=False):
+        self.output_path = output_path
+        self.input_path = input_path
+        self.partial_path = output_path + ".partial"
+        self.path = output_path + ".journal"
+        self.every = every
+        stat = os.stat(input_path)
+        self.identity = {
+            "journal": JOURNAL_VERSION,
+            "input": os.path.abspath(input_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            **identity,
+        }
+        self.checkpoints = self._load() if resume else []
+        self.rows = self.state.get("rows", 0)
+        self.input = None
+        self._offsets = deque()
+        self._journal = None
+
+    @property
+    def state(self):
+        """The last checkpoint (rows, input_offset, output_offset and the script's own fields), or {}."""
+        return self.checkpoints[-1] if self.checkpoints else {}
+
+    @property
+    def resumed(self):
+        """True when output is appended to a partial file rather than started afresh."""
+        return bool(self.checkpoints)
+
+    def _load(self):
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            raise ResumeError(f"No journal at {self.path} to resume from") from None
+        entries = []
+        valid = 0
+        with f:
+            for line in f:
+                # A line cut short by the interruption ends the journal
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    break
+                valid += len(line)
+        if not entries or entries[0] != self.identity:
+            raise ResumeError(f"{self.path} was written for another input or version; run without --resume")
+        os.truncate(self.path, valid)
+        checkpoints = entries[1:]
+        if checkpoints:
+            size = os.path.getsize(self.partial_path) if os.path.exists(self.partial_path) else -1
+            if size < checkpoints[-1]["output_offset"]:
+                raise ResumeError(f"{self.partial_path} is missing or shorter than its last checkpoint")
+        return checkpoints
+
+    def open_input(self):
+        """open_records() of the input, positioned after the last checkpoint when resuming."""
+        self.input = open_records(self.input_path, self.state.get("input_offset"))
+        return self.input
+
+    def track(self, rows):
+        """Pass through rows drawn from open_input(), noting where each ends for row_done()."""
+        for row in rows:
+            self._offsets.append(self.input.offset)
+            yield row
+
+    def row_done(self, state=None):
+        """Mark the oldest tracked row handled (written, skipped...), checkpointing every `every` rows.
+
+        state: a function returning the script's own fields for the checkpoint, called only then.
+        """
+        offset = self._offsets.popleft()
+        self.rows += 1
+        if self.rows % self.every == 0:
+            self.checkpoint(offset, **(state() if state else {}))
+
+    def checkpoint(self, input_offset, **state):
+        """Make the output so far durable, then record it with the input offset it corresponds to."""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        entry = {
+            "rows": self.rows,
+            "input_offset": input_offset,
+            "output_offset": os.fstat(self.file.fileno()).st_size,
+            **state,
+        }
+        self._journal.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self.checkpoints.append(entry)
+
+    @contextlib.contextmanager
+    def write(self):
+        """Open the partial output (cut back to the last checkpoint when resuming) and yield it.
+
+        When the block succeeds the output is fsynced and renamed over output_path and the journal is
+        removed. Otherwise both are kept for --resume.
+        """
+        if self.resumed:
+            os.truncate(self.partial_path, self.state["output_offset"])
+            self.file = open(self.partial_path, "a", encoding="utf-8", newline="")
+            self._journal = open(self.path, "a", encoding="utf-8")
+        else:
+            self.file = open(self.partial_path, "w", encoding="utf-8", newline="")
+            self._journal = open(self.path, "w", encoding="utf-8")
+            self._journal.write(json.dumps(self.identity, ensure_ascii=False) + "\n")
+            self._journal.flush()
+        try:
+            with self._journal, self.file:
+                yield self.file
+                self.file.flush()
+                os.fsync(self.file.fileno())
+        except BaseException:
+            if self.checkpoints:
+                print(
+                    f"Stopped; {self.state['rows']} rows are checkpointed in {self.path}. "
+                    "Run again with --resume to continue from there.",
+                    file=sys.stderr,
+                )
+            raise
+        wp_export.replace_file(self.partial_path, self.output_path)
+        os.remove(self.path)
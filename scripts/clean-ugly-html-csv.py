@@ -1,17 +1,14 @@
 #!/usr/bin/env python3
 """Clean ugly HTML in WordPress export CSV: trailing br in p, double closes, empty p junk."""
-import csv
 import os
 import re
-import sys
+
+import wp_export
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
 DEFAULT_CSV = os.path.join(PROJECT_DIR, "Posts-Export-2026-February-03-0219.csv")
 
-CONTENT_COL = 2
-EXCERPT_COL = 3
-
 
 def process_field(text):
     if not text or not isinstance(text, str):
@@ -51,30 +48,8 @@ def process_field(text):
     return text
 
 
-def main():
-    input_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CSV
-    input_path = os.path.normpath(input_path)
-
-    with open(input_path, "r", encoding="utf-8", newline="") as f:
-        reader = csv.reader(f)
-        rows = list(reader)
-
-    if not rows or len(rows[0]) <= max(CONTENT_COL, EXCERPT_COL):
-        print("CSV missing or no Content/Excerpt columns")
-        return
-
-    for i in range(1, len(rows)):
-        row = rows[i]
-        if len(row) <= max(CONTENT_COL, EXCERPT_COL):
-            continue
-        row[CONTENT_COL] = process_field(row[CONTENT_COL])
-        row[EXCERPT_COL] = process_field(row[EXCERPT_COL])
-
-    with open(input_path, "w", encoding="utf-8", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerows(rows)
-
-    print(f"Done. Updated {input_path}")
+def main(argv=None):
+    wp_export.rewrite_export_fields(argv, process_field, __doc__, "clean-ugly-html-csv", DEFAULT_CSV)
 
 
 if __name__ == "__main__":
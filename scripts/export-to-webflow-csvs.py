@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Read the Posts export once and write the Webflow blog, authors and categories CSVs together."""
+import argparse
+import itertools
+import os
+import sys
+
+import post_cache
+import webflow_shards
+import wp_export
+
+posts = wp_export.load_script("posts-to-webflow-csv")
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+INPUT_CSV = os.path.join(PROJECT_DIR, "Posts-Export-2026-February-03-0219.csv")
+BLOG_CSV = "blog-webflow.csv"
+AUTHORS_CSV = "authors-webflow.csv"
+CATEGORIES_CSV = "categories-webflow.csv"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--input", default=INPUT_CSV, help=f"WordPress Posts export CSV or WXR (XML) file (default {INPUT_CSV})"
+    )
+    parser.add_argument(
+        "--output-dir",
+        default=PROJECT_DIR,
+        help=f"folder for {BLOG_CSV}, {AUTHORS_CSV} and {CATEGORIES_CSV} (default {PROJECT_DIR})",
+    )
+    wp_export.add_parallel_arguments(parser)
+    post_cache.add_cache_arguments(parser)
+    webflow_shards.add_shard_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    shards = webflow_shards.shard_limits(args)
+    blog_csv, authors_csv, categories_csv = (
+        os.path.join(args.output_dir, name) for name in (BLOG_CSV, AUTHORS_CSV, CATEGORIES_CSV)
+    )
+    # Filled in by the posts conversion's single scan, which references the same slugs
+    authors = wp_export.SlugIndex()
+    categories = wp_export.SlugIndex()
+
+    with wp_export.open_export_rows(args.input) as reader:
+        first_row = next(reader, None)
+        if first_row is None:
+            print("No posts in input")
+            return
+        os.makedirs(args.output_dir, exist_ok=True)
+        cache = post_cache.open_cache(args, posts.TRANSFORM_VERSION)
+        try:
+            written, skipped = posts.write_blog_csv(
+                itertools.chain([first_row], reader),
+                blog_csv,
+                workers=wp_export.worker_count(args.workers),
+                chunk_size=args.chunk_size,
+                cache=cache,
+                shards=shards,
+                authors=authors,
+                categories=categories,
+            )
+        except wp_export.RowError as exc:
+            sys.exit(f"Conversion failed on {exc}")
+        finally:
+            if cache is not None:
+                cache.close()
+
+    author_count = wp_export.write_name_slug_csv(authors_csv, authors.items())
+    category_count = wp_export.write_name_slug_csv(categories_csv, categories.items())
+
+    if cache is not None:
+        print(cache.report())
+    if skipped:
+        print(f"Skipped {skipped} rows without a title")
+    if shards is None:
+        print(f"Wrote {written} rows to {blog_csv}")
+    else:
+        manifest = webflow_shards.manifest_path(blog_csv)
+        print(f"Wrote {written} rows in {len(webflow_shards.csv_paths(manifest))} shards listed in {manifest}")
+    print(f"Wrote {author_count} authors to {authors_csv}")
+    print(f"Wrote {category_count} categories to {categories_csv}")
+    for line in wp_export.collision_report("authors", authors) + wp_export.collision_report("categories", categories):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
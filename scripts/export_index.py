@@ -0,0 +1,96 @@
+"""Byte-offset index of a Posts export CSV, so single posts can be re-read without a pass over the file.
+
+<csv>.index.json maps each post's Slug and ID to the byte offset and length of its record in the CSV.
+Offsets come from checkpoint.CsvRecords, which parses as csv does, so newlines inside quoted fields stay
+inside their record. The index also keeps the author and category slug assignments of the whole
+export (see wp_export.SlugIndex): a post converted on its own then references the same, possibly
+disambiguated, slugs as in a full run. Like an export_snapshot, the index is tied to the CSV's size,
+mtime and sampled hash and is rebuilt by load() when they change.
+"""
+import csv
+import io
+import json
+import sys
+
+import checkpoint
+import compressed
+import export_snapshot
+import wp_export
+
+INDEX_VERSION = 2
+INDEX_COLUMNS = ("Slug", "ID", *wp_export.AUTHOR_COLUMNS, *wp_export.CATEGORY_COLUMNS)
+
+
+def index_path(csv_path):
+    """Where the index of csv_path lives: <csv_path>.index.json"""
+    return csv_path + ".index.json"
+
+
+def build(csv_path):
+    """Index csv_path, write <csv_path>.index.json and return the index."""
+    source = export_snapshot.fingerprint(csv_path)
+    slugs = {}
+    ids = {}
+    authors = wp_export.SlugIndex()
+    categories = wp_export.SlugIndex()
+    with checkpoint.open_records(csv_path) as records:
+        header = records.header or []
+        spans = []
+
+        def spanned():
+            start = records.offset
+            for record in records:
+                if record:  # project_rows skips blank records
+                    spans.append([start, records.offset - start])
+                start = records.offset
+                yield record
+
+        for row in wp_export.project_rows(header, spanned(), INDEX_COLUMNS):
+            span = spans.pop()
+            slug = (row.get("Slug") or "").strip()
+            post_id = (row.get("ID") or "").strip()
+            if slug:
+                slugs.setdefault(slug, span)
+            if post_id:
+                ids.setdefault(post_id, span)
+            # Every record takes part in slug assignment, as in posts-to-webflow-csv.reference_slugs
+            wp_export.add_author(authors, row)
+            wp_export.add_categories(categories, row)
+    index = {
+        "version": INDEX_VERSION,
+        "source": source,
+        "header": header,
+        "slugs": slugs,
+        "ids": ids,
+        "authors": authors.entries(),
+        "categories": categories.entries(),
+    }
+    with wp_export.atomic_write(index_path(csv_path)) as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+    return index
+
+
+def load(csv_path):
+    """The index of csv_path, (re)built first if it is missing or no longer matches the CSV."""
+    try:
+        with open(index_path(csv_path), "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") == INDEX_VERSION and index.get("source") == export_snapshot.fingerprint(csv_path):
+            return index
+    except (OSError, ValueError):
+        pass
+    print(f"Indexing {csv_path} ...", file=sys.stderr)
+    return build(csv_path)
+
+
+def find(index, key):
+    """(offset, length) of the post with Slug or ID `key`, or None."""
+    return index["slugs"].get(key) or index["ids"].get(key)
+
+
+def read_record(csv_path, offset, length):
+    """The csv.reader record stored at offset in csv_path."""
+    with compressed.open_binary(csv_path) as f:
+        f.seek(offset)
+        data = f.read(length)
+    return next(csv.reader(io.StringIO(data.decode("utf-8"), newline="")))
@@ -0,0 +1,266 @@
+"""Parsed export snapshots: the records of a Posts export CSV stored column by column for mmap.
+
+scripts/ingest-export.py parses the CSV once and writes <csv>.snapshot beside it. The scripts that read
+the export (through wp_export.open_export_rows/open_records/open_dict_rows and checkpoint.Journal) then
+use the snapshot instead of parsing the CSV while it is current: its recorded size, mtime and a SHA-256
+of the first and last 64 KiB still match the CSV. Otherwise they fall back to the CSV and say so.
+
+Layout (native byte order, every section 8-byte aligned):
+
+  MAGIC
+  widths   uint32 per record: fields in it (0 for a blank line)
+  ends     uint64 per record: CSV byte offset just past it, as checkpoint.CsvRecords reports
+  column 0 uint64 offsets of each record's field in the column's blob (records + 1 of them), then the blob
+  column 1 ...
+  meta     JSON: source fingerprint, header, record count, section positions
+  uint64 position of meta, MAGIC
+
+Fields are UTF-8 and only decoded when read, so a script that needs a few columns never touches the
+others' pages.
+"""
+import array
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+
+FORMAT_VERSION = 1
+MAGIC = b"WPSNAP\x00\x01"
+SUFFIX = ".snapshot"
+SAMPLE_BYTES = 64 * 1024
+_FOOTER = struct.Struct("<Q8s")
+_FLUSH_EVERY = 65536  # offsets buffered per column before they go to its temp file
+
+
+def snapshot_path(csv_path):
+    """Where the snapshot of csv_path lives: <csv_path>.snapshot"""
+    return csv_path + SUFFIX
+
+
+def fingerprint(csv_path):
+    """Size, mtime and a SHA-256 of the first and last SAMPLE_BYTES of a file."""
+    stat = os.stat(csv_path)
+    digest = hashlib.sha256()
+    with open(csv_path, "rb") as f:
+        digest.update(f.read(SAMPLE_BYTES))
+        if stat.st_size > SAMPLE_BYTES:
+            f.seek(max(SAMPLE_BYTES, stat.st_size - SAMPLE_BYTES))
+            digest.update(f.read())
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sample_sha256": digest.hexdigest()}
+
+
+def _pad(f):
+    f.write(b"\0" * (-f.tell() % 8))
+
+
+def write(csv_path, records):
+    """Write the snapshot of csv_path from records (a checkpoint.CsvRecords over it); return the count.
+
+    Written to a temp file and renamed into place, so readers never see a partial snapshot.
+    """
+    source = fingerprint(csv_path)
+    header_end = records.offset
+    widths = array.array("I")
+    ends = array.array("Q")
+    columns = []  # [offsets buffer, offsets temp file, blob temp file, blob size]
+    count = 0
+    with tempfile.TemporaryFile() as widths_file, tempfile.TemporaryFile() as ends_file:
+        try:
+            for record in records:
+                while len(columns) < len(record):
+                    # A record longer than any before: earlier records have no field in the new column
+                    offsets = array.array("Q", bytes(8 * count))
+                    columns.append([offsets, tempfile.TemporaryFile(), tempfile.TemporaryFile(), 0])
+                for c, column in enumerate(columns):
+                    column[0].append(column[3])
+                    if c < len(record):
+                        data = record[c].encode("utf-8")
+                        column[2].write(data)
+                        column[3] += len(data)
+                    if len(column[0]) >= _FLUSH_EVERY:
+                        column[0].tofile(column[1])
+                        del column[0][:]
+                widths.append(len(record))
+                ends.append(records.offset)
+                count += 1
+                if len(widths) >= _FLUSH_EVERY:
+                    widths.tofile(widths_file)
+                    ends.tofile(ends_file)
+                    del widths[:], ends[:]
+            widths.tofile(widths_file)
+            ends.tofile(ends_file)
+
+            path = snapshot_path(csv_path)
+            directory = os.path.dirname(os.path.abspath(path))
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as out:
+                    out.write(MAGIC)
+
+                    def copy(f):
+                        position = out.tell()
+                        f.seek(0)
+                        shutil.copyfileobj(f, out)
+                        _pad(out)
+                        return position
+
+                    meta = {
+                        "version": FORMAT_VERSION,
+                        "byteorder": sys.byteorder,
+                        "source": source,
+                        "header": records.header,
+                        "header_end": header_end,
+                        "records": count,
+                        "widths_at": copy(widths_file),
+                        "ends_at": copy(ends_file),
+                        "columns": [],
+                    }
+                    for offsets, offsets_file, blob_file, size in columns:
+                        offsets.append(size)
+                        offsets.tofile(offsets_file)
+                        meta["columns"].append([copy(offsets_file), copy(blob_file)])
+                    meta_at = out.tell()
+                    out.write(json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+                    out.write(_FOOTER.pack(meta_at, MAGIC))
+                    out.flush()
+                    os.fsync(out.fileno())
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        finally:
+            for _, offsets_file, blob_file, _ in columns:
+                offsets_file.close()
+                blob_file.close()
+    return count
+
+
+class Snapshot:
+    """An open snapshot file. Close it (or use it as a context manager) when done."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            self._file.close()
+            raise ValueError(f"{path} is not a snapshot") from None
+        self._views = []
+        try:
+            meta_at, magic = _FOOTER.unpack_from(self._mmap, len(self._mmap) - _FOOTER.size)
+            if magic != MAGIC or self._mmap[: len(MAGIC)] != MAGIC:
+                raise ValueError(f"{path} is not a snapshot")
+            self.meta = json.loads(self._mmap[meta_at: len(self._mmap) - _FOOTER.size])
+            if self.meta["version"] != FORMAT_VERSION or self.meta["byteorder"] != sys.byteorder:
+                raise ValueError(f"{path} was written by another version or platform")
+        except (ValueError, struct.error):
+            self.close()
+            raise
+        self.header = self.meta["header"]
+        self.records = self.meta["records"]
+        self.widths = self._array(self.meta["widths_at"], "I", self.records)
+        self.ends = self._array(self.meta["ends_at"], "Q", self.records)
+        self._columns = [
+            (self._array(offsets_at, "Q", self.records + 1), blob_at) for offsets_at, blob_at in self.meta["columns"]
+        ]
+
+    def _array(self, position, typecode, length):
+        view = memoryview(self._mmap)[position: position + length * struct.calcsize(typecode)].cast(typecode)
+        self._views.append(view)
+        return view
+
+    def field(self, column, record):
+        """One field as str, or None when the record has no such column."""
+        if column >= self.widths[record]:
+            return None
+        offsets, blob_at = self._columns[column]
+        return self._mmap[blob_at + offsets[record]: blob_at + offsets[record + 1]].decode("utf-8")
+
+    def record(self, record):
+        """All fields of a record, as csv.reader returns them."""
+        return [self.field(column, record) for column in range(self.widths[record])]
+
+    def select(self, columns, start=0):
+        """Yield a tuple of the given columns' fields (None where a record is short) per non-blank record."""
+        data = self._mmap
+        widths = self.widths
+        picked = [self._columns[c] if c < len(self._columns) else (None, 0) for c in columns]
+        for i in range(start, self.records):
+            width = widths[i]
+            if not width:
+                continue
+            yield tuple(
+                data[blob_at + offsets[i]: blob_at + offsets[i + 1]].decode("utf-8") if c < width else None
+                for c, (offsets, blob_at) in zip(columns, picked)
+            )
+
+    def close(self):
+        for view in self._views:
+            view.release()
+        self._views = []
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def current(csv_path, warn=True):
+    """The open Snapshot of csv_path if there is one and it matches the CSV as it is now, else None.
+
+    With warn, a stale or unreadable snapshot is reported on stderr.
+    """
+    path = snapshot_path(csv_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        snapshot = Snapshot(path)
+    except (OSError, ValueError) as exc:
+        if warn:
+            print(f"Ignoring {path}: {exc}", file=sys.stderr)
+        return None
+    if snapshot.meta["source"] != fingerprint(csv_path):
+        snapshot.close()
+        if warn:
+            print(f"{path} is out of date; reading {csv_path} (re-run ingest-export.py)", file=sys.stderr)
+        return None
+    return snapshot
+
+
+class SnapshotRecords:
+    """The records of a Snapshot with the same interface as checkpoint.CsvRecords (header, offset)."""
+
+    def __init__(self, snapshot, offset=None):
+        self.snapshot = snapshot
+        self.header = snapshot.header
+        self._next = 0 if offset is None else bisect.bisect_right(snapshot.ends, offset)
+        self.offset = offset if offset is not None else snapshot.meta["header_end"]
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        i = self._next
+        if i >= self.snapshot.records:
+            raise StopIteration
+        self._next = i + 1
+        self.offset = self.snapshot.ends[i]
+        return self.snapshot.record(i)
+
+    def close(self):
+        self.snapshot.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
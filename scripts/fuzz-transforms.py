@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""Search for inputs that make an HTML transform take superlinear time.
+
+Each trial builds a random motif from adversarial fragments (unclosed <font size="+2">, <p style="...
+without a closing quote, <br> runs, stray '<', ...) and times every transform on the motif repeated
+at doubling sizes. The growth exponent over the largest sizes is ~1 for linear code and ~2 for
+quadratic; anything above --threshold is reported with the motif, and all findings are saved as JSON.
+Calls under --min-seconds are too noisy to compare, and a series flagged while still fast is re-timed
+at larger sizes before it is reported. Each series runs in a worker process with a time budget, so a
+catastrophic case cannot hang the run.
+"""
+import argparse
+import gc
+import json
+import math
+import os
+import random
+import time
+
+import wp_export
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+DEFAULT_OUTPUT = os.path.join(PROJECT_DIR, "benchmarks", "fuzz-findings.json")
+# Calls faster than this are mostly interpreter and cache noise: their growth is not compared
+DEFAULT_MIN_SECONDS = 0.02
+
+# Target name -> (script, attribute path) of a str -> str function
+TARGETS = {
+    name: ("posts-to-webflow-csv", name)
+    for name in (
+        "first_image_url_from_html",
+        "strip_first_image",
+        "convert_font_size_to_headings",
+        "ensure_html_paragraphs",
+        "fix_paragraphs_ending_with_br",
+        "close_unclosed_paragraphs",
+        "balance_paragraphs",
+        "convert_text_align_center_to_class",
+        "strip_strong_from_headings",
+        "remove_leading_br_in_post_body",
+        "compact_post_body",
+        "strip_all_html",
+    )
+}
+TARGETS["post_body.rewrite"] = ("posts-to-webflow-csv", "post_body.rewrite")
+for _script in (
+    "replace-font-headings-in-csv",
+    "clean-ugly-html-csv",
+    "strong-to-h4-csv",
+    "wrap-loose-paragraphs-in-csv",
+):
+    TARGETS[f"{_script}.process_field"] = (_script, "process_field")
+
+FRAGMENTS = [
+    '<font size="+2">', '<font size="+1">', "</font>", "<strong>", "</strong>", '<strong><font size="+2">',
+    "</font></strong>", "<p>", "</p>", "<p ", '<p style="text-align: center">', '<p style="text-align: center',
+    '<h2 style="text-align:center">', ' style="', "text-align:", " center", '"', "'",
+    '<p class="has-large-font-size">',
+    "<br>", "<br />", "<br", "<h2>", "</h2>", "<h3><strong>", "</strong></h3>", "<div>", "</div>", "<li>", "</ul>",
+    '<img src="a-300x200.jpg">', "<img", "<!--", "-->", "<", ">", "&nbsp;", "\n", "\n\n", "\r\n", " ", "\t",
+    "word", "Word.", "Next", "A", ".", "&nbsp;", '<span style="color:red">', "</span>", "<span>", "</em>",
+    "<!-- wp:paragraph -->",
+]
+
+
+def random_motif(rng):
+    return "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 6)))
+
+
+def resolve(target):
+    script, path = TARGETS[target]
+    obj = wp_export.load_script(script)
+    for part in path.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+def time_series(task):
+    """Time a target on motif * n for each n until a call exceeds step_seconds; return [(n, seconds)]."""
+    target, motif, sizes, step_seconds = task
+    func = resolve(target)
+    timings = []
+    for n in sizes:
+        text = motif * n
+        best = None
+        gc.collect()
+        gc.disable()  # collector pauses scale with the heap, not the algorithm
+        try:
+            for _ in range(3):
+                start = time.perf_counter()
+                func(text)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+        finally:
+            gc.enable()
+        timings.append((n, best))
+        if best > step_seconds:
+            break
+    return timings
+
+
+def growth_exponent(timings, floor=DEFAULT_MIN_SECONDS):
+    """Slope of log(time) against log(size) over the last (up to) three sizes; None if too fast to compare."""
+    if len(timings) < 2:
+        return None
+    (n1, t1), (n2, t2) = timings[-min(3, len(timings))], timings[-1]
+    if t1 < floor or t2 <= 0:
+        return None
+    return math.log(t2 / t1) / math.log(n2 / n1)
+
+
+def confirm_task(task, timings):
+    """A fresh series for a flagged task at its largest size and two doublings beyond it."""
+    target, motif, _, step_seconds = task
+    n = timings[-1][0]
+    return (target, motif, [n, n * 2, n * 4], step_seconds)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trials", type=int, default=30, help="random motifs to try (default 30)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--targets", help=f"comma-separated subset of: {', '.join(TARGETS)}")
+    parser.add_argument("--min-repeat", type=int, default=256, help="smallest motif repeat count (default 256)")
+    parser.add_argument("--steps", type=int, default=6, help="size doublings per series (default 6)")
+    parser.add_argument(
+        "--step-seconds", type=float, default=1.0, help="stop growing a series once a call takes this long"
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=1.5, help="report growth exponents above this (default 1.5)"
+    )
+    parser.add_argument(
+        "--min-seconds",
+        type=float,
+        default=DEFAULT_MIN_SECONDS,
+        help=f"ignore series whose compared calls take less than this (default {DEFAULT_MIN_SECONDS})",
+    )
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help=f"JSON findings (default {DEFAULT_OUTPUT})")
+    wp_export.add_parallel_arguments(parser)
+    args = parser.parse_args(argv)
+
+    targets = [t.strip() for t in args.targets.split(",")] if args.targets else list(TARGETS)
+    unknown = [t for t in targets if t not in TARGETS]
+    if unknown:
+        parser.error(f"unknown target(s): {', '.join(unknown)}")
+    for script, _ in {TARGETS[t] for t in targets}:
+        wp_export.load_script(script)
+
+    rng = random.Random(args.seed)
+    motifs = [random_motif(rng) for _ in range(args.trials)]
+    sizes = [args.min_repeat * 2**k for k in range(args.steps)]
+    tasks = [(target, motif, sizes, args.step_seconds) for motif in motifs for target in targets]
+    # A whole series may take a few step budgets (each size runs three times); beyond that it is a hang
+    budget = args.step_seconds * 12 + 5
+
+    def run(tasks):
+        return list(
+            wp_export.map_rows(
+                time_series,
+                tasks,
+                workers=wp_export.worker_count(args.workers),
+                describe=lambda task: f"{task[0]} on {task[1]!r}",
+                timeout=budget,
+            )
+        )
+
+    results = run(tasks)
+    # A series flagged while every call stayed under --step-seconds may be noise at small sizes: re-time it
+    # further out and keep the new series instead
+    suspects = [
+        i
+        for i, timings in enumerate(results)
+        if not isinstance(timings, wp_export.TimedOut)
+        and timings[-1][1] <= args.step_seconds
+        and (growth_exponent(timings, args.min_seconds) or 0) > args.threshold
+    ]
+    for i, timings in zip(suspects, run([confirm_task(tasks[i], results[i]) for i in suspects])):
+        results[i] = timings
+
+    findings = []
+    worst = {}
+    for (target, motif, _, _), timings in zip(tasks, results):
+        timed_out = isinstance(timings, wp_export.TimedOut)
+        exponent = math.inf if timed_out else growth_exponent(timings, args.min_seconds)
+        if exponent is None:
+            continue
+        if exponent > worst.get(target, (-math.inf,))[0]:
+            worst[target] = (exponent, motif)
+        if exponent > args.threshold:
+            findings.append(
+                {
+                    "target": target,
+                    "motif": motif,
+                    "exponent": None if timed_out else round(exponent, 3),
+                    "timed_out": timed_out,
+                    "timings": [] if timed_out else timings,
+                }
+            )
+            shown = f"no result within {budget:g}s" if timed_out else f"exponent {exponent:.2f}"
+            print(f"SUPERLINEAR {target}: {shown} on {motif!r} x n")
+
+    print(f"\nWorst growth per target over {len(motifs)} motifs (1 = linear, 2 = quadratic):")
+    for target in targets:
+        exponent, motif = worst.get(target, (None, None))
+        shown = "n/a (too fast to measure)" if exponent is None else f"{exponent:.2f} on {motif!r}"
+        if exponent == math.inf:
+            shown = f"timed out on {motif!r}"
+        print(f"  {target:48} {shown}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "seed": args.seed,
+                "trials": args.trials,
+                "threshold": args.threshold,
+                "findings": findings,
+                "worst": {
+                    target: {"exponent": None if math.isinf(e) else round(e, 3), "motif": motif}
+                    for target, (e, motif) in worst.items()
+                },
+            },
+            f,
+            indent=2,
+        )
+    print(f"{len(findings)} superlinear case(s); saved {args.output}")
+
+
+if __name__ == "__main__":
+    main()
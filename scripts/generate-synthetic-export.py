@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""Write a deterministic synthetic WordPress Posts export CSV for benchmarks (e.g. 1k, 10k, 100k or 1M posts).
+
+Give -o a .gz, .bz2 or .xz name to write it compressed.
+
+Besides ordinary posts it mixes in the HTML the converters find hardest: nested <font size="+2">
+headings, long runs of unclosed <p>, many text-align: center blocks and very large bodies.
+Post i depends only on (seed, i), so a 10k export starts with the same posts as the 1k one.
+"""
+import argparse
+import csv
+import os
+import random
+
+import compressed
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+
+EXPORT_HEADERS = [
+    "ID",
+    "Title",
+    "Content",
+    "Excerpt",
+    "Date",
+    "Post Type",
+    "Permalink",
+    "Image URL",
+    "Categories",
+    "Tags",
+    "Author ID",
+    "Author Username",
+    "Author First Name",
+    "Author Last Name",
+    "Slug",
+    "Status",
+]
+
+WORDS = (
+    "speech language therapy child parents practice sounds words play reading story home school "
+    "articulation lisp stutter vocabulary grammar listening games activities tips milestones toddler "
+    "preschool kindergarten fluency voice sentence rhyme letter book summer winter easy fun quick"
+).split()
+CATEGORIES = [
+    "Articulation", "Language", "Fluency", "Parents", "Teachers", "Activities", "Games", "Reading",
+    "Tips & Tricks", "Milestones", "Toddlers", "Preschool", "School Age", "News", "Apps",
+]
+AUTHORS = [
+    ("1", "admin", "", ""),
+    ("2", "jdoe", "Jane", "Doe"),
+    ("3", "bob", "Bob", ""),
+    ("4", "mgarcia", "María", "García"),
+    ("5", "kchen", "Kim", "Chen"),
+    ("6", "guest", "", ""),
+]
+
+# Post kind -> weight; "huge" bodies run to a few hundred KB each (past csv's default 128 KB field limit)
+POST_KINDS = {
+    "plain": 70,
+    "font-headings": 10,
+    "unclosed-paragraphs": 7,
+    "centered": 7,
+    "mixed": 5,
+    "huge": 0.2,
+}
+
+
+def parse_count(value):
+    """Parse a post count such as 1000, 1k, 10k or 1M."""
+    value = value.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(value[-1:], 1)
+    return int(float(value.rstrip("km")) * scale)
+
+
+def _sentence(rng, low=6, high=18):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(low, high))]
+    return " ".join(words).capitalize() + "."
+
+
+def _text(rng, sentences=3):
+    parts = []
+    for _ in range(rng.randint(1, sentences)):
+        sentence = _sentence(rng)
+        roll = rng.random()
+        if roll < 0.1:
+            sentence = f"<strong>{sentence}</strong>"
+        elif roll < 0.15:
+            sentence = f'<a href="https://example.com/{rng.choice(WORDS)}/">{sentence}</a>'
+        parts.append(sentence)
+    return " ".join(parts)
+
+
+def _image(rng, i):
+    size = rng.choice(["", "-300x200", "-1024x683", "-150x150"])
+    return (
+        f'<img class="alignnone size-medium wp-image-{i}" src="https://example.com/wp-content/uploads/'
+        f'{2012 + i % 12}/{1 + i % 12:02d}/{rng.choice(WORDS)}-{i}{size}.jpg" alt="" width="300" height="200" />'
+    )
+
+
+def _plain(rng, i, paragraphs):
+    # Classic-editor style: paragraphs separated by blank lines, some already wrapped in <p>
+    blocks = []
+    for n in range(paragraphs):
+        text = _text(rng)
+        if rng.random() < 0.3:
+            text = f"<p>{text}</p>"
+        if rng.random() < 0.05:
+            text = _image(rng, i * 100 + n) + "\n" + text
+        blocks.append(text)
+    return "\n\n".join(blocks)
+
+
+def _font_headings(rng, i):
+    blocks = []
+    for _ in range(rng.randint(2, 8)):
+        heading = _sentence(rng, 2, 6)
+        blocks.append(
+            rng.choice(
+                [
+                    f'<strong><font size="+2">{heading}</font></strong>',
+                    f'<font size="+1"><strong>{heading}</strong></font>',
+                    f'<font size="+2"><font size="+1"><strong>{heading}</strong></font></font>',
+                    f'<p class="has-large-font-size">{heading}</p>',
+                    f"<h2><strong>{heading}</strong></h2>",
+                ]
+            )
+        )
+        blocks.append(_plain(rng, i, rng.randint(1, 3)))
+    return "\n".join(blocks)
+
+
+def _unclosed_paragraphs(rng, i):
+    runs = [
+        f'<p style="margin: 0 0 {rng.randint(0, 20)}px;">{_text(rng, 2)}<br>' for _ in range(rng.randint(20, 300))
+    ]
+    if rng.random() < 0.5:
+        runs.append("</p>")
+    return "\n".join(runs)
+
+
+def _centered(rng, i):
+    blocks = []
+    for n in range(rng.randint(10, 120)):
+        tag = rng.choice(["p", "p", "h3", "div"])
+        blocks.append(f'<{tag} style="text-align: center;">{_text(rng, 2)}</{tag}>')
+        if n % 10 == 0:
+            blocks.append(f'<p style="text-align: center">{_image(rng, i * 1000 + n)}</p>')
+    return "\n".join(blocks)
+
+
+def _mixed(rng, i):
+    parts = [_font_headings(rng, i), _unclosed_paragraphs(rng, i)[:4000], _centered(rng, i)[:4000]]
+    rng.shuffle(parts)
+    return "\n".join(parts)
+
+
+def _huge(rng, i):
+    return _plain(rng, i, rng.randint(1500, 4000))
+
+
+BODY_BUILDERS = {
+    "plain": lambda rng, i: _plain(rng, i, rng.randint(3, 12)),
+    "font-headings": _font_headings,
+    "unclosed-paragraphs": _unclosed_paragraphs,
+    "centered": _centered,
+    "mixed": _mixed,
+    "huge": _huge,
+}
+
+
+def synthetic_row(seed, i):
+    """Return export row i (a list in EXPORT_HEADERS order) for the given seed."""
+    rng = random.Random(f"{seed}:{i}")
+    kind = rng.choices(list(POST_KINDS), weights=list(POST_KINDS.values()))[0]
+    content = BODY_BUILDERS[kind](rng, i)
+    if rng.random() < 0.7:
+        content = _image(rng, i) + "\n" + content
+    title = "" if rng.random() < 0.02 else _sentence(rng, 3, 8).rstrip(".")
+    slug = f"{kind}-{i}-{rng.choice(WORDS)}"
+    author = rng.choice(AUTHORS)
+    date = f"{2012 + i % 13}-{1 + i % 12:02d}-{1 + i % 28:02d} {i % 24:02d}:{i % 60:02d}:00"
+    return [
+        str(i + 1),
+        title,
+        content,
+        "" if rng.random() < 0.3 else f"<p>{_text(rng, 2)}</p>",
+        date,
+        "post",
+        f"https://example.com/{slug}/",
+        "|".join(f"https://example.com/wp-content/uploads/{slug}-{n}.jpg" for n in range(rng.randint(0, 3))),
+        "|".join(rng.sample(CATEGORIES, rng.randint(0, 3))),
+        "",
+        author[0],
+        author[1],
+        author[2],
+        author[3],
+        slug,
+        "publish",
+    ]
+
+
+def write_export(path, posts, seed=0):
+    """Write a synthetic export with the given number of posts; return its size in bytes."""
+    with compressed.open_text(path, "w") as f_out:
+        writer = csv.writer(f_out)
+        writer.writerow(EXPORT_HEADERS)
+        for i in range(posts):
+            writer.writerow(synthetic_row(seed, i))
+    return os.path.getsize(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("posts", type=parse_count, help="number of posts, e.g. 1k, 10k, 100k, 1M")
+    parser.add_argument(
+        "-o", "--output", help="CSV to write (default synthetic-export-<posts>.csv in the project folder)"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="change to get a different but still repeatable export")
+    args = parser.parse_args(argv)
+    output = args.output or os.path.join(PROJECT_DIR, f"synthetic-export-{args.posts}.csv")
+
+    size = write_export(output, args.posts, seed=args.seed)
+    print(f"Wrote {args.posts} posts ({size / 1e6:.1f} MB) to {output}")
+
+
+if __name__ == "__main__":
+    main()
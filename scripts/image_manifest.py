@@ -0,0 +1,259 @@
+"""Image manifest for posts-to-webflow-csv.py --image-manifest: every image once, however often it is used.
+
+WordPress serves one upload under many URLs: size variants made for srcset (photo-300x200.jpg,
+photo-1024x683.jpg), cache-busting query strings, and the same file uploaded twice under different
+names. Webflow imports each distinct URL as a new asset, so during the conversion every <img> src/srcset
+in Post body and every Image is mapped to one URL per image and rewritten to it:
+
+  - URLs under /wp-content/uploads/ lose their query string
+  - with a local mirror of wp-content/uploads, a -WxH size variant becomes its original upload and
+    originals with the same SHA-256 share the URL seen first; a URL whose file the mirror lacks is kept
+
+Size suffixes are only removed when the mirror shows the original exists: banner-1200x600.jpg may well
+be an original itself, so without a mirror they are kept.
+
+The manifest JSON lists each image (URL, hash, size, the URLs that were rewritten to it, posts using it),
+the old -> new rewrite map, and the mirror's file hashes, which the next run reuses for files whose size
+and mtime have not changed.
+"""
+import hashlib
+import json
+import os
+import re
+import urllib.parse
+
+import wp_export
+
+FORMAT_VERSION = 1
+UPLOADS_PATH = "/wp-content/uploads/"
+IMAGE_EXTENSIONS = frozenset(".avif .bmp .gif .jpeg .jpg .png .svg .tif .tiff .webp".split())
+HASH_BLOCK = 1 << 20
+
+SIZE_SUFFIX_RE = re.compile(r"-\d+x\d+(?=\.[A-Za-z0-9]+$)")
+IMG_TAG_RE = re.compile(r"<img\b[^>]*>", re.IGNORECASE)
+# src, srcset and lazy-loading data-src/data-srcset
+URL_ATTR_RE = re.compile(r"""(\bsrc(set)?=)(["'])(.*?)\3""", re.IGNORECASE | re.DOTALL)
+
+
+def canonical_url(url):
+    """A WordPress upload URL without its query string (scheme and host lowercased); other URLs as given."""
+    url = url.strip()
+    parts = urllib.parse.urlsplit(url)
+    if UPLOADS_PATH not in parts.path:
+        return url
+    return urllib.parse.urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, "", ""))
+
+
+def unsized_url(url):
+    """The URL without WordPress's -WxH size suffix, or None if it has none."""
+    parts = urllib.parse.urlsplit(url)
+    path = SIZE_SUFFIX_RE.sub("", parts.path)
+    return urllib.parse.urlunsplit(parts._replace(path=path)) if path != parts.path else None
+
+
+def upload_path(url):
+    """The path of an upload URL below wp-content/uploads ("2024/05/photo.jpg"), or None."""
+    path = urllib.parse.urlsplit(url).path
+    if UPLOADS_PATH not in path:
+        return None
+    relative = urllib.parse.unquote(path.split(UPLOADS_PATH, 1)[1])
+    if not relative or ".." in relative.split("/"):
+        return None
+    return relative
+
+
+def is_original(name, siblings):
+    """True for an image file name that is not a size variant: it has no -WxH suffix, or no file in the same
+    folder (`siblings`, a set of names) has its name without one."""
+    if os.path.splitext(name)[1].lower() not in IMAGE_EXTENSIONS:
+        return False
+    return not SIZE_SUFFIX_RE.search(name) or SIZE_SUFFIX_RE.sub("", name) not in siblings
+
+
+def hash_file(item):
+    """(relative path, SHA-256 hex) of an (relative path, full path) pair; module level for map_rows."""
+    relative, path = item
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            digest.update(block)
+    return relative, digest.hexdigest()
+
+
+class ImageManifest:
+    """Collects the images of converted blog rows and rewrites their URLs; close() writes the manifest.
+
+    With `mirror` (a local copy of wp-content/uploads), call hash_uploads() before converting.
+    """
+
+    def __init__(self, path, mirror=None):
+        self.path = path
+        self.mirror = mirror
+        self.files = {}  # relative path -> [size, mtime_ns, sha256] for the mirror's originals
+        self.hashed = self.reused = 0
+        self.merged = 0  # upload URLs rewritten to another with the same content
+        self._images = {}  # URL -> {"sha256", "bytes", "urls": {URL: None}, "posts"}
+        self._rewrites = {}  # URL as found -> URL written
+        self._by_hash = {}  # sha256 -> the URL its first use got
+        self._missing = set()  # upload URLs not found in the mirror, kept as found
+
+    def _previous_files(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get("version") != FORMAT_VERSION or manifest.get("mirror") != os.path.abspath(self.mirror):
+            return {}
+        return manifest.get("files") or {}
+
+    def hash_uploads(self, workers=1, chunk_size=wp_export.DEFAULT_CHUNK_SIZE):
+        """Hash the mirror's original images in parallel, reusing the previous manifest's unchanged hashes."""
+        previous = self._previous_files()
+        pending = []
+        for directory, _, names in os.walk(self.mirror):
+            siblings = set(names)
+            for name in names:
+                if not is_original(name, siblings):
+                    continue
+                path = os.path.join(directory, name)
+                relative = os.path.relpath(path, self.mirror).replace(os.sep, "/")
+                stat = os.stat(path)
+                entry = previous.get(relative)
+                if entry and entry[:2] == [stat.st_size, stat.st_mtime_ns]:
+                    self.files[relative] = entry
+                    self.reused += 1
+                else:
+                    self.files[relative] = [stat.st_size, stat.st_mtime_ns, None]
+                    pending.append((relative, path))
+        for relative, digest in wp_export.map_rows(
+            hash_file, pending, workers=workers, chunk_size=chunk_size, describe=lambda item: item[1]
+        ):
+            self.files[relative][2] = digest
+            self.hashed += 1
+
+    def resolve(self, url):
+        """The URL an image found at `url` is written as, recording it in the manifest."""
+        new = self._rewrites.get(url)
+        if new is not None:
+            return new
+        new = canonical_url(url)
+        digest = size = None
+        if self.mirror is not None and upload_path(new):
+            # The original of a size variant if the mirror has it, else the file itself
+            for candidate in (unsized_url(new), new):
+                entry = self.files.get(upload_path(candidate)) if candidate else None
+                if entry is not None:
+                    new = candidate
+                    size, _, digest = entry
+                    first = self._by_hash.setdefault(digest, new)
+                    if first != new:
+                        self.merged += 1
+                        new = first
+                    break
+            else:
+                self._missing.add(new)
+                new = url
+        image = self._images.get(new)
+        if image is None:
+            image = self._images[new] = {"sha256": digest, "bytes": size, "urls": {}, "posts": 0}
+        if url != new:
+            image["urls"][url] = None
+        self._rewrites[url] = new
+        return new
+
+    def add(self, out_row):
+        """Rewrite the Image and the <img> URLs in Post body of a blog row in place, and record them."""
+        for url in rewrite_row(out_row, self.resolve):
+            self._images[url]["posts"] += 1
+
+    @property
+    def count(self):
+        return len(self._images)
+
+    @property
+    def rewritten(self):
+        """How many distinct URLs found in the posts were rewritten to another."""
+        return sum(1 for old, new in self._rewrites.items() if old != new)
+
+    def report(self):
+        """Summary lines for the end of a run."""
+        lines = []
+        if self.mirror is not None:
+            lines.append(f"Hashed {self.hashed} uploads ({self.reused} unchanged since the last manifest)")
+            if self._missing:
+                lines.append(f"{len(self._missing)} referenced uploads are not in {self.mirror}")
+        duplicates = f", {self.merged} duplicate uploads" if self.mirror is not None else ""
+        lines.append(
+            f"Wrote image manifest of {self.count} images ({self.rewritten} URLs rewritten{duplicates}) to {self.path}"
+        )
+        return lines
+
+    def close(self):
+        """Write the manifest JSON."""
+        manifest = {
+            "version": FORMAT_VERSION,
+            "mirror": os.path.abspath(self.mirror) if self.mirror is not None else None,
+            "images": [
+                {
+                    "url": url,
+                    "sha256": image["sha256"],
+                    "bytes": image["bytes"],
+                    "posts": image["posts"],
+                    "rewritten_from": list(image["urls"]),
+                }
+                for url, image in self._images.items()
+            ],
+            "rewrites": {old: new for old, new in self._rewrites.items() if old != new},
+            "files": self.files,
+        }
+        with wp_export.atomic_write(self.path) as f:
+            json.dump(manifest, f, ensure_ascii=False, separators=(",", ":"))
+
+
+def _rewrite_srcset(value, resolve, used):
+    candidates = []
+    for candidate in value.split(","):
+        parts = candidate.strip().split(None, 1)
+        if parts:
+            parts[0] = resolve(parts[0])
+            used.add(parts[0])
+            candidates.append(" ".join(parts))
+    return ", ".join(candidates)
+
+
+def rewrite_row(out_row, resolve):
+    """Rewrite the Image and the <img> src/srcset URLs in Post body of a blog row in place with resolve(url);
+    return the set of URLs written."""
+    used = set()
+
+    def attribute(match):
+        value = match.group(4)
+        if match.group(2):
+            value = _rewrite_srcset(value, resolve, used)
+        elif value.strip():
+            value = resolve(value)
+            used.add(value)
+        return f"{match.group(1)}{match.group(3)}{value}{match.group(3)}"
+
+    body = out_row.get("Post body")
+    if body and "<img" in body.lower():
+        out_row["Post body"] = IMG_TAG_RE.sub(lambda tag: URL_ATTR_RE.sub(attribute, tag.group(0)), body)
+    if out_row.get("Image"):
+        out_row["Image"] = resolve(out_row["Image"])
+        used.add(out_row["Image"])
+    return used
+
+
+def saved_resolver(path):
+    """A resolve(url) that follows the old -> new map of the manifest at path, for rows patched into the
+    output it was written with (posts-to-webflow-csv.py --only). URLs the map does not have lose their
+    query string if the manifest was made without a mirror, as resolve() would, and are kept otherwise.
+    Raises OSError or ValueError if the manifest cannot be read."""
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != FORMAT_VERSION:
+        raise ValueError(f"unsupported manifest version {manifest.get('version')!r}")
+    rewrites = manifest.get("rewrites") or {}
+    unseen = canonical_url if manifest.get("mirror") is None else str
+    return lambda url: rewrites.get(url) or unseen(url)
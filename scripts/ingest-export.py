@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Parse a Posts export CSV once into <csv>.snapshot, which the other scripts then read instead of the CSV.
+
+See export_snapshot.py. The snapshot is used only while it matches the CSV (size, mtime and a hash of
+its start and end), so editing or replacing the export simply sends the scripts back to the CSV until
+this is run again.
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+
+import checkpoint
+import export_snapshot
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+DEFAULT_CSV = os.path.join(PROJECT_DIR, "Posts-Export-2026-February-03-0219.csv")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("csv_path", nargs="?", default=DEFAULT_CSV, help=f"export CSV (default {DEFAULT_CSV})")
+    parser.add_argument("--force", action="store_true", help="rewrite the snapshot even if it is current")
+    args = parser.parse_args(argv)
+    path = export_snapshot.snapshot_path(args.csv_path)
+
+    if not args.force:
+        snapshot = export_snapshot.current(args.csv_path, warn=False)
+        if snapshot is not None:
+            snapshot.close()
+            print(f"{path} is current")
+            return
+
+    start = time.perf_counter()
+    try:
+        with checkpoint.CsvRecords(args.csv_path) as records:
+            count = export_snapshot.write(args.csv_path, records)
+    except (OSError, UnicodeDecodeError, ValueError, csv.Error) as exc:
+        sys.exit(f"Cannot snapshot {args.csv_path}: {exc}")
+    size_mb = os.path.getsize(path) / 1e6
+    print(f"Wrote {count} records ({size_mb:.1f} MB) to {path} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""Local stand-in for the parts of the Webflow CMS API v2 that upload-to-webflow.py uses, for offline runs.
+
+Serves GET /v2/collections/<id>, GET /v2/collections/<id>/items and POST /v2/collections/<id>/items
+(or .../items/live) for three collections, "authors", "categories" and "blog", shaped like the converted
+CSVs. Creates are checked the way Webflow does (bearer token, at most 100 items, required fields, unique
+slugs, reference IDs that exist), and a token bucket answers 429 with Retry-After once requests come in
+faster than --rate-limit per minute. --error-rate adds random 500s, --drop-rate creates that are stored
+but answered by closing the connection, and --latency a delay per request.
+"""
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+MAX_ITEMS_PER_REQUEST = 100
+
+
+def _field(display_name, slug, kind, required=False, collection=None):
+    field = {"id": uuid.uuid4().hex[:24], "displayName": display_name, "slug": slug, "type": kind}
+    field["isRequired"] = required
+    if collection:
+        field["validations"] = {"collectionId": collection}
+    return field
+
+
+def _name_slug_fields():
+    return [_field("Name", "name", "PlainText", required=True), _field("Slug", "slug", "PlainText", required=True)]
+
+
+COLLECTIONS = {
+    "authors": {"displayName": "Authors", "fields": _name_slug_fields()},
+    "categories": {"displayName": "Categories", "fields": _name_slug_fields()},
+    "blog": {
+        "displayName": "Blog Posts",
+        "fields": _name_slug_fields()
+        + [
+            _field("Author", "author", "Reference", collection="authors"),
+            _field("Date of publication", "date-of-publication", "DateTime"),
+            _field("Category", "category", "MultiReference", collection="categories"),
+            _field("Image", "image", "Image"),
+            _field("Post body", "post-body", "RichText"),
+            _field("Post summary", "post-summary", "PlainText"),
+            _field("Featured", "featured", "Switch"),
+        ],
+    },
+}
+
+COLLECTION_PATH = re.compile(r"^/v2/collections/([^/]+)(/items(/live)?)?/?$")
+
+
+class MockWebflow:
+    """In-memory collections, request counters and the rate limiter, shared by the handler threads."""
+
+    def __init__(self, token=None, rate_limit=600, error_rate=0.0, latency=0.0, seed=None, drop_rate=0.0):
+        self.token = token
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.latency = latency
+        self.items = {name: [] for name in COLLECTIONS}
+        self.slugs = {name: set() for name in COLLECTIONS}
+        self.ids = {name: set() for name in COLLECTIONS}
+        self.stats = {"requests": 0, "rate_limited": 0, "errors": 0, "dropped": 0, "items_created": 0}
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._tokens = float(rate_limit)
+        self._refilled = time.monotonic()
+
+    def take_token(self):
+        """Spend one request from the bucket; return 0, or the seconds to wait before retrying."""
+        with self._lock:
+            self.stats["requests"] += 1
+            if not self.rate_limit:
+                return 0
+            now = time.monotonic()
+            per_second = self.rate_limit / 60
+            self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled) * per_second)
+            self._refilled = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            self.stats["rate_limited"] += 1
+            return max(1, math.ceil((1 - self._tokens) / per_second))
+
+    def _chance(self, rate, stat):
+        with self._lock:
+            if rate and self._random.random() < rate:
+                self.stats[stat] += 1
+                return True
+            return False
+
+    def random_error(self):
+        return self._chance(self.error_rate, "errors")
+
+    def random_drop(self):
+        return self._chance(self.drop_rate, "dropped")
+
+    def list_items(self, collection, offset, limit):
+        with self._lock:
+            items = self.items[collection]
+            return {
+                "items": items[offset:offset + limit],
+                "pagination": {"limit": limit, "offset": offset, "total": len(items)},
+            }
+
+    def create_items(self, collection, items, live):
+        """Validate and store items; return (status, response body)."""
+        if not isinstance(items, list) or not items:
+            return 400, {"code": "validation_error", "message": "items must be a non-empty list"}
+        if len(items) > MAX_ITEMS_PER_REQUEST:
+            return 400, {"code": "validation_error", "message": f"at most {MAX_ITEMS_PER_REQUEST} items per request"}
+        fields = {field["slug"]: field for field in COLLECTIONS[collection]["fields"]}
+        with self._lock:
+            new_slugs = set()
+            for n, item in enumerate(items):
+                data = item.get("fieldData") if isinstance(item, dict) else None
+                if not isinstance(data, dict):
+                    return 400, {"code": "validation_error", "message": f"items[{n}]: fieldData missing"}
+                for slug, field in fields.items():
+                    if field["isRequired"] and not data.get(slug):
+                        return 400, {"code": "validation_error", "message": f"items[{n}]: {slug} is required"}
+                for slug, value in data.items():
+                    field = fields.get(slug)
+                    if field is None:
+                        return 400, {"code": "validation_error", "message": f"items[{n}]: unknown field {slug}"}
+                    problem = self._check_value(field, value)
+                    if problem:
+                        return 400, {"code": "validation_error", "message": f"items[{n}].{slug}: {problem}"}
+                if data["slug"] in self.slugs[collection] or data["slug"] in new_slugs:
+                    return 409, {"code": "duplicate_value", "message": f"items[{n}]: slug {data['slug']!r} is taken"}
+                new_slugs.add(data["slug"])
+            now = time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime())
+            created = []
+            for item in items:
+                item_id = uuid.uuid4().hex[:24]
+                created.append(
+                    {
+                        "id": item_id,
+                        "cmsLocaleId": None,
+                        "lastPublished": now if live else None,
+                        "lastUpdated": now,
+                        "createdOn": now,
+                        "isArchived": bool(item.get("isArchived")),
+                        "isDraft": bool(item.get("isDraft")),
+                        "fieldData": item["fieldData"],
+                    }
+                )
+                self.ids[collection].add(item_id)
+            self.items[collection].extend(created)
+            self.slugs[collection].update(new_slugs)
+            self.stats["items_created"] += len(created)
+        return 200, {"items": created}
+
+    def _check_value(self, field, value):
+        """Problem with a field value, or None (called with the lock held)."""
+        kind = field["type"]
+        if kind == "Reference":
+            target = field["validations"]["collectionId"]
+            return None if value in self.ids[target] else f"no item {value!r} in {target}"
+        if kind == "MultiReference":
+            target = field["validations"]["collectionId"]
+            if not isinstance(value, list):
+                return "expected a list of item IDs"
+            missing = [v for v in value if v not in self.ids[target]]
+            return f"no items {missing!r} in {target}" if missing else None
+        if kind == "Switch" and not isinstance(value, bool):
+            return "expected true or false"
+        if kind == "Image" and not (isinstance(value, dict) and value.get("url")):
+            return 'expected {"url": ...}'
+        return None
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, as the real API
+    api = None  # MockWebflow, set on the server subclass
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _handle(self, method):
+        body = self._read_body()
+        api = self.server.api
+        if api.latency:
+            time.sleep(api.latency)
+        if api.token and self.headers.get("Authorization") != f"Bearer {api.token}":
+            return self._reply(401, {"code": "not_authorized", "message": "Invalid bearer token"})
+        wait = api.take_token()
+        if wait:
+            return self._reply(429, {"code": "too_many_requests", "message": "Rate limit hit"}, {"Retry-After": wait})
+        if api.random_error():
+            return self._reply(500, {"code": "internal_error", "message": "Simulated server error"})
+
+        url = urlsplit(self.path)
+        match = COLLECTION_PATH.match(url.path)
+        if not match or match.group(1) not in COLLECTIONS:
+            return self._reply(404, {"code": "resource_not_found", "message": f"No route {method} {url.path}"})
+        collection, items_path, live = match.group(1), match.group(2), match.group(3)
+        if method == "GET" and not items_path:
+            schema = COLLECTIONS[collection]
+            return self._reply(200, {"id": collection, "slug": collection, **schema})
+        if method == "GET" and not live:
+            query = parse_qs(url.query)
+            offset = int(query.get("offset", ["0"])[0])
+            limit = min(MAX_ITEMS_PER_REQUEST, int(query.get("limit", [str(MAX_ITEMS_PER_REQUEST)])[0]))
+            return self._reply(200, api.list_items(collection, offset, limit))
+        if method == "POST" and items_path:
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                return self._reply(400, {"code": "bad_request", "message": "Body is not JSON"})
+            status, response = api.create_items(collection, payload.get("items"), live=bool(live))
+            if status < 300 and api.random_drop():
+                # Created, but the client never hears so
+                self.close_connection = True
+                return
+            return self._reply(status, response)
+        return self._reply(405, {"code": "method_not_allowed", "message": f"{method} {url.path}"})
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, api):
+        super().__init__(address, Handler)
+        self.api = api
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v2"
+
+
+def start(host="127.0.0.1", port=0, **options):
+    """Start a MockServer (options as for MockWebflow) in a background thread and return it; port 0 picks
+    a free port. Stop it with server.shutdown()."""
+    server = MockServer((host, port), MockWebflow(**options))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--token", help="bearer token to require (default: accept any)")
+    parser.add_argument("--rate-limit", type=int, default=60, help="requests per minute before 429s (0 = none)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with a 500")
+    parser.add_argument(
+        "--drop-rate", type=float, default=0.0, help="fraction of creates stored but answered by closing the connection"
+    )
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to wait before answering each request")
+    parser.add_argument("--seed", type=int, help="seed for --error-rate and --drop-rate")
+    args = parser.parse_args(argv)
+
+    api = MockWebflow(
+        token=args.token,
+        rate_limit=args.rate_limit,
+        error_rate=args.error_rate,
+        latency=args.latency,
+        seed=args.seed,
+        drop_rate=args.drop_rate,
+    )
+    server = MockServer((args.host, args.port), api)
+    print(f"Mock Webflow API at {server.url} (collections: {', '.join(COLLECTIONS)}); Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(api.stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,671 @@
+"""Token-based rewrite engine for the Webflow "Post body" transform chain.
+
+The body is split into tags and text once (tokenize), then each rule walks the token list instead of
+re-scanning the whole HTML string with a regex. Token lists alternate text and tag: even indices are
+text (possibly ""), odd indices are tags, so every rule can tell them apart without re-parsing.
+
+Each rule reproduces one function of the original regex chain in posts-to-webflow-csv.py (those names
+are now thin wrappers around rewrite(html, (rule,))), and rewrite(html) applies the whole chain to a
+single tokenization. A body with a tag the tokenizer leaves as text (cut short, or holding a stray '<')
+reads differently to each of the original regexes, so it is rewritten with those instead (TEXT_RULES).
+"""
+import functools
+import re
+
+TAG_SPLIT_RE = re.compile(r"(<[A-Za-z/!][^<>]*>)")
+# A tag start left in a text token: the tag has no '>' before the next '<'
+STRAY_TAG_RE = re.compile(r"<[A-Za-z/!]")
+
+IMG_RE = re.compile(r"<img\b", re.IGNORECASE)
+FONT_PLUS2_RE = re.compile(r"""<font\s+size=["']\+2["']\s*>""", re.IGNORECASE)
+FONT_PLUS1_RE = re.compile(r"""<font\s+size=["']\+1["']\s*>""", re.IGNORECASE)
+P_X_LARGE_RE = re.compile(r"""<p\s+class=["']has-x-large-font-size["'][^>]*>""", re.IGNORECASE)
+P_LARGE_RE = re.compile(r"""<p\s+class=["']has-large-font-size["'][^>]*>""", re.IGNORECASE)
+P_OPEN_RE = re.compile(r"<p(?:\s[^>]*)?>", re.IGNORECASE)
+P_ATTR_OPEN_RE = re.compile(r"<p\s[^>]+>", re.IGNORECASE)
+BR_RE = re.compile(r"<br\s*/?>", re.IGNORECASE)
+BLOCK_END_RE = re.compile(r"</p>|</h[1-6]>|</div>|</li>|</ul>|</ol>", re.IGNORECASE)
+CENTER_OPEN_RE = re.compile(
+    r"""<(h[1-6]|p)(\s+[^>]*style=["'][^"']*?text-align\s*:\s*center[^"']*["'][^>]*)>""",
+    re.IGNORECASE,
+)
+CENTER_STYLE_RE = re.compile(r"""\s*style=["'][^"']*?text-align\s*:\s*center[^"']*["']""", re.IGNORECASE)
+HEADING_OPEN_RES = {n: re.compile(r"<h%d\b[^>]*>" % n, re.IGNORECASE) for n in range(1, 7)}
+
+# ensure_html_paragraphs' newline rules, applied to text tokens only
+PARAGRAPH_BREAK_RE = re.compile(r"(\r?\n)(\s*\r?\n)+")
+SENTENCE_BREAK_RE = re.compile(r"([.!?])\s*(\r?\n)+(\s*)([A-Z])")
+LEADING_NEWLINES_RE = re.compile(r"^\s*\n")
+
+CENTER_DIV = '<div class="w-richtext-align-center">'
+
+
+def tokenize(html):
+    """Split HTML into an alternating [text, tag, text, ..., text] list."""
+    return TAG_SPLIT_RE.split(html)
+
+
+def _blank(text):
+    return not text or text.isspace()
+
+
+def strip_first_image(toks):
+    """Drop the first <img> tag."""
+    for i in range(1, len(toks), 2):
+        if IMG_RE.match(toks[i]):
+            return toks[:i - 1] + [toks[i - 1] + toks[i + 1]] + toks[i + 2:]
+    return toks
+
+
+def _rewrite_elements(toks, match_open, match_close, new_open, new_close):
+    """Rewrite each open ... first matching close (left to right, non-overlapping) to new_open ... new_close + "\\n\\n".
+
+    match_open/match_close take (toks, i) for a tag index and return the index of the last tag of the
+    sequence they matched, or -1. Once an open has no close after it, no later open can have one either.
+    """
+    out = [toks[0]]
+    n = len(toks)
+    i = 1
+    while i < n:
+        end = match_open(toks, i)
+        if end < 0:
+            out.append(toks[i])
+            out.append(toks[i + 1])
+            i += 2
+            continue
+        j = end + 2
+        close_end = -1
+        while j < n:
+            close_end = match_close(toks, j)
+            if close_end >= 0:
+                break
+            j += 2
+        if close_end < 0:
+            out.extend(toks[i:])
+            return out
+        out.append(new_open)
+        out.extend(toks[end + 1:j])
+        out.append(new_close)
+        out.append("\n\n" + toks[close_end + 1])
+        i = close_end + 2
+    return out
+
+
+def _strong_font_open(font_re):
+    def match(toks, i):
+        if toks[i].lower() == "<strong>" and i + 2 < len(toks) and _blank(toks[i + 1]) and font_re.match(toks[i + 2]):
+            return i + 2
+        return -1
+    return match
+
+
+def _strong_font_close(toks, j):
+    if (
+        toks[j].lower() == "</font>"
+        and j + 2 < len(toks)
+        and _blank(toks[j + 1])
+        and toks[j + 2].lower() == "</strong>"
+    ):
+        return j + 2
+    return -1
+
+
+def _tag_open(tag_re):
+    def match(toks, i):
+        return i if tag_re.match(toks[i]) else -1
+    return match
+
+
+def _tag_close(name):
+    def match(toks, j):
+        return j if toks[j].lower() == name else -1
+    return match
+
+
+FONT_HEADING_RULES = (
+    (_strong_font_open(FONT_PLUS2_RE), _strong_font_close, "<h2>", "</h2>"),
+    (_strong_font_open(FONT_PLUS1_RE), _strong_font_close, "<h3>", "</h3>"),
+    (_tag_open(FONT_PLUS2_RE), _tag_close("</font>"), "<h2>", "</h2>"),
+    (_tag_open(FONT_PLUS1_RE), _tag_close("</font>"), "<h3>", "</h3>"),
+    (_tag_open(P_X_LARGE_RE), _tag_close("</p>"), "<h2>", "</h2>"),
+    (_tag_open(P_LARGE_RE), _tag_close("</p>"), "<h3>", "</h3>"),
+)
+
+
+def convert_font_size_to_headings(toks):
+    """<font size="+2"/"+1"> (optionally inside <strong>) and large-font <p> classes -> <h2>/<h3>."""
+    lowered = "".join(toks[1::2]).lower()
+    if "<font" in lowered or "font-size" in lowered:
+        for match_open, match_close, new_open, new_close in FONT_HEADING_RULES:
+            toks = _rewrite_elements(toks, match_open, match_close, new_open, new_close)
+    # Line break after headings when the source had none (e.g. </h2>Burnout -> </h2>\n\nBurnout)
+    out = None
+    for i in range(1, len(toks), 2):
+        if toks[i] in ("</h2>", "</h3>"):
+            following = toks[i + 1]
+            if following and following[0] != "<" and not following[0].isspace():
+                if out is None:
+                    out = list(toks)
+                out[i + 1] = "\n\n" + following
+    return toks if out is None else out
+
+
+def _ensure_paragraphs_in_text(text):
+    """String-level ensure_html_paragraphs body, used when a tag itself contains a newline."""
+    text = PARAGRAPH_BREAK_RE.sub("</p><p>", text)
+    text = SENTENCE_BREAK_RE.sub(r"\1</p><p>\2\3", text)
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = re.sub(r"(</p>|</h[1-6]>|</div>|</li>|</ul>|</ol>)\s*\n", r"\1", text, flags=re.IGNORECASE)
+    text = text.replace("\n", "<br />")
+    return "<p>" + text.strip() + "</p>"
+
+
+def ensure_html_paragraphs(toks):
+    """Newline-separated paragraphs -> <p>...</p>, single newlines -> <br />, unless already wrapped in <p>."""
+    if len(toks) == 1 and _blank(toks[0]):
+        return toks
+    if len(toks) > 1 and _blank(toks[0]) and toks[1] == "<p>" and _blank(toks[-1]) and toks[-2] == "</p>":
+        return toks
+    if any("\n" in tag or "\r" in tag for tag in toks[1::2]):
+        return tokenize(_ensure_paragraphs_in_text("".join(toks)))
+
+    out = []
+    for i in range(0, len(toks), 2):
+        if i:
+            out.append(toks[i - 1])
+        text = toks[i]
+        if "\n" not in text and "\r" not in text:
+            out.append(text)
+            continue
+        text = PARAGRAPH_BREAK_RE.sub("</p><p>", text)
+        text = SENTENCE_BREAK_RE.sub(r"\1</p><p>\2\3", text)
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+        pieces = text.split("</p><p>")
+        # Newlines right after block-end tags are structural, not in-paragraph breaks
+        if i and BLOCK_END_RE.fullmatch(toks[i - 1]):
+            pieces[0] = LEADING_NEWLINES_RE.sub("", pieces[0], count=1)
+        for k, piece in enumerate(pieces):
+            if k:
+                out.extend(("</p>", "", "<p>"))
+            lines = piece.split("\n")
+            out.append(lines[0])
+            for line in lines[1:]:
+                out.append("<br />")
+                out.append(line)
+    out[0] = out[0].lstrip()
+    out[-1] = out[-1].rstrip()
+    return ["", "<p>"] + out + ["</p>", ""]
+
+
+def _balance(toks, close_on_br, close_on_open):
+    """Shared walk behind fix_paragraphs_ending_with_br (close_on_br) and close_unclosed_paragraphs (close_on_open)."""
+    out = [toks[0]]
+    n = len(toks)
+    last_open = None  # out index of the last <p> tag
+    last_close = None  # out index of the last </p> tag
+    open_before_close = None  # last_open, if it was the tag right before last_close
+    in_paragraph = False
+    last_was_open = False
+    for i in range(1, n, 2):
+        tag = toks[i]
+        text = toks[i + 1]
+        first = tag[1]
+        if first in "pP" and P_OPEN_RE.match(tag):
+            if close_on_open and last_was_open:
+                out[-1] = out[-1].rstrip()
+                out.extend(("</p>", ""))
+            last_open = len(out)
+            in_paragraph = True
+            last_was_open = True
+        elif first == "/" and tag.lower() == "</p>" or (
+            close_on_br and in_paragraph and first in "bB" and BR_RE.match(tag)
+        ):
+            if first != "/":
+                tag = "</p>"
+                text = text.lstrip()
+            open_before_close = last_open if last_was_open else None
+            last_close = len(out)
+            in_paragraph = False
+            last_was_open = False
+        out.append(tag)
+        out.append(text)
+    # Last paragraph opened with attributes and closed only by the outer </p>: give it its own </p>
+    if (
+        close_on_open
+        and last_close == len(out) - 2
+        and open_before_close is not None
+        and _blank(out[-1])
+        and P_ATTR_OPEN_RE.match(out[open_before_close])
+    ):
+        out[last_close - 1] = out[last_close - 1].rstrip()
+        out[last_close:last_close] = ["</p>", ""]
+    return out
+
+
+def fix_paragraphs_ending_with_br(toks):
+    """<p ...>content<br> (unclosed) -> <p ...>content</p>."""
+    return _balance(toks, close_on_br=True, close_on_open=False)
+
+
+def close_unclosed_paragraphs(toks):
+    """Close <p> that are followed by another <p> or by the outer </p> with no </p> in between."""
+    return _balance(toks, close_on_br=False, close_on_open=True)
+
+
+def balance_paragraphs(toks):
+    """fix_paragraphs_ending_with_br then close_unclosed_paragraphs, in one walk."""
+    return _balance(toks, close_on_br=True, close_on_open=True)
+
+
+def _drop_empty_tags(toks):
+    out = [toks[0]]
+    for i in range(1, len(toks), 2):
+        if toks[i]:
+            out.append(toks[i])
+            out.append(toks[i + 1])
+        else:
+            out[-1] += toks[i + 1]
+    return out
+
+
+def convert_text_align_center_to_class(toks):
+    """Wrap h1-h6/p with style="text-align: center" in <div class="w-richtext-align-center">, dropping that style."""
+    out = [toks[0]]
+    pending = {}  # tag name -> (out index of the <div>, out index of the open tag, original open tag)
+    for i in range(1, len(toks), 2):
+        tag = toks[i]
+        if tag[1] == "/":
+            name = tag[2:-1].lower()
+            if name in pending:
+                del pending[name]
+                out.extend((tag, "", "</div>", toks[i + 1]))
+                continue
+        elif tag[1] in "hHpP":
+            m = CENTER_OPEN_RE.match(tag)
+            if m:
+                name = m.group(1).lower()
+                if name not in pending:
+                    attrs = CENTER_STYLE_RE.sub("", m.group(2)).strip()
+                    pending[name] = (len(out), len(out) + 2, tag)
+                    out.extend((CENTER_DIV, "", "<" + name + (" " + attrs if attrs else "") + ">", toks[i + 1]))
+                    continue
+        out.append(tag)
+        out.append(toks[i + 1])
+    if not pending:
+        return out
+    # No closing tag after these opens: leave them untouched
+    for div_index, open_index, original in pending.values():
+        out[div_index] = ""
+        out[open_index] = original
+    return _drop_empty_tags(out)
+
+
+def _strip_strong_in_heading(toks, n):
+    open_re = HEADING_OPEN_RES[n]
+    close = "</h%d>" % n
+    out = [toks[0]]
+    count = len(toks)
+    i = 1
+    while i < count:
+        if i + 2 < count and open_re.match(toks[i]) and _blank(toks[i + 1]) and toks[i + 2].lower() == "<strong>":
+            j = i + 4
+            while j + 2 < count:
+                if toks[j].lower() == "</strong>" and _blank(toks[j + 1]) and toks[j + 2].lower() == close:
+                    break
+                j += 2
+            else:
+                out.extend(toks[i:])
+                return out
+            content = toks[i + 3:j]
+            content[0] = content[0].lstrip()
+            content[-1] = content[-1].rstrip()
+            out.append(toks[i])
+            out.extend(content)
+            out.append(toks[j + 2])
+            out.append(toks[j + 3])
+            i = j + 4
+            continue
+        out.append(toks[i])
+        out.append(toks[i + 1])
+        i += 2
+    return out
+
+
+def strip_strong_from_headings(toks):
+    """<hN><strong>...</strong></hN> -> <hN>...</hN> for h1-h6."""
+    levels = set()
+    for i in range(1, len(toks) - 2, 2):
+        tag = toks[i]
+        if tag[1] in "hH" and toks[i + 2].lower() == "<strong>" and _blank(toks[i + 1]):
+            for n, open_re in HEADING_OPEN_RES.items():
+                if open_re.match(tag):
+                    levels.add(n)
+    for n in sorted(levels):
+        toks = _strip_strong_in_heading(toks, n)
+    return toks
+
+
+def remove_leading_br_in_post_body(toks):
+    """Strip the body and drop a leading <p><br /> or empty <p></p>."""
+    toks = list(toks)
+    toks[0] = toks[0].lstrip()
+    toks[-1] = toks[-1].rstrip()
+    if len(toks) > 3 and not toks[0] and toks[1].lower() == "<p>" and _blank(toks[2]) and BR_RE.fullmatch(toks[3]):
+        toks[1:5] = ["<p>", toks[4].lstrip()]
+    if len(toks) > 3 and not toks[0] and toks[1].lower() == "<p>" and _blank(toks[2]) and toks[3].lower() == "</p>":
+        toks[0:5] = [toks[4].lstrip()]
+    return toks
+
+
+# compact(): optional last stage (posts-to-webflow-csv.py --compact), not part of POST_BODY_RULES
+TAG_NAME_RE = re.compile(r"</?([A-Za-z][A-Za-z0-9]*)")
+STYLE_ATTR_RE = re.compile(r"""\s+style\s*=\s*(["'])(.*?)\1""", re.IGNORECASE | re.DOTALL)
+CENTER_RE = re.compile(r"text-align\s*:\s*center", re.IGNORECASE)
+BLOCK_TAGS = frozenset(
+    "address article aside blockquote dd div dl dt figcaption figure footer h1 h2 h3 h4 h5 h6 header hr li "
+    "nav ol p pre section table tbody td tfoot th thead tr ul".split()
+)
+# Elements dropped when empty: these when only whitespace is inside, inline ones when nothing is
+EMPTY_BLOCKS = frozenset("p h1 h2 h3 h4 h5 h6".split())
+EMPTY_INLINES = frozenset("b em i span strong u".split())
+EMPTY_CANDIDATES = EMPTY_BLOCKS | EMPTY_INLINES
+# Whitespace inside these renders as written: compact() leaves their content alone
+PROTECTED_TAGS = frozenset("code pre textarea".split())
+# Collapsible whitespace
+WHITESPACE = " \t\r\n\f"
+# Whitespace and no-break spaces: inside text a run of &nbsp; keeps its width, at a block edge it renders nothing
+PADDING = r"(?:&nbsp;|&#160;|&#xa0;|[ \t\r\n\f\xa0])+"
+PADDING_RE = re.compile(PADDING, re.IGNORECASE)
+LEADING_PADDING_RE = re.compile("^" + PADDING, re.IGNORECASE)
+TRAILING_PADDING_RE = re.compile(PADDING + "$", re.IGNORECASE)
+# First and last characters of padding
+PADDING_START = frozenset("&" + WHITESPACE + "\xa0")
+PADDING_END = frozenset(";" + WHITESPACE + "\xa0")
+# An element with nothing or only padding inside; any body with an empty element has one of these
+EMPTY_HINT_RE = re.compile(
+    r"<(p|h[1-6])\b[^>]*>" + PADDING + r"?</\1>|<(b|em|i|span|strong|u)\b[^>]*></\2>", re.IGNORECASE
+)
+
+
+@functools.lru_cache(maxsize=4096)
+def _tag_name(tag):
+    match = TAG_NAME_RE.match(tag)
+    return match.group(1).lower() if match else ""
+
+
+def _strip_styles(tag):
+    # Inline styles go, except a centered alignment convert_text_align_center_to_class left in place
+    return STYLE_ATTR_RE.sub(lambda m: m.group(0) if CENTER_RE.search(m.group(2)) else "", tag)
+
+
+def _drop_markup(toks):
+    """Drop comments (Gutenberg <!-- wp:... -->), inline styles, and <span>s left with no attributes."""
+    lowered = "".join(toks[1::2]).lower()
+    if "<!--" not in lowered and "style" not in lowered and "<span" not in lowered:
+        return toks
+    out = [toks[0]]
+    spans = []  # per open <span>: True if it was dropped
+    for i in range(1, len(toks), 2):
+        tag = toks[i]
+        if tag.startswith("<!--") and tag.endswith("-->"):
+            tag = ""
+        elif "style" in tag.lower():
+            tag = _strip_styles(tag)
+        name = _tag_name(tag)
+        if name == "span":
+            if tag[1] != "/":
+                spans.append(tag.lower() == "<span>")
+                if spans[-1]:
+                    tag = ""
+            elif spans and spans.pop():
+                tag = ""
+        if tag:
+            out.append(tag)
+            out.append(toks[i + 1])
+        else:
+            out[-1] += toks[i + 1]
+    return out
+
+
+def _is_empty(name, out, start):
+    """True if nothing that renders follows the open tag out[start] (the element closes after out[-1])."""
+    if len(out) != start + 2:
+        return False
+    return _is_padding(out[-1]) if name in EMPTY_BLOCKS else not out[-1]
+
+
+def _is_padding(text):
+    """True if text is empty or only whitespace and no-break spaces."""
+    return not text or PADDING_RE.fullmatch(text) is not None
+
+
+def _ends_line(out):
+    """True if out (ending in a <br> and whitespace) has inline content on the <br>'s line: a <br> right
+    after a block open, a block close or another <br> makes a blank line, even at the end of a block."""
+    if not _is_padding(out[-3]):
+        return True
+    name = _tag_name(out[-4]) if len(out) > 3 else "br"
+    return name != "br" and name not in BLOCK_TAGS
+
+
+def _drop_empty_elements(toks):
+    """A <br> ending a block's last line, and empty paragraphs, headings and inline wrappers, outside
+    <pre>, <code> and <textarea>."""
+    if "<br" not in "".join(toks[1::2]).lower() and not EMPTY_HINT_RE.search("".join(toks)):
+        return toks
+    out = [toks[0]]
+    stack = []  # (name, index in out) of open elements that may turn out empty
+    open_count = dict.fromkeys(EMPTY_CANDIDATES, 0)  # per name, how many are on the stack
+    protected = 0
+    for i in range(1, len(toks), 2):
+        tag = toks[i]
+        name = _tag_name(tag)
+        closing = tag[1] == "/"
+        if protected:
+            pass
+        elif name == "br":
+            tag = "<br>"
+        elif closing and name in BLOCK_TAGS:
+            # The line break closing a block's last line breaks nothing
+            if len(out) > 2 and out[-2] == "<br>" and _is_padding(out[-1]) and _ends_line(out):
+                out[-3] += out[-1]
+                del out[-2:]
+        if name in EMPTY_CANDIDATES and not protected:
+            if not closing:
+                if not tag.endswith("/>"):
+                    stack.append((name, len(out)))
+                    open_count[name] += 1
+            elif stack and stack[-1][0] == name:
+                _, start = stack.pop()
+                open_count[name] -= 1
+                if _is_empty(name, out, start):
+                    del out[start:]
+                    out[-1] += toks[i + 1]
+                    continue
+            elif open_count[name]:
+                # Closes an element further down: the ones opened inside it are left unclosed
+                while True:
+                    open_name, _ = stack.pop()
+                    open_count[open_name] -= 1
+                    if open_name == name:
+                        break
+        if name in PROTECTED_TAGS and not tag.endswith("/>"):
+            protected = max(protected + (-1 if closing else 1), 0)
+        out.append(tag)
+        out.append(toks[i + 1])
+    return out
+
+
+def _trim_block_edges(toks):
+    """Drop whitespace and &nbsp; padding at the start and end of blocks and between them, outside <pre>, <code>
+    and <textarea>."""
+    out = list(toks)
+    protected = 0
+    last = len(toks) - 1
+    for k in range(0, len(toks), 2):
+        previous = _tag_name(toks[k - 1]) if k else None
+        if previous in PROTECTED_TAGS and not toks[k - 1].endswith("/>"):
+            protected = max(protected + (-1 if toks[k - 1][1] == "/" else 1), 0)
+        text = toks[k]
+        if protected or not text:
+            continue
+        if text[0] in PADDING_START and (previous is None or previous in BLOCK_TAGS):
+            text = LEADING_PADDING_RE.sub("", text, count=1)
+        if text and text[-1] in PADDING_END and (k == last or _tag_name(toks[k + 1]) in BLOCK_TAGS):
+            text = TRAILING_PADDING_RE.sub("", text, count=1)
+        out[k] = text
+    return out
+
+
+def compact(toks):
+    """Smaller rich text: no comments, inline styles (bar centering), bare <span>s, empty paragraphs, headings or
+    inline wrappers, <br>s ending a block, or whitespace and &nbsp; padding at block edges. Paragraphs and headings
+    holding only &nbsp; go too. Runs of <br> and of &nbsp; inside text are kept, as they render as blank lines and
+    fixed-width gaps, and so is everything inside <pre>, <code> and <textarea>."""
+    return _trim_block_edges(_drop_empty_elements(_drop_markup(toks)))
+
+
+# Order of the Post body chain in posts-to-webflow-csv.py
+POST_BODY_RULES = (
+    strip_first_image,
+    convert_font_size_to_headings,
+    ensure_html_paragraphs,
+    balance_paragraphs,
+    convert_text_align_center_to_class,
+    strip_strong_from_headings,
+    remove_leading_br_in_post_body,
+)
+
+
+# String-level rules of the original chain, for bodies the tokenizer cannot split the way they read them:
+# in '<p style="a<br />' the regexes see both a <p ...> (its [^>]* runs over the '<') and a <br />
+TEXT_IMG_RE = re.compile(r"<img\b[^>]*>", re.IGNORECASE)
+TEXT_FONT_HEADING_RES = tuple(
+    (re.compile(opener + r"([\s\S]*?)" + closer, re.IGNORECASE), r"<%s>\1</%s>\n\n" % (heading, heading))
+    for opener, closer, heading in (
+        (r"<strong>\s*" + FONT_PLUS2_RE.pattern, r"</font>\s*</strong>", "h2"),
+        (r"<strong>\s*" + FONT_PLUS1_RE.pattern, r"</font>\s*</strong>", "h3"),
+        (FONT_PLUS2_RE.pattern, "</font>", "h2"),
+        (FONT_PLUS1_RE.pattern, "</font>", "h3"),
+        (P_X_LARGE_RE.pattern, "</p>", "h2"),
+        (P_LARGE_RE.pattern, "</p>", "h3"),
+    )
+)
+TEXT_HEADING_BREAK_RE = re.compile(r"(</h[23]>)([^\s<\n])")
+TEXT_P_BR_RE = re.compile(r"(<p(?:\s[^>]*)?>)((?:(?!</p>).)*?)<br\s*/?>\s*", re.IGNORECASE | re.DOTALL)
+TEXT_P_P_RE = re.compile(r"(<p(?:\s[^>]*)?>)((?:(?!</p>).)*?)(<p(?:\s[^>]*)?>)", re.IGNORECASE | re.DOTALL)
+TEXT_LAST_P_RE = re.compile(r"(<p\s[^>]+>)((?:(?!</p>).)*?)(</p>\s*$)", re.IGNORECASE | re.DOTALL)
+TEXT_CENTER_RES = tuple(
+    (
+        tag,
+        re.compile(
+            r"(<" + tag + r")(\s+[^>]*style=[\"'][^\"']*?text-align\s*:\s*center[^\"']*[\"'][^>]*)>([\s\S]*?)(</"
+            + tag
+            + r">)",
+            re.IGNORECASE,
+        ),
+    )
+    for tag in ("h1", "h2", "h3", "h4", "h5", "h6", "p")
+)
+TEXT_STRONG_HEADING_RES = tuple(
+    re.compile(r"(<h%d\b[^>]*>)\s*<strong>\s*([\s\S]*?)\s*</strong>\s*(</h%d>)" % (n, n), re.IGNORECASE)
+    for n in range(1, 7)
+)
+TEXT_LEADING_BR_RE = re.compile(r"^<p>\s*<br\s*/?>\s*", re.IGNORECASE)
+TEXT_LEADING_EMPTY_P_RE = re.compile(r"^<p>\s*</p>\s*", re.IGNORECASE)
+
+
+def _strip_first_image_text(text):
+    return TEXT_IMG_RE.sub("", text, count=1)
+
+
+def _convert_font_size_to_headings_text(text):
+    for pattern, heading in TEXT_FONT_HEADING_RES:
+        text = pattern.sub(heading, text)
+    return TEXT_HEADING_BREAK_RE.sub(r"\1\n\n\2", text)
+
+
+def _ensure_html_paragraphs_text(text):
+    stripped = text.strip()
+    if not stripped or stripped.startswith("<p>") and stripped.endswith("</p>"):
+        return text
+    return _ensure_paragraphs_in_text(text)
+
+
+def _close_with_rstrip(m):
+    return m.group(1) + m.group(2).rstrip() + "</p>" + m.group(3)
+
+
+def _fix_paragraphs_ending_with_br_text(text):
+    return TEXT_P_BR_RE.sub(r"\1\2</p>", text)
+
+
+def _close_unclosed_paragraphs_text(text):
+    previous = None
+    while previous != text:
+        previous = text
+        text = TEXT_P_P_RE.sub(_close_with_rstrip, text)
+    return TEXT_LAST_P_RE.sub(_close_with_rstrip, text)
+
+
+def _balance_paragraphs_text(text):
+    return _close_unclosed_paragraphs_text(_fix_paragraphs_ending_with_br_text(text))
+
+
+def _convert_text_align_center_to_class_text(text):
+    for tag, pattern in TEXT_CENTER_RES:
+        def wrap(m, tag=tag):
+            attrs = CENTER_STYLE_RE.sub("", m.group(2)).strip()
+            return CENTER_DIV + "<" + tag + (" " + attrs if attrs else "") + ">" + m.group(3) + m.group(4) + "</div>"
+        text = pattern.sub(wrap, text)
+    return text
+
+
+def _strip_strong_from_headings_text(text):
+    for pattern in TEXT_STRONG_HEADING_RES:
+        text = pattern.sub(r"\1\2\3", text)
+    return text
+
+
+def _remove_leading_br_in_post_body_text(text):
+    return TEXT_LEADING_EMPTY_P_RE.sub("", TEXT_LEADING_BR_RE.sub("<p>", text.strip()))
+
+
+# Token rule -> its string-level original; rules missing here (compact) run on a fresh tokenization
+TEXT_RULES = {
+    strip_first_image: _strip_first_image_text,
+    convert_font_size_to_headings: _convert_font_size_to_headings_text,
+    ensure_html_paragraphs: _ensure_html_paragraphs_text,
+    fix_paragraphs_ending_with_br: _fix_paragraphs_ending_with_br_text,
+    close_unclosed_paragraphs: _close_unclosed_paragraphs_text,
+    balance_paragraphs: _balance_paragraphs_text,
+    convert_text_align_center_to_class: _convert_text_align_center_to_class_text,
+    strip_strong_from_headings: _strip_strong_from_headings_text,
+    remove_leading_br_in_post_body: _remove_leading_br_in_post_body_text,
+}
+
+
+def needs_text_rules(toks):
+    """True if a text token holds the start of a tag, i.e. the body must go through TEXT_RULES."""
+    text = "\0".join(toks[::2])
+    return "<" in text and STRAY_TAG_RE.search(text) is not None
+
+
+def apply_text_rule(rule, html):
+    """Apply one rule to an HTML string through its string-level original (TEXT_RULES)."""
+    text_rule = TEXT_RULES.get(rule)
+    return text_rule(html) if text_rule is not None else "".join(rule(tokenize(html)))
+
+
+def rewrite(html, rules=POST_BODY_RULES):
+    """Tokenize html once, apply rules in order and return the resulting HTML string."""
+    toks = tokenize(str(html))
+    for k, rule in enumerate(rules):
+        if needs_text_rules(toks):
+            # From here on (a rule can leave a tag cut short, e.g. a newline inside one becoming </p>)
+            html = "".join(toks)
+            for rule in rules[k:]:
+                html = apply_text_rule(rule, html)
+            return html
+        toks = rule(toks)
+    return "".join(toks)
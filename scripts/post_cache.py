@@ -0,0 +1,140 @@
+"""On-disk cache of converted Post body/Post summary values, so re-runs only transform changed posts.
+
+Entries are keyed by transform version + post identity + a hash of the post's Content and Excerpt.
+The version is a hash of the transform source files, so editing any transform invalidates the cache
+automatically (stale versions are dropped when the cache is opened). The size limit is enforced at
+every periodic commit during a run, not just at the end, so a large first run or a crash cannot leave
+the cache at the size of the whole corpus; SQLite reuses the freed pages for later entries.
+"""
+import hashlib
+import os
+import sqlite3
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+DEFAULT_CACHE = os.path.join(PROJECT_DIR, ".webflow-cache.sqlite")
+DEFAULT_MAX_MB = 512
+COMMIT_EVERY = 1000
+
+
+def source_version(*paths):
+    """Hash the given source files into a short transform-pipeline version string."""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def add_cache_arguments(parser):
+    """Add --cache and --cache-max-mb to an argparse parser."""
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        const=DEFAULT_CACHE,
+        metavar="PATH",
+        help=f"reuse converted bodies of unchanged posts from a SQLite cache (default path {DEFAULT_CACHE})",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=DEFAULT_MAX_MB,
+        help=f"evict least recently used entries above this size, checked as the run goes (default {DEFAULT_MAX_MB})",
+    )
+
+
+class PostCache:
+    """SQLite-backed map of post key -> (Post body, Post summary) with LRU size-based eviction."""
+
+    def __init__(self, path, version, max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        self.version = version
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._pending = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS posts ("
+            " key TEXT PRIMARY KEY, version TEXT, body TEXT, summary TEXT, size INTEGER, last_used INTEGER)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS posts_last_used ON posts (last_used)")
+        self.conn.execute("DELETE FROM posts WHERE version != ?", (version,))
+        (self._size,) = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM posts").fetchone()
+        # Each run gets a higher stamp; entries read or written in this run are the most recently used
+        (last_run,) = self.conn.execute("SELECT COALESCE(MAX(last_used), 0) FROM posts").fetchone()
+        self.run = last_run + 1
+        self.conn.commit()
+
+    def key(self, row):
+        """Cache key for an export row: version, post ID (or slug) and a hash of Content + Excerpt."""
+        identity = (row.get("ID") or "").strip() or (row.get("Slug") or "").strip()
+        digest = hashlib.sha256()
+        for field in ("Content", "Excerpt"):
+            digest.update((row.get(field) or "").encode("utf-8"))
+            digest.update(b"\0")
+        return f"{self.version}:{identity}:{digest.hexdigest()}"
+
+    def get(self, key):
+        """Return (body, summary) for key, or None on a miss."""
+        found = self.conn.execute("SELECT body, summary FROM posts WHERE key = ?", (key,)).fetchone()
+        if found is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.conn.execute("UPDATE posts SET last_used = ? WHERE key = ?", (self.run, key))
+        self._touch()
+        return found
+
+    def put(self, key, body, summary):
+        size = len(body.encode("utf-8")) + len(summary.encode("utf-8"))
+        self.conn.execute(
+            "INSERT OR REPLACE INTO posts (key, version, body, summary, size, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, self.version, body, summary, size, self.run),
+        )
+        self._size += size  # may count a replaced entry twice until _evict() recounts
+        self._touch()
+
+    def _touch(self):
+        self._pending += 1
+        if self._pending >= COMMIT_EVERY:
+            if self._size > self.max_bytes:
+                self._evict()
+            self.conn.commit()
+            self._pending = 0
+
+    def _evict(self):
+        (total,) = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM posts").fetchone()
+        self._size = total
+        if total <= self.max_bytes:
+            return
+        doomed = []
+        # Least recently used run first; within a run, the entries written first
+        for key, size in self.conn.execute("SELECT key, size FROM posts ORDER BY last_used, rowid"):
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        self.conn.executemany("DELETE FROM posts WHERE key = ?", doomed)
+        self.evicted += len(doomed)
+        self._size = total
+
+    def close(self):
+        """Evict down to max_bytes, commit and close."""
+        self._evict()
+        self.conn.commit()
+        self.conn.close()
+
+    def report(self):
+        """One-line hit/miss summary for the end of a run."""
+        lookups = self.hits + self.misses
+        rate = f" ({100 * self.hits / lookups:.0f}% hits)" if lookups else ""
+        evicted = f", evicted {self.evicted}" if self.evicted else ""
+        return f"Cache: {self.hits} hits, {self.misses} misses{rate}{evicted}"
+
+
+def open_cache(args, version):
+    """Open the cache selected by --cache/--cache-max-mb, or return None when caching is off."""
+    if not args.cache:
+        return None
+    return PostCache(args.cache, version, max_bytes=int(args.cache_max_mb * 1024 * 1024))
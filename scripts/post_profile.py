@@ -0,0 +1,154 @@
+"""Per-stage profile of the posts conversion, for posts-to-webflow-csv.py --profile.
+
+The Post body rules are run one by one through Profile.rewrite, which times each rule and records
+UTF-8 bytes in/out. Substitutions are counted afterwards by comparing the token lists before and after
+the rule (see SUBSTITUTIONS), so the rules themselves carry no instrumentation and nothing is paid
+when profiling is off.
+"""
+import heapq
+import json
+import time
+
+import post_body
+
+
+def _added(*tags):
+    return lambda before, after: sum(after.count(tag) - before.count(tag) for tag in tags)
+
+
+def _heading_breaks(toks):
+    return sum(
+        1 for i in range(1, len(toks), 2) if toks[i] in ("</h2>", "</h3>") and toks[i + 1].startswith("\n\n")
+    )
+
+
+# Rule name -> (unit, count(toks before, toks after))
+SUBSTITUTIONS = {
+    "strip_first_image": ("images removed", lambda before, after: (len(before) - len(after)) // 2),
+    "convert_font_size_to_headings": (
+        "headings created + line breaks added",
+        lambda before, after: _added("<h2>", "<h3>")(before, after) + _heading_breaks(after) - _heading_breaks(before),
+    ),
+    "ensure_html_paragraphs": ("<p>/<br /> tags added", _added("<p>", "<br />")),
+    "balance_paragraphs": ("</p> tags added", _added("</p>")),
+    "fix_paragraphs_ending_with_br": ("</p> tags added", _added("</p>")),
+    "close_unclosed_paragraphs": ("</p> tags added", _added("</p>")),
+    "convert_text_align_center_to_class": ("elements wrapped", _added(post_body.CENTER_DIV)),
+    "strip_strong_from_headings": ("headings unwrapped", lambda before, after: (len(before) - len(after)) // 4),
+    "remove_leading_br_in_post_body": ("bodies trimmed", lambda before, after: int(len(after) < len(before))),
+}
+
+
+def _size(toks):
+    return len("".join(toks).encode("utf-8"))
+
+
+class Profile:
+    """Cumulative time, calls, bytes in/out and substitutions per stage, plus the slowest posts."""
+
+    def __init__(self, top=20):
+        self.top = top
+        self.stages = {}
+        self.slowest = []  # min-heap of (seconds, post), at most `top` long
+        self.posts = 0
+        self.seconds = 0.0
+
+    def _stage(self, name, seconds, bytes_in, bytes_out, substitutions=0):
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = {"calls": 0, "seconds": 0.0, "bytes_in": 0, "bytes_out": 0}
+            if name in SUBSTITUTIONS:
+                stage["substitutions"] = 0
+                stage["substitution_unit"] = SUBSTITUTIONS[name][0]
+        stage["calls"] += 1
+        stage["seconds"] += seconds
+        stage["bytes_in"] += bytes_in
+        stage["bytes_out"] += bytes_out
+        if substitutions:
+            stage["substitutions"] += substitutions
+
+    def call(self, name, func, text):
+        """Run a str -> str stage (e.g. strip_all_html) and record it."""
+        start = time.perf_counter()
+        result = func(text)
+        seconds = time.perf_counter() - start
+        self._stage(name, seconds, len((text or "").encode("utf-8")), len(str(result or "").encode("utf-8")))
+        return result
+
+    def rewrite(self, html, rules=post_body.POST_BODY_RULES):
+        """post_body.rewrite with each step timed and measured."""
+        html = str(html)
+        start = time.perf_counter()
+        toks = post_body.tokenize(html)
+        size = len(html.encode("utf-8"))
+        self._stage("tokenize", time.perf_counter() - start, size, size)
+        for k, rule in enumerate(rules):
+            if post_body.needs_text_rules(toks):
+                return self._rewrite_text("".join(toks), rules[k:])
+            start = time.perf_counter()
+            after = rule(toks)
+            seconds = time.perf_counter() - start
+            count = SUBSTITUTIONS[rule.__name__][1](toks, after) if rule.__name__ in SUBSTITUTIONS else 0
+            size_after = _size(after)
+            self._stage(rule.__name__, seconds, size, size_after, count)
+            toks, size = after, size_after
+        start = time.perf_counter()
+        result = "".join(toks)
+        self._stage("join", time.perf_counter() - start, size, size)
+        return result
+
+    def _rewrite_text(self, html, rules):
+        # The rules post_body.rewrite runs at string level; substitutions are counted on tokenizations
+        size = len(html.encode("utf-8"))
+        for rule in rules:
+            start = time.perf_counter()
+            after = post_body.apply_text_rule(rule, html)
+            seconds = time.perf_counter() - start
+            count = 0
+            if rule.__name__ in SUBSTITUTIONS:
+                count = SUBSTITUTIONS[rule.__name__][1](post_body.tokenize(html), post_body.tokenize(after))
+            size_after = len(after.encode("utf-8"))
+            self._stage(rule.__name__, seconds, size, size_after, count)
+            html, size = after, size_after
+        return html
+
+    def post(self, name, seconds):
+        """Record one post's total conversion time."""
+        self.posts += 1
+        self.seconds += seconds
+        if len(self.slowest) < self.top:
+            heapq.heappush(self.slowest, (seconds, name))
+        elif seconds > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, (seconds, name))
+
+    def report(self):
+        """The profile as a JSON-serializable dict, stages slowest first."""
+        stages = {}
+        for name, stage in sorted(self.stages.items(), key=lambda item: -item[1]["seconds"]):
+            stages[name] = dict(stage, seconds=round(stage["seconds"], 6))
+        return {
+            "posts": self.posts,
+            "seconds": round(self.seconds, 6),
+            "stages": stages,
+            "slowest_posts": [
+                {"post": name, "seconds": round(seconds, 6)} for seconds, name in sorted(self.slowest, reverse=True)
+            ],
+        }
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+
+    def summary(self, limit=5):
+        """A few lines for the console: stages by time and the slowest posts."""
+        report = self.report()
+        lines = [f"Profile: {report['posts']} posts converted in {report['seconds']:.3f}s"]
+        for name, stage in report["stages"].items():
+            subs = f", {stage['substitutions']} {stage['substitution_unit']}" if "substitutions" in stage else ""
+            lines.append(
+                f"  {name:36} {stage['seconds']:9.3f}s {stage['calls']:>8} calls "
+                f"{stage['bytes_in'] / 1e6:9.2f} MB -> {stage['bytes_out'] / 1e6:.2f} MB{subs}"
+            )
+        for entry in report["slowest_posts"][:limit]:
+            lines.append(f"  slow: {entry['post']} {entry['seconds'] * 1000:.1f} ms")
+        return lines
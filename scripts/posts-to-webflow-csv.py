@@ -1,13 +1,43 @@
 #!/usr/bin/env python3
-"""Convert WordPress Posts export CSV to Webflow blog collection CSV."""
+"""Convert a WordPress Posts export (CSV, or a WXR XML file) to Webflow blog collection CSV."""
+import argparse
+import contextlib
 import csv
+import functools
+import io
+import itertools
+import mmap
 import os
 import re
+import shutil
+import sys
+import time
+from collections import deque
+
+import checkpoint
+import compressed
+import export_index
+import image_manifest
+import post_body
+import post_cache
+import post_profile
+import search_index
+import webflow_delta
+import webflow_shards
+import wp_export
+import wxr
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
 INPUT_CSV = os.path.join(PROJECT_DIR, "Posts-Export-2026-February-03-0219.csv")
 OUTPUT_CSV = os.path.join(PROJECT_DIR, "blog-webflow.csv")
+PROFILE_JSON = os.path.join(PROJECT_DIR, "posts-profile.json")
+QUARANTINE_CSV = os.path.join(PROJECT_DIR, "quarantined-posts.csv")
+SEARCH_INDEX_DIR = os.path.join(PROJECT_DIR, "dist", "search-index")
+IMAGE_MANIFEST_JSON = os.path.join(PROJECT_DIR, "image-manifest.json")
+COMPACT_REPORT_CSV = os.path.join(PROJECT_DIR, "post-body-compaction.csv")
+# Cached Post body/summary values are dropped whenever the transforms (this file or post_body.py) change
+TRANSFORM_VERSION = post_cache.source_version(post_body.__file__, os.path.abspath(__file__))
 
 WEBFLOW_HEADERS = [
     "Name",
@@ -55,7 +85,10 @@ def strip_all_html(html):
     """Remove all HTML tags; return plain text. Collapses whitespace between tags."""
     if not html:
         return ""
-    text = re.sub(r"<[^>]+>", " ", str(html), flags=re.IGNORECASE)
+    text = str(html)
+    # No tag can start after the last '>'; left to the regex, each unclosed '<' there rescans to the end
+    end = text.rfind(">") + 1
+    text = re.sub(r"<[^>]+>", " ", text[:end], flags=re.IGNORECASE) + text[end:]
     text = re.sub(r"\s+", " ", text).strip()
     return text
 
@@ -64,136 +97,49 @@ def strip_first_image(html):
     """Remove only the first <img> tag from HTML (so it can be used as main/Image field only)."""
     if not html:
         return ""
-    return re.sub(r"<img\b[^>]*>", "", str(html), count=1, flags=re.IGNORECASE)
+    return post_body.rewrite(html, (post_body.strip_first_image,))
 
 
 def convert_font_size_to_headings(html):
     """Convert <font size=\"+2\"> and +1 (and WordPress large-font classes) to <h2>/<h3>, with line break after so following text starts on a new line."""
     if not html:
         return ""
-    text = str(html)
-    # <strong><font size="+2">...</font></strong> or size='+2' -> <h2>...</h2> + paragraph break
-    text = re.sub(
-        r'<strong>\s*<font\s+size=["\']\+2["\']\s*>([\s\S]*?)</font>\s*</strong>',
-        r'<h2>\1</h2>\n\n',
-        text,
-        flags=re.IGNORECASE,
-    )
-    text = re.sub(
-        r'<strong>\s*<font\s+size=["\']\+1["\']\s*>([\s\S]*?)</font>\s*</strong>',
-        r'<h3>\1</h3>\n\n',
-        text,
-        flags=re.IGNORECASE,
-    )
-    # Standalone <font size="+2">...</font> (without strong)
-    text = re.sub(
-        r'<font\s+size=["\']\+2["\']\s*>([\s\S]*?)</font>',
-        r'<h2>\1</h2>\n\n',
-        text,
-        flags=re.IGNORECASE,
-    )
-    text = re.sub(
-        r'<font\s+size=["\']\+1["\']\s*>([\s\S]*?)</font>',
-        r'<h3>\1</h3>\n\n',
-        text,
-        flags=re.IGNORECASE,
-    )
-    # WordPress block classes: has-x-large-font-size -> h2, has-large-font-size -> h3
-    text = re.sub(
-        r'<p\s+class=["\']has-x-large-font-size["\'][^>]*>([\s\S]*?)</p>',
-        r'<h2>\1</h2>\n\n',
-        text,
-        flags=re.IGNORECASE,
-    )
-    text = re.sub(
-        r'<p\s+class=["\']has-large-font-size["\'][^>]*>([\s\S]*?)</p>',
-        r'<h3>\1</h3>\n\n',
-        text,
-        flags=re.IGNORECASE,
-    )
-    # Ensure line break after headings when source had none (e.g. </h2>Burnout -> </h2>\n\nBurnout)
-    text = re.sub(r'(</h[23]>)([^\s<\n])', r'\1\n\n\2', text)
-    return text
+    return post_body.rewrite(html, (post_body.convert_font_size_to_headings,))
 
 
 def ensure_html_paragraphs(text):
     """Convert newline-separated paragraphs into <p>...</p> so they render in HTML/Webflow."""
     if not text or not str(text).strip():
         return "" if text is None else text
-    text = str(text)
-    # Only skip if content is already wrapped in <p> (stray </p> from WordPress blocks shouldn't skip)
-    if text.strip().startswith("<p>") and text.strip().endswith("</p>"):
-        return text
-    # Double newlines = paragraph break (handle \r\n as one newline)
-    text = re.sub(r"(\r?\n)(\s*\r?\n)+", "</p><p>", text)
-    # Single newline after sentence-ending punctuation (.[!?]) before capital = paragraph break
-    text = re.sub(r"([.!?])\s*(\r?\n)+(\s*)([A-Z])", r"\1</p><p>\2\3", text)
-    # Single newlines = line break within paragraph (normalize \r\n to \n first for consistency)
-    text = text.replace("\r\n", "\n").replace("\r", "\n")
-    # Don't turn newlines after block-end tags into <br /> (they're structural, not in-paragraph breaks)
-    text = re.sub(
-        r"(</p>|</h[1-6]>|</div>|</li>|</ul>|</ol>)\s*\n",
-        r"\1",
-        text,
-        flags=re.IGNORECASE,
-    )
-    text = re.sub(r"\n", "<br />", text)
-    return "<p>" + text.strip() + "</p>"
+    return post_body.rewrite(text, (post_body.ensure_html_paragraphs,))
 
 
 def remove_leading_br_in_post_body(html):
     """Remove leading <p><br /> or <p></p> or <p><br></p> so body doesn't start with empty paragraph."""
     if not html:
         return html
-    text = str(html).strip()
-    # <p><br /> or <p><br> or <p><br/> (with optional /) at start
-    text = re.sub(r"^<p>\s*<br\s*/?>\s*", "<p>", text, flags=re.IGNORECASE)
-    # <p></p> at start (empty first paragraph)
-    text = re.sub(r"^<p>\s*</p>\s*", "", text, flags=re.IGNORECASE)
-    return text
+    return post_body.rewrite(html, (post_body.remove_leading_br_in_post_body,))
 
 
 def fix_paragraphs_ending_with_br(html):
     """Fix WordPress-style <p ...>...content<br> (unclosed) by replacing trailing <br> with </p>."""
     if not html:
         return html
-    text = str(html)
-    # Match <p> or <p attr="...">, then content (not crossing </p>), then <br> or <br />; replace trailing br with </p>
-    text = re.sub(
-        r"(<p(?:\s[^>]*)?>)((?:(?!</p>).)*?)<br\s*/?>\s*",
-        r"\1\2</p>",
-        text,
-        flags=re.IGNORECASE | re.DOTALL,
-    )
-    return text
+    return post_body.rewrite(html, (post_body.fix_paragraphs_ending_with_br,))
 
 
 def close_unclosed_paragraphs(html):
     """Close <p> that are followed by another <p> or by the outer </p> with no </p> in between."""
     if not html:
         return html
-    text = str(html)
-    # Use a replacement that rstrips content so </p> sits right after the text
-    def _repl(m):
-        return m.group(1) + m.group(2).rstrip() + "</p>" + m.group(3)
-    # 1) Repeatedly: <p ...>content<p ...> (no </p> in between) -> <p ...>content</p><p ...>
-    prev = None
-    while prev != text:
-        prev = text
-        text = re.sub(
-            r"(<p(?:\s[^>]*)?>)((?:(?!</p>).)*?)(<p(?:\s[^>]*)?>)",
-            _repl,
-            text,
-            flags=re.IGNORECASE | re.DOTALL,
-        )
-    # 2) Last paragraph: <p attr="...">content</p> at end (unclosed inner p before outer </p>)
-    text = re.sub(
-        r"(<p\s[^>]+>)((?:(?!</p>).)*?)(</p>\s*$)",
-        lambda m: m.group(1) + m.group(2).rstrip() + "</p>" + m.group(3),
-        text,
-        flags=re.IGNORECASE | re.DOTALL,
-    )
-    return text
+    return post_body.rewrite(html, (post_body.close_unclosed_paragraphs,))
+
+
+def balance_paragraphs(html):
+    """close_unclosed_paragraphs(fix_paragraphs_ending_with_br(html)) in one linear walk (unless a tag is cut short)."""
+    if not html:
+        return html
+    return post_body.rewrite(html, (post_body.balance_paragraphs,))
 
 
 def convert_text_align_center_to_class(html):
@@ -201,116 +147,608 @@ def convert_text_align_center_to_class(html):
     preserves center alignment (same class it uses for centered images)."""
     if not html:
         return html
-    text = str(html)
-
-    def strip_center_style(attrs):
-        attrs = re.sub(
-            r'\s*style=["\'][^"\']*?text-align\s*:\s*center[^"\']*["\']',
-            "",
-            attrs,
-            flags=re.IGNORECASE,
-        ).strip()
-        return (" " + attrs) if attrs else ""
-
-    for tag in ["h1", "h2", "h3", "h4", "h5", "h6", "p"]:
-        pattern = (
-            r"(<"
-            + tag
-            + r")(\s+[^>]*style=[\"'][^\"']*?text-align\s*:\s*center[^\"']*[\"'][^>]*)>"
-            r"([\s\S]*?)"
-            r"(</"
-            + tag
-            + r">)"
-        )
-
-        def repl(m, t=tag):
-            open_attrs = strip_center_style(m.group(2))
-            attrs_str = open_attrs.strip()
-            inner = "<" + t + (" " + attrs_str if attrs_str else "") + ">" + m.group(3) + m.group(4)
-            return '<div class="w-richtext-align-center">' + inner + "</div>"
-
-        text = re.sub(pattern, lambda m, t=tag: repl(m, t), text, flags=re.IGNORECASE)
-    return text
+    return post_body.rewrite(html, (post_body.convert_text_align_center_to_class,))
 
 
 def strip_strong_from_headings(html):
     """Remove redundant <strong>...</strong> inside headings (h1–h6)."""
     if not html:
         return html
-    text = str(html)
-    for tag in ["h1", "h2", "h3", "h4", "h5", "h6"]:
-        # <hN>...<strong>...</strong>...</hN> -> <hN>......</hN> (strip inner strong)
-        text = re.sub(
-            r"(<" + tag + r"\b[^>]*>)\s*<strong>\s*([\s\S]*?)\s*</strong>\s*(</" + tag + r">)",
-            r"\1\2\3",
-            text,
-            flags=re.IGNORECASE,
-        )
-    return text
+    return post_body.rewrite(html, (post_body.strip_strong_from_headings,))
 
 
-def main():
-    with open(INPUT_CSV, "r", encoding="utf-8", newline="") as f_in:
-        reader = csv.DictReader(f_in)
-        rows = list(reader)
-        if not rows:
-            print("No rows in input CSV")
-            return
-
-    # Build header -> index from first row keys (DictReader uses first row as fieldnames)
-    fieldnames = list(rows[0].keys())
-
-    out_rows = []
-    for row in rows:
-        title = row.get("Title", "").strip()
-        if not title:
-            continue
-
-        # Author: "Author First Name" + " " + "Author Last Name", fallback to "Author Username"
-        first = (row.get("Author First Name") or "").strip()
-        last = (row.get("Author Last Name") or "").strip()
-        author = f"{first} {last}".strip() if (first or last) else (row.get("Author Username") or "").strip()
-
-        # Image: first image in post body (used only as main image); fallback to first "Image URL" from export
-        content_raw = row.get("Content", "")
-        image_url = first_image_url_from_html(content_raw) or first_or_empty(row.get("Image URL", ""))
-        # Remove first image from body so it appears only in Image field
-        content_without_first_img = strip_first_image(content_raw)
-        # Convert font size +2/+1 (and WordPress large-font classes) to h2/h3, ensure line break after headings
-        content_without_first_img = convert_font_size_to_headings(content_without_first_img)
-
-        # Category: all categories (pipe-separated in source → semicolon-separated for Webflow multi-reference)
-        category = categories_for_webflow(row.get("Categories", ""))
-
-        # Featured: not in export; default false. Could add logic later (e.g. sticky).
-        featured = "false"
-
-        out_rows.append({
-            "Name": title,
-            "Slug": (row.get("Slug") or "").strip(),
-            "Author": author or "Little Bee Speech",
-            "Date of publication": (row.get("Date") or "").strip(),
-            "Category": category,
-            "Image": image_url,
-            "Post body": remove_leading_br_in_post_body(
-                strip_strong_from_headings(
-                    convert_text_align_center_to_class(
-                        close_unclosed_paragraphs(
-                            fix_paragraphs_ending_with_br(ensure_html_paragraphs(content_without_first_img))
-                        )
-                    )
+def compact_post_body(html):
+    """Smaller Post body HTML that renders the same: no comments, stray styles, empty elements or edge whitespace."""
+    if not html:
+        return html
+    return post_body.rewrite(html, (post_body.compact,))
+
+
+def reference_slugs(row, authors, categories):
+    """(Author, Category) reference values for an export row, recording its author and categories in the
+    wp_export.SlugIndexes as it goes, so the slugs match authors-webflow.csv and categories-webflow.csv."""
+    return wp_export.add_author(authors, row), "; ".join(wp_export.add_categories(categories, row))
+
+
+def convert_row(row, cached=None, profile=None):
+    """Convert one export row to a Webflow blog row dict, or None if the post has no title.
+
+    cached is an optional (Post body, Post summary) pair from post_cache to use instead of running the transforms.
+    profile is an optional post_profile.Profile that times and measures each transform.
+    Author and Category hold names here; write_blog_csv replaces them with slugs (see reference_slugs).
+    """
+    title = row.get("Title", "").strip()
+    if not title:
+        return None
+
+    # Author: "Author First Name" + " " + "Author Last Name", fallback to "Author Username"
+    author = wp_export.author_name(row)
+
+    # Image: first image in post body (used only as main image); fallback to first "Image URL" from export
+    content_raw = row.get("Content", "")
+    image_url = first_image_url_from_html(content_raw) or first_or_empty(row.get("Image URL", ""))
+
+    # Category: all categories (pipe-separated in source → semicolon-separated for Webflow multi-reference)
+    category = categories_for_webflow(row.get("Categories", ""))
+
+    # Featured: not in export; default false. Could add logic later (e.g. sticky).
+    featured = "false"
+
+    if cached:
+        body, summary = cached
+    elif profile is not None:
+        body = profile.rewrite(content_raw or "")
+        summary = profile.call("strip_all_html", strip_all_html, row.get("Excerpt", ""))
+    else:
+        # Same chain as remove_leading_br_in_post_body(strip_strong_from_headings(convert_text_align_center_to_class(
+        # balance_paragraphs(ensure_html_paragraphs(convert_font_size_to_headings(strip_first_image(content)))))))
+        # (the first image lives only in the Image field), applied to a single tokenization of the body
+        body = post_body.rewrite(content_raw or "")
+        summary = strip_all_html(row.get("Excerpt", ""))
+
+    return {
+        "Name": title,
+        "Slug": (row.get("Slug") or "").strip(),
+        "Author": author,
+        "Date of publication": (row.get("Date") or "").strip(),
+        "Category": category,
+        "Image": image_url,
+        "Post body": body,
+        "Post summary": summary,
+        "Featured": featured,
+    }
+
+
+def describe_row(row):
+    """Identify an export row in error messages."""
+    return wp_export.describe_post(row.get("ID"), row.get("Title"))
+
+
+def _convert_item(item, profile=None):
+    if profile is None:
+        return convert_row(*item)
+    row = item[0]
+    start = time.perf_counter()
+    out_row = convert_row(*item, profile=profile)
+    profile.post((row.get("Slug") or "").strip() or describe_row(row), time.perf_counter() - start)
+    return out_row
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    wp_export.add_io_arguments(parser, INPUT_CSV, OUTPUT_CSV)
+    wp_export.add_parallel_arguments(parser)
+    post_cache.add_cache_arguments(parser)
+    webflow_shards.add_shard_arguments(parser)
+    checkpoint.add_checkpoint_arguments(parser)
+    parser.add_argument(
+        "--since-previous",
+        metavar="OLD_CSV",
+        help="also write only new/changed rows (by Slug) relative to a previous blog-webflow.csv (or its shard "
+        "manifest) to <output>-changed.csv, and slugs no longer present to <output>-removed.csv",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=PROFILE_JSON,
+        metavar="JSON",
+        help=f"time each transform stage and write a JSON report (default {PROFILE_JSON}); runs in one process",
+    )
+    parser.add_argument("--profile-top", type=int, default=20, help="slowest posts to list in the profile (default 20)")
+    parser.add_argument(
+        "--search-index",
+        nargs="?",
+        const=SEARCH_INDEX_DIR,
+        metavar="DIR",
+        help=f"also write the search index for js/SearchResults.js to DIR (default {SEARCH_INDEX_DIR})",
+    )
+    parser.add_argument(
+        "--image-manifest",
+        nargs="?",
+        const=IMAGE_MANIFEST_JSON,
+        metavar="JSON",
+        help="rewrite each image's query-string URLs in Image and Post body to one URL and list the images with "
+        f"the old -> new URL map in JSON (default {IMAGE_MANIFEST_JSON}); with --only, rewrite the patched rows "
+        "through the map of an existing manifest, which is left as it is",
+    )
+    parser.add_argument(
+        "--uploads-mirror",
+        metavar="DIR",
+        help="local copy of wp-content/uploads; with --image-manifest, -WxH size variants also become their "
+        "original and uploads with identical content share one URL (hashes are cached in the manifest by path "
+        "and mtime); URLs of files not in it are kept",
+    )
+    parser.add_argument(
+        "--compact",
+        nargs="?",
+        const=COMPACT_REPORT_CSV,
+        metavar="CSV",
+        help="compact Post body HTML (see post_body.compact) and write the bytes saved per post to CSV "
+        f"(default {COMPACT_REPORT_CSV})",
+    )
+    parser.add_argument(
+        "--post-timeout",
+        type=float,
+        metavar="SECONDS",
+        help="give each post at most this long to convert; slower posts go to the quarantine file and the run goes on",
+    )
+    parser.add_argument(
+        "--quarantine",
+        default=QUARANTINE_CSV,
+        help=f"export rows that ran past --post-timeout, plus the reason (default {QUARANTINE_CSV})",
+    )
+    parser.add_argument(
+        "--only",
+        metavar="SLUG_OR_ID[,...]",
+        help="reconvert just these posts (by Slug or post ID), read straight from the export through its "
+        "byte-offset index (<input>.index.json, built when missing or stale), and patch their rows into the "
+        "existing output",
+    )
+    args = parser.parse_args(argv)
+    if args.profile and args.post_timeout:
+        parser.error("--profile times posts in this process and cannot be combined with --post-timeout")
+    if args.uploads_mirror and not args.image_manifest:
+        parser.error("--uploads-mirror needs --image-manifest")
+    if args.uploads_mirror and not os.path.isdir(args.uploads_mirror):
+        parser.error(f"--uploads-mirror {args.uploads_mirror} is not a folder")
+    if args.only:
+        clashes = [
+            flag
+            for flag, value in (
+                ("--resume", args.resume),
+                ("--since-previous", args.since_previous),
+                ("--search-index", args.search_index),
+                ("--uploads-mirror", args.uploads_mirror),
+                ("--shard-max-rows/--shard-max-mb", webflow_shards.shard_limits(args)),
+                ("--profile", args.profile),
+                ("--post-timeout", args.post_timeout),
+            )
+            if value
+        ]
+        if clashes:
+            parser.error(f"--only patches a single output CSV and cannot be combined with {', '.join(clashes)}")
+    return args
+
+
+def write_blog_csv(
+    rows,
+    path,
+    workers=1,
+    chunk_size=wp_export.DEFAULT_CHUNK_SIZE,
+    cache=None,
+    profile=None,
+    timeout=None,
+    quarantine=None,
+    shards=None,
+    authors=None,
+    categories=None,
+    search=None,
+    images=None,
+    compacted=None,
+    journal=None,
+):
+    """Convert export rows and stream them to a Webflow blog CSV at path; return (written, skipped).
+
+    With a post_cache.PostCache, unchanged posts reuse their cached body/summary and the rest are stored
+    after conversion. A post_profile.Profile records per-stage timings; it needs workers=1.
+    With a timeout (seconds per post), posts that run longer are added to the wp_export.QuarantineFile
+    instead of the output. With shards=(max_rows, max_bytes), the output is split by
+    webflow_shards.ShardedWriter. Author and Category are written as slugs from the authors and
+    categories wp_export.SlugIndexes, which are filled in during the pass (new ones if not given).
+    Each written row is also added to the search_index.SearchIndex `search`, if given. With an
+    image_manifest.ImageManifest `images`, image URLs are rewritten through it before the row is written
+    (cached bodies keep the URLs from the export). With a list `compacted`, Post body is compacted
+    (compact_post_body, after caching) and (Slug, bytes before, bytes after) is appended to it per row.
+    With a checkpoint.Journal, rows must come from its open_input(); the output goes to journal.write()
+    (appending after the last checkpoint when resuming) and the counts and slugs are checkpointed with it.
+    Raises wp_export.RowError naming the post if a row fails to convert.
+    """
+    authors = wp_export.SlugIndex() if authors is None else authors
+    categories = wp_export.SlugIndex() if categories is None else categories
+    # Cache lookups and stores and reference slugs stay in this process; workers only get (row, cached)
+    # pairs. Results come back in input order, so pending (cache key, references) are matched up FIFO.
+    pending = deque()
+    written = 0
+    skipped = 0
+    if journal is not None:
+        for entry in journal.checkpoints:
+            authors.restore(entry["authors"])
+            categories.restore(entry["categories"])
+        written = journal.state.get("written", 0)
+        skipped = journal.state.get("skipped", 0)
+        rows = journal.track(rows)
+    saved = {"authors": len(authors), "categories": len(categories)}
+
+    def checkpoint_state():
+        # Slugs are saved as deltas: each checkpoint holds the entries first seen since the previous one
+        state = {
+            "written": written,
+            "skipped": skipped,
+            "quarantined": quarantine.count if quarantine is not None else 0,
+            "authors": authors.entries(saved["authors"]),
+            "categories": categories.entries(saved["categories"]),
+        }
+        saved.update(authors=len(authors), categories=len(categories))
+        return state
+
+    def with_cached(rows):
+        for row in rows:
+            cached = key = None
+            if cache is not None and (row.get("Title") or "").strip():  # untitled rows are skipped, not cached
+                key = cache.key(row)
+                cached = cache.get(key)
+            pending.append((None if cached else key, reference_slugs(row, authors, categories)))
+            yield row, cached
+
+    with contextlib.ExitStack() as stack:
+        if journal is not None:
+            f_out = stack.enter_context(journal.write())
+            writer = csv.DictWriter(f_out, fieldnames=WEBFLOW_HEADERS, quoting=csv.QUOTE_MINIMAL)
+            if not journal.resumed:
+                writer.writeheader()
+        elif shards is None:
+            f_out = stack.enter_context(compressed.open_text(path, "w"))
+            writer = csv.DictWriter(f_out, fieldnames=WEBFLOW_HEADERS, quoting=csv.QUOTE_MINIMAL)
+            writer.writeheader()
+        else:
+            max_rows, max_bytes = shards
+            writer = stack.enter_context(
+                webflow_shards.ShardedWriter(
+                    path, WEBFLOW_HEADERS, max_rows=max_rows, max_bytes=max_bytes, quoting=csv.QUOTE_MINIMAL
                 )
-            ),
-            "Post summary": strip_all_html(row.get("Excerpt", "")),
-            "Featured": featured,
-        })
+            )
+        for out_row in wp_export.map_rows(
+            _convert_item if profile is None else functools.partial(_convert_item, profile=profile),
+            with_cached(rows),
+            workers=workers,
+            chunk_size=chunk_size,
+            describe=lambda item: describe_row(item[0]),
+            timeout=timeout,
+        ):
+            key, (author, category) = pending.popleft()
+            if isinstance(out_row, wp_export.TimedOut):
+                if quarantine is None:
+                    raise wp_export.RowError(f"{describe_row(out_row.row[0])}: took over {out_row.seconds:g}s")
+                quarantine.add(out_row.row[0], f"conversion took over {out_row.seconds:g}s")
+            elif out_row is None:
+                skipped += 1
+            else:
+                if key is not None:
+                    cache.put(key, out_row["Post body"], out_row["Post summary"])
+                out_row["Author"] = author
+                out_row["Category"] = category
+                if compacted is not None:
+                    body = out_row["Post body"]
+                    if profile is not None:
+                        out_row["Post body"] = profile.call("compact_post_body", compact_post_body, body)
+                    else:
+                        out_row["Post body"] = compact_post_body(body)
+                    compacted.append(
+                        (out_row["Slug"], len(body.encode("utf-8")), len(out_row["Post body"].encode("utf-8")))
+                    )
+                if images is not None:
+                    images.add(out_row)
+                writer.writerow(out_row)
+                if search is not None:
+                    search.add(out_row)
+                written += 1
+            if journal is not None:
+                journal.row_done(checkpoint_state)
+    return written, skipped
+
+
+def _count_quotes(data, start, end, step=1 << 20):
+    return sum(data[i:min(i + step, end)].count(b'"') for i in range(start, end, step))
+
+
+def _find_record(data, slug):
+    """(start, end) byte span in a mapped blog CSV of the record with this Slug (the second column), or None.
+
+    Candidates are found by searching for the Slug field itself. A line start is a record start only
+    if an even number of quotes precede it (otherwise it lies inside a quoted, multi-line field, such as
+    a Name before the Slug, and the record starts on an earlier line), and the record runs to the next
+    newline after which the quotes balance again.
+    """
+    field = io.StringIO()
+    csv.writer(field).writerow([slug])
+    needle = b"," + field.getvalue().rstrip("\r\n").encode("utf-8") + b","
+    position = data.find(needle)
+    while position != -1:
+        start = data.rfind(b"\n", 0, position) + 1
+        quotes = _count_quotes(data, 0, start)
+        while quotes % 2:
+            previous = data.rfind(b"\n", 0, start - 1) + 1
+            quotes -= _count_quotes(data, previous, start)
+            start = previous
+        end = data.find(b"\n", position)
+        while end != -1 and _count_quotes(data, start, end) % 2:
+            end = data.find(b"\n", end + 1)
+        end = len(data) if end == -1 else end + 1
+        record = next(csv.reader(io.StringIO(data[start:end].decode("utf-8"), newline="")), [])
+        if record[1:2] == [slug]:
+            return start, end
+        position = data.find(needle, position + 1)
+    return None
+
+
+def _splice_blog_csv(path, updates):
+    """patch_blog_csv for a plain CSV in which every slug in updates is found; None when one is not."""
+    with open(path, "rb") as f:
+        if f.read(len("Name,Slug,")) != b"Name,Slug,":
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            spans = []
+            for slug, out_row in updates.items():
+                span = _find_record(data, slug)
+                if span is None:
+                    return None
+                spans.append((*span, out_row))
+    spans.sort(key=lambda span: span[0])
+    replaced = removed = 0
+    with wp_export.atomic_write(path, binary=True) as f_out:
+        with open(path, "rb") as f_in:
+            position = 0
+            for start, end, out_row in spans:
+                _copy_range(f_in, f_out, position, start)
+                if out_row is None:
+                    removed += 1
+                else:
+                    row = io.StringIO()
+                    csv.DictWriter(row, fieldnames=WEBFLOW_HEADERS, quoting=csv.QUOTE_MINIMAL).writerow(out_row)
+                    f_out.write(row.getvalue().encode("utf-8"))
+                    replaced += 1
+                position = end
+            f_in.seek(position)
+            shutil.copyfileobj(f_in, f_out)
+    return replaced, removed, 0
+
+
+def _copy_range(f_in, f_out, start, end, step=1 << 20):
+    f_in.seek(start)
+    while start < end:
+        data = f_in.read(min(step, end - start))
+        f_out.write(data)
+        start += len(data)
+
+
+def patch_blog_csv(path, updates):
+    """Rewrite a blog CSV with each row whose Slug is in updates replaced by updates[slug], or dropped if
+    that is None; rows for slugs not in the file are appended. Return (replaced, removed, appended).
+
+    In a plain CSV the rows are located by their Slug and spliced in, copying the rest of the file as
+    bytes; compressed files, or slugs not found that way, get a full csv rewrite.
+    """
+    result = None if compressed.codec(path) else _splice_blog_csv(path, updates)
+    return result if result is not None else _rewrite_blog_csv(path, updates)
+
+
+def _rewrite_blog_csv(path, updates):
+    pending = dict(updates)
+    replaced = removed = appended = 0
+    with wp_export.atomic_write(path) as f_out:
+        with compressed.open_text(path) as f_in:
+            reader = csv.reader(f_in)
+            header = next(reader, None) or WEBFLOW_HEADERS
+            slug_column = header.index("Slug")
+            writer = csv.writer(f_out, quoting=csv.QUOTE_MINIMAL)
+            writer.writerow(header)
+            for values in reader:
+                slug = values[slug_column] if len(values) > slug_column else None
+                if slug in pending:
+                    out_row = pending.pop(slug)
+                    if out_row is None:
+                        removed += 1
+                        continue
+                    values = [out_row.get(name, "") for name in header]
+                    replaced += 1
+                writer.writerow(values)
+            for out_row in pending.values():
+                if out_row is not None:
+                    writer.writerow([out_row.get(name, "") for name in header])
+                    appended += 1
+    return replaced, removed, appended
+
+
+def write_compaction_report(path, compacted):
+    """Write the (Slug, bytes before, bytes after) of each post, largest saving first, to a CSV; return the totals."""
+    with wp_export.atomic_write(path) as f:
+        writer = csv.writer(f)
+        writer.writerow(["Slug", "Bytes before", "Bytes after", "Bytes saved"])
+        for slug, before, after in sorted(compacted, key=lambda item: item[2] - item[1]):
+            writer.writerow([slug, before, after, before - after])
+    return sum(item[1] for item in compacted), sum(item[2] for item in compacted)
+
+
+def reconvert_only(args, keys):
+    """Convert just the posts with the given Slugs/IDs, read via export_index, and patch them into args.output."""
+    if wxr.is_wxr(args.input):
+        sys.exit("--only needs a CSV export")
+    if not os.path.exists(args.output):
+        sys.exit(f"{args.output} does not exist; run a full conversion first")
+    resolve = None
+    if args.image_manifest:
+        try:
+            resolve = image_manifest.saved_resolver(args.image_manifest)
+        except (OSError, ValueError) as exc:
+            sys.exit(f"Cannot read image manifest {args.image_manifest}: {exc}")
+    index = export_index.load(args.input)
+    start = time.perf_counter()
+    authors = wp_export.SlugIndex()
+    categories = wp_export.SlugIndex()
+    authors.restore(index["authors"])
+    categories.restore(index["categories"])
+    updates = {}
+    for key in keys:
+        span = export_index.find(index, key)
+        if span is None:
+            sys.exit(f"No post with Slug or ID {key!r} in {args.input}")
+        row = next(wp_export.project_rows(index["header"], [export_index.read_record(args.input, *span)]))
+        author, category = reference_slugs(row, authors, categories)
+        try:
+            out_row = convert_row(row)
+        except Exception as exc:
+            sys.exit(f"Conversion failed on {describe_row(row)}: {type(exc).__name__}: {exc}")
+        if out_row is None:
+            updates[(row.get("Slug") or "").strip()] = None
+        else:
+            out_row["Author"] = author
+            out_row["Category"] = category
+            if args.compact:
+                # Matches a full --compact run; the report of that run is left as it is
+                out_row["Post body"] = compact_post_body(out_row["Post body"])
+            if resolve is not None:
+                image_manifest.rewrite_row(out_row, resolve)
+            updates[out_row["Slug"]] = out_row
+    converted = time.perf_counter()
+    replaced, removed, appended = patch_blog_csv(args.output, updates)
+    print(f"Reconverted {len(keys)} posts in {(converted - start) * 1000:.1f} ms")
+    print(
+        f"Patched {args.output} in {time.perf_counter() - converted:.2f}s: "
+        f"{replaced} replaced, {removed} removed (no title), {appended} appended"
+    )
+
 
-    with open(OUTPUT_CSV, "w", encoding="utf-8", newline="") as f_out:
-        writer = csv.DictWriter(f_out, fieldnames=WEBFLOW_HEADERS, quoting=csv.QUOTE_MINIMAL)
-        writer.writeheader()
-        writer.writerows(out_rows)
+def main(argv=None):
+    args = parse_args(argv)
+    if args.only:
+        reconvert_only(args, [key.strip() for key in args.only.split(",") if key.strip()])
+        return
+    shards = webflow_shards.shard_limits(args)
+    profile = post_profile.Profile(top=args.profile_top) if args.profile else None
+    if profile is not None and args.workers != 1:
+        print("--profile runs in a single process; ignoring --workers")
+        args.workers = 1
+    # Index the previous output first: it may be the very file about to be overwritten
+    previous = webflow_delta.read_index(args.since_previous, WEBFLOW_HEADERS) if args.since_previous else None
+    # Shards, the search index, the image manifest and the compaction report are not checkpointed; runs
+    # writing them always start from the top
+    reason = next(
+        (
+            name
+            for name, value in (
+                ("sharded output", shards),
+                ("--search-index", args.search_index),
+                ("--image-manifest", args.image_manifest),
+                ("--compact", args.compact),
+            )
+            if value
+        ),
+        None,
+    )
+    try:
+        journal = checkpoint.journal_for(
+            args, args.input, args.output, {"script": "posts-to-webflow-csv", "version": TRANSFORM_VERSION}, reason
+        )
+    except checkpoint.ResumeError as exc:
+        sys.exit(str(exc))
+    # Stream rows: each one is read, converted and written before the next is read,
+    # so memory stays flat regardless of export size.
+    with wp_export.open_export_rows(args.input) if journal is None else journal.open_input() as source:
+        reader = source if journal is None else wp_export.project_rows(source.header or [], source)
+        first_row = next(reader, None)
+        if first_row is None and (journal is None or not journal.resumed):
+            print("No posts in input")
+            return
+        compacted = [] if args.compact else None
+        images = image_manifest.ImageManifest(args.image_manifest, args.uploads_mirror) if args.image_manifest else None
+        if images is not None and args.uploads_mirror:
+            try:
+                images.hash_uploads(wp_export.worker_count(args.workers), args.chunk_size)
+            except wp_export.RowError as exc:
+                sys.exit(f"Hashing failed on {exc}")
+        cache = post_cache.open_cache(args, TRANSFORM_VERSION)
+        quarantine = (
+            wp_export.QuarantineFile(args.quarantine, keep=journal.state.get("quarantined", 0) if journal else 0)
+            if args.post_timeout
+            else None
+        )
+        authors = wp_export.SlugIndex()
+        categories = wp_export.SlugIndex()
+        search = search_index.SearchIndex(args.search_index) if args.search_index else None
+        try:
+            written, skipped = write_blog_csv(
+                itertools.chain([] if first_row is None else [first_row], reader),
+                args.output,
+                workers=wp_export.worker_count(args.workers),
+                chunk_size=args.chunk_size,
+                cache=cache,
+                profile=profile,
+                timeout=args.post_timeout,
+                quarantine=quarantine,
+                shards=shards,
+                authors=authors,
+                categories=categories,
+                search=search,
+                images=images,
+                compacted=compacted,
+                journal=journal,
+            )
+        except wp_export.RowError as exc:
+            sys.exit(f"Conversion failed on {exc}")
+        finally:
+            if cache is not None:
+                cache.close()
+            if quarantine is not None:
+                quarantine.close()
+
+    if cache is not None:
+        print(cache.report())
+    if skipped:
+        print(f"Skipped {skipped} rows without a title")
+    for line in wp_export.collision_report("authors", authors) + wp_export.collision_report("categories", categories):
+        print(line)
+    if quarantine is not None and quarantine.count:
+        print(f"Quarantined {quarantine.count} posts over {args.post_timeout:g}s to {args.quarantine}")
+    if shards is None:
+        print(f"Wrote {written} rows to {args.output}")
+    else:
+        output = webflow_shards.manifest_path(args.output)
+        print(f"Wrote {written} rows in {len(webflow_shards.csv_paths(output))} shards listed in {output}")
+    if search is not None:
+        search.close(categories.items())
+        print(f"Wrote search index of {search.count} posts to {args.search_index}")
+    if compacted is not None:
+        before, after = write_compaction_report(args.compact, compacted)
+        print(
+            f"Compacted Post body of {len(compacted)} posts from {before / 1e6:.2f} MB to {after / 1e6:.2f} MB, "
+            f"saving {before - after} bytes ({(before - after) / max(before, 1):.1%}); per post in {args.compact}"
+        )
+    if images is not None:
+        images.close()
+        print("\n".join(images.report()))
+    if profile is not None:
+        profile.write(args.profile)
+        print("\n".join(profile.summary()))
+        print(f"Wrote profile to {args.profile}")
+
+    if previous is not None:
+        changed_csv, removed_csv = webflow_delta.delta_paths(args.output)
+        changed, unchanged, removed = webflow_delta.write_delta(
+            previous, args.output if shards is None else output, changed_csv, removed_csv
+        )
+        print(f"Wrote {changed} new or changed rows to {changed_csv} ({unchanged} unchanged)")
+        print(f"Wrote {removed} removed slugs to {removed_csv}")
 
-    print(f"Wrote {len(out_rows)} rows to {OUTPUT_CSV}")
 
 if __name__ == "__main__":
     main()
@@ -1,36 +1,133 @@
 #!/usr/bin/env python3
-"""Replace <strong><font size=\"+N\">...</font></strong> with <hN>...</hN> in the WordPress export CSV."""
-import re
-import sys
+"""Replace <strong><font size=\"+N\">...</font></strong> with <hN>...</hN> in the WordPress export CSV.
+
+The CSV is rewritten as raw text (quotes inside fields are doubled: size=""+2""), read in CHUNK_CHARS
+pieces and written out as it goes, so memory stays bounded however large the export is.
+"""
+import argparse
+import itertools
 import os
+import re
+import tempfile
+
+import compressed
+import wp_export
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+DEFAULT_CSV = os.path.join(PROJECT_DIR, "Posts-Export-2026-February-03-0219.csv")
+
+CHUNK_CHARS = 1 << 20
+# +2 -> h2, +1 -> h3
+HEADING_TAGS = {"2": "h2", "1": "h3"}
+CLOSER = re.compile(r"</font></strong>", re.IGNORECASE)
+_CLOSER_WIDTH = len("</font></strong>")
+
+
+def _opener(quote):
+    """Pattern for <strong><font size="+1"/"+2"> with `quote` as the quote, and the longest text it matches."""
+    pattern = re.compile(rf"<strong><font size={quote}\+([12]){quote}>", re.IGNORECASE)
+    return pattern, len(f"<strong><font size={quote}+2{quote}>")
+
+
+FIELD_OPENER = _opener('"')  # a parsed CSV field
+CSV_OPENER = _opener('""')  # raw CSV text
+
+
+def replace_headings(chunks, opener=FIELD_OPENER, spill_chars=CHUNK_CHARS):
+    """Yield the text of `chunks` (strs) with both heading rules applied in one left-to-right scan.
+
+    Same result as re.sub(r'<strong><font size="\\+N">(.*?)</font></strong>', r'<hN>\\1</hN>', DOTALL |
+    IGNORECASE): a heading ends at the first closer after its opener and its text is kept as is, so only
+    the two tags are rewritten. An opener with no closer after it is left alone. Tags may straddle
+    chunks; the text of a heading still open after spill_chars goes to a temp file, not memory.
+
+    The original two passes (+2, then +1) differ only on malformed input where a heading's text holds
+    another opener: they rewrote the inner one too, or let it take the closer first.
+    """
+    pattern, opener_width = opener
+    buffer = ""
+    tag = None  # h2/h3 while an opener waits for its closer
+    opened = ""  # that opener as written, put back if no closer follows
+    held = []  # the open heading's text so far
+    held_chars = 0
+    spill = None  # temp file taking held text past spill_chars
+
+    def release():
+        # The open heading's text, from the spill file first, then from memory
+        if spill is not None:
+            spill.seek(0)
+            yield from iter(lambda: spill.read(CHUNK_CHARS), "")
+            spill.close()
+        yield from held
+
+    for chunk in itertools.chain(chunks, [None]):
+        final = chunk is None
+        if not final:
+            buffer += chunk
+        position = 0
+        while True:
+            if tag is None:
+                match = pattern.search(buffer, position)
+                if match is None:
+                    # Keep what could be the start of an opener cut off by the chunk's end
+                    cut = len(buffer) if final else max(position, len(buffer) - opener_width + 1)
+                    yield buffer[position:cut]
+                    position = cut
+                    break
+                yield buffer[position: match.start()]
+                tag, opened = HEADING_TAGS[match.group(1)], match.group(0)
+                position = match.end()
+            else:
+                match = CLOSER.search(buffer, position)
+                if match is None:
+                    if final:
+                        yield opened
+                        yield from release()
+                        yield buffer[position:]
+                        break
+                    cut = max(position, len(buffer) - _CLOSER_WIDTH + 1)
+                    held.append(buffer[position:cut])
+                    held_chars += cut - position
+                    if held_chars > spill_chars:
+                        if spill is None:
+                            spill = tempfile.TemporaryFile("w+", encoding="utf-8", newline="")
+                        spill.writelines(held)
+                        held, held_chars = [], 0
+                    position = cut
+                    break
+                yield f"<{tag}>"
+                yield from release()
+                yield buffer[position: match.start()]
+                yield f"</{tag}>"
+                tag, held, held_chars, spill = None, [], 0, None
+                position = match.end()
+        buffer = buffer[position:] if not final else ""
+
+
+def process_field(text):
+    """Replace <strong><font size="+2"/"+1">...</font></strong> headings in one field with <h2>/<h3>."""
+    if not text or not isinstance(text, str):
+        return text
+    return "".join(replace_headings([text]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("csv_path", nargs="?", default=DEFAULT_CSV, help="export CSV to update in place")
+    parser.add_argument("-o", "--output", help="write the result here instead of updating csv_path in place")
+    args = parser.parse_args(argv)
+    input_path = os.path.normpath(args.csv_path)
+    output_path = os.path.normpath(args.output) if args.output else input_path
+
+    # Written to a temp file beside the output and renamed into place once the input is closed, so an
+    # in-place run reads the original to the end and an interrupted one leaves it intact
+    with wp_export.atomic_write(output_path) as f_out, compressed.open_text(input_path) as f_in:
+        chunks = iter(lambda: f_in.read(CHUNK_CHARS), "")
+        f_out.writelines(replace_headings(chunks, CSV_OPENER))
+
+    print(f"Done. {'Updated' if output_path == input_path else 'Wrote'} {output_path}")
 
-DEFAULT_CSV = r"c:\Users\Carlos\Downloads\Posts-Export-2026-February-03-0219.csv"
-
-def main():
-    input_csv = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CSV
-    input_csv = os.path.normpath(input_csv)
-    with open(input_csv, "r", encoding="utf-8", newline="") as f:
-        text = f.read()
-
-    # Replace isolated <strong><font size="+N">...</font></strong> headings: +2 -> h2, +1 -> h3
-    # In CSV, doubled quotes: size=""+2"" so pattern is size=""\+2""
-    text = re.sub(
-        r'<strong><font size=""\+2"">(.*?)</font></strong>',
-        r'<h2>\1</h2>',
-        text,
-        flags=re.DOTALL | re.IGNORECASE,
-    )
-    text = re.sub(
-        r'<strong><font size=""\+1"">(.*?)</font></strong>',
-        r'<h3>\1</h3>',
-        text,
-        flags=re.DOTALL | re.IGNORECASE,
-    )
-
-    with open(input_csv, "w", encoding="utf-8", newline="") as f:
-        f.write(text)
-
-    print(f"Done. Updated {input_csv}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Run the export cleaning scripts and the Webflow posts conversion as stages of one read/write pass."""
+import argparse
+import csv
+import functools
+import json
+import os
+import sys
+from collections import deque
+
+import wp_export
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+INPUT_CSV = os.path.join(PROJECT_DIR, "Posts-Export-2026-February-03-0219.csv")
+OUTPUT_CSV = os.path.join(PROJECT_DIR, "blog-webflow.csv")
+
+# Stage name -> script providing it. Field stages apply the script's process_field to Content and
+# Excerpt; "posts" converts the row with posts-to-webflow-csv.convert_row and must come last.
+STAGES = {
+    "font-headings": "replace-font-headings-in-csv",
+    "clean-html": "clean-ugly-html-csv",
+    "strong-to-h4": "strong-to-h4-csv",
+    "wrap-paragraphs": "wrap-loose-paragraphs-in-csv",
+    "posts": "posts-to-webflow-csv",
+}
+DEFAULT_STAGES = list(STAGES)
+FIELD_COLUMNS = ("Content", "Excerpt")
+
+
+def parse_stage_list(value):
+    """Parse a comma-separated stage list, checking names and that "posts" (if present) is last."""
+    names = [name.strip() for name in value.split(",") if name.strip()] if isinstance(value, str) else value
+    unknown = [name for name in names if name not in STAGES]
+    if unknown:
+        raise ValueError(f"unknown stage(s) {', '.join(unknown)}; choose from {', '.join(STAGES)}")
+    if "posts" in names[:-1]:
+        raise ValueError('"posts" must be the last stage')
+    if not names:
+        raise ValueError("no stages selected")
+    return names
+
+
+def run_row(stages, row):
+    """Apply the named stages to one export row (a dict); return the result, or None if a stage drops it."""
+    for name in stages:
+        script = wp_export.load_script(STAGES[name])
+        if name == "posts":
+            return script.convert_row(row)
+        for column in FIELD_COLUMNS:
+            if column in row:
+                row[column] = script.process_field(row[column])
+    return row
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("csv_path", nargs="?", default=INPUT_CSV, help="WordPress Posts export CSV")
+    parser.add_argument(
+        "--stages",
+        help=f"comma-separated stages in the order to run them (default {','.join(DEFAULT_STAGES)})",
+    )
+    parser.add_argument("--config", help='JSON file with {"stages": [...]}; --stages takes precedence')
+    parser.add_argument(
+        "-o",
+        "--output",
+        help=f"output CSV (default {OUTPUT_CSV} when the posts stage runs, else csv_path updated in place)",
+    )
+    wp_export.add_parallel_arguments(parser)
+    args = parser.parse_args(argv)
+
+    stages = DEFAULT_STAGES
+    if args.stages:
+        stages = args.stages
+    elif args.config:
+        with open(args.config, "r", encoding="utf-8") as f:
+            stages = json.load(f).get("stages", DEFAULT_STAGES)
+    try:
+        args.stages = parse_stage_list(stages)
+    except ValueError as exc:
+        parser.error(str(exc))
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    input_path = os.path.normpath(args.csv_path)
+    converts = args.stages[-1] == "posts"
+    output_path = os.path.normpath(args.output or (OUTPUT_CSV if converts else input_path))
+
+    header = wp_export.read_csv_header(input_path)
+    if not header:
+        print("No rows in input CSV")
+        return
+    for name in args.stages:
+        wp_export.load_script(STAGES[name])  # before any worker pool starts, so workers load them too
+    posts = wp_export.load_script("posts-to-webflow-csv") if converts else None
+
+    # Reference slugs are assigned here, in input order, exactly as posts-to-webflow-csv.py does
+    authors = wp_export.SlugIndex()
+    categories = wp_export.SlugIndex()
+    references = deque()
+
+    def with_references(rows):
+        for row in rows:
+            if converts:
+                references.append(posts.reference_slugs(row, authors, categories))
+            yield row
+
+    written = 0
+    skipped = 0
+    try:
+        # Temp file + rename, as input and output may be the same file when only field stages run
+        with wp_export.atomic_write(output_path) as f_out:
+            with wp_export.open_dict_rows(input_path) as (fieldnames, reader):
+                writer = csv.DictWriter(
+                    f_out,
+                    fieldnames=posts.WEBFLOW_HEADERS if converts else fieldnames,
+                    quoting=csv.QUOTE_MINIMAL,
+                )
+                writer.writeheader()
+                for out_row in wp_export.map_rows(
+                    functools.partial(run_row, tuple(args.stages)),
+                    with_references(reader),
+                    workers=wp_export.worker_count(args.workers),
+                    chunk_size=args.chunk_size,
+                    describe=lambda row: wp_export.describe_post(row.get("ID"), row.get("Title")),
+                ):
+                    if converts:
+                        author, category = references.popleft()
+                    if out_row is None:
+                        skipped += 1
+                        continue
+                    if converts:
+                        out_row["Author"] = author
+                        out_row["Category"] = category
+                    writer.writerow(out_row)
+                    written += 1
+    except wp_export.RowError as exc:
+        sys.exit(f"Pipeline failed on {exc}")
+
+    print(f"Stages: {' -> '.join(args.stages)}")
+    if skipped:
+        print(f"Skipped {skipped} rows without a title")
+    print(f"Wrote {written} rows to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Prebuilt blog search index for js/SearchResults.js, written by posts-to-webflow-csv.py --search-index.
+
+Each converted row is indexed as it is written (Name, Slug, Category, Post summary), so building the
+index adds no second pass over the export. The output folder holds compact JSON that gzips well:
+
+  meta.json       format version, counts, shard size, tokenizer settings, category slug -> name
+  docs-0000.json  [[slug, title, summary, "category-slug; ...", date], ...], DOC_SHARD_SIZE posts per file
+  terms-<c>.json  {term: [doc, weight, doc, weight, ...]} for terms starting with <c>; doc numbers are
+                  deltas from the previous one for that term, weights sum FIELD_WEIGHTS per field matched
+
+The front end fetches meta.json, then only the term files for the query's words and the doc files
+holding the top hits. Postings are kept in memory until close(); docs are flushed as each file fills.
+"""
+import glob
+import json
+import os
+import re
+import unicodedata
+
+FORMAT_VERSION = 1
+DOC_SHARD_SIZE = 500
+SUMMARY_CHARS = 240
+MIN_TERM_LENGTH = 2
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have how in is it its of on or that the this to was what "
+    "when where which who why will with you your".split()
+)
+
+# Output column -> weight of a term found in it
+FIELD_WEIGHTS = (("Name", 4), ("Category", 2), ("Slug", 2), ("Post summary", 1))
+
+# Letters and digits, without the underscore \w includes; the JS side uses /[\p{L}\p{N}]+/gu
+WORD_RE = re.compile(r"[^\W_]+")
+SHARD_KEY_RE = re.compile(r"[a-z0-9]")
+
+
+def tokenize(text):
+    """Lowercase, accent-free search terms in text, minus stopwords and one-letter words."""
+    text = unicodedata.normalize("NFKD", (text or "").lower())
+    if not text.isascii():
+        text = "".join(c for c in text if not unicodedata.combining(c))
+    return [term for term in WORD_RE.findall(text) if len(term) >= MIN_TERM_LENGTH and term not in STOPWORDS]
+
+
+def shard_key(term):
+    """Which terms-<c>.json a term lives in: its first character if a-z or 0-9, else "_"."""
+    return term[0] if SHARD_KEY_RE.match(term) else "_"
+
+
+def _write_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+
+
+class SearchIndex:
+    """Accumulates converted blog rows; close() writes the index folder."""
+
+    def __init__(self, directory, doc_shard_size=DOC_SHARD_SIZE):
+        self.directory = directory
+        self.doc_shard_size = doc_shard_size
+        self.count = 0
+        self._docs = []
+        self._postings = {}  # term -> [doc delta, weight, ...]
+        self._last_doc = {}  # term -> last doc number added
+        os.makedirs(directory, exist_ok=True)
+        # Shards from an earlier, larger run would otherwise linger
+        for stale in glob.glob(os.path.join(directory, "docs-*.json")) + glob.glob(
+            os.path.join(directory, "terms-*.json")
+        ):
+            os.remove(stale)
+
+    def add(self, out_row):
+        """Index one row as written to the blog CSV."""
+        doc = self.count
+        self.count += 1
+        weights = {}
+        for column, weight in FIELD_WEIGHTS:
+            for term in set(tokenize(out_row.get(column))):
+                weights[term] = weights.get(term, 0) + weight
+        for term, weight in weights.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = []
+            postings.append(doc - self._last_doc.get(term, 0))
+            postings.append(weight)
+            self._last_doc[term] = doc
+        summary = out_row.get("Post summary") or ""
+        if len(summary) > SUMMARY_CHARS:
+            summary = summary[:SUMMARY_CHARS].rsplit(" ", 1)[0] + "…"
+        self._docs.append(
+            [
+                out_row.get("Slug") or "",
+                out_row.get("Name") or "",
+                summary,
+                out_row.get("Category") or "",
+                out_row.get("Date of publication") or "",
+            ]
+        )
+        if len(self._docs) == self.doc_shard_size:
+            self._flush_docs()
+
+    def _flush_docs(self):
+        if self._docs:
+            shard = (self.count - 1) // self.doc_shard_size
+            _write_json(os.path.join(self.directory, f"docs-{shard:04d}.json"), self._docs)
+            self._docs = []
+
+    def close(self, categories=()):
+        """Write the remaining docs, the term shards and meta.json; categories are (name, slug) pairs."""
+        self._flush_docs()
+        shards = {}
+        for term in sorted(self._postings):
+            shards.setdefault(shard_key(term), {})[term] = self._postings[term]
+        for key, terms in shards.items():
+            _write_json(os.path.join(self.directory, f"terms-{key}.json"), terms)
+        _write_json(
+            os.path.join(self.directory, "meta.json"),
+            {
+                "version": FORMAT_VERSION,
+                "docs": self.count,
+                "terms": len(self._postings),
+                "doc_shard_size": self.doc_shard_size,
+                "term_shards": sorted(shards),
+                "tokenizer": {"min_length": MIN_TERM_LENGTH, "stopwords": sorted(STOPWORDS)},
+                "doc_fields": ["slug", "title", "summary", "categories", "date"],
+                "categories": {slug: name for name, slug in categories},
+            },
+        )
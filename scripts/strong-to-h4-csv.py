@@ -1,60 +1,55 @@
 #!/usr/bin/env python3
 """Replace standalone <strong>...</strong> lines with <h4>...</h4> in Content/Excerpt of WordPress export CSV."""
-import csv
 import os
 import re
-import sys
+
+import wp_export
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
 DEFAULT_CSV = os.path.join(PROJECT_DIR, "Posts-Export-2026-February-03-0219.csv")
 
-CONTENT_COL = 2
-EXCERPT_COL = 3
+
+# A line (between ^ or \n and \n or $) that is only optional space + <strong>content</strong> + optional space.
+# Content is [^\n]*? so we don't cross newlines (standalone line)
+STRONG_LINE_RE = re.compile(r"(^|\n)\s*<strong>([^\n]*?)</strong>\s*(\n|$)", re.MULTILINE)
+
+
+def _line_start(text, i):
+    # Where STRONG_LINE_RE's (^|\n) holds
+    return i == 0 or text[i - 1] == "\n" or text[i] == "\n"
 
 
 def process_field(text):
     """Replace lines that are only <strong>...</strong> with <h4>...</h4>."""
     if not text or not isinstance(text, str):
         return text
-    # Match a line (between ^ or \n and \n or $) that is only optional space + <strong>content</strong> + optional space
-    # Content is [^\n]*? so we don't cross newlines (standalone line)
-    return re.sub(
-        r"(^|\n)\s*<strong>([^\n]*?)</strong>\s*(\n|$)",
-        r"\1<h4>\2</h4>\3",
-        text,
-        flags=re.MULTILINE,
-    )
-
-
-def main():
-    input_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CSV
-    input_path = os.path.normpath(input_path)
-
-    with open(input_path, "r", encoding="utf-8", newline="") as f:
-        reader = csv.reader(f)
-        rows = list(reader)
-
-    if not rows:
-        print("No rows in CSV")
-        return
-
-    if len(rows[0]) <= max(CONTENT_COL, EXCERPT_COL):
-        print("CSV has no Content/Excerpt columns")
-        return
-
-    for i in range(1, len(rows)):
-        row = rows[i]
-        if len(row) <= max(CONTENT_COL, EXCERPT_COL):
+    # Same result as STRONG_LINE_RE.sub(r"\1<h4>\2</h4>\3", text), but a match is only tried from the first
+    # line start in the whitespace before each <strong>: the regex alone retries from every line start in a
+    # run of blank lines, rescanning the run each time (quadratic on long \r\n runs), and only the first can win
+    out = []
+    pos = 0  # end of the last match, where the search resumes
+    strong = text.find("<strong>")
+    while strong >= 0:
+        start = strong
+        while start > pos and text[start - 1].isspace():
+            start -= 1
+        while start < strong and not _line_start(text, start):
+            start += 1
+        match = STRONG_LINE_RE.match(text, start) if _line_start(text, start) else None
+        if match is None:
+            strong = text.find("<strong>", strong + 1)
             continue
-        row[CONTENT_COL] = process_field(row[CONTENT_COL])
-        row[EXCERPT_COL] = process_field(row[EXCERPT_COL])
+        out.append(text[pos:start])
+        out.append(match[1] + "<h4>" + match[2] + "</h4>" + match[3])
+        pos = match.end()
+        strong = text.find("<strong>", pos)
+    out.append(text[pos:])
+    return "".join(out)
 
-    with open(input_path, "w", encoding="utf-8", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerows(rows)
 
-    print(f"Done. Updated {input_path}")
+def main(argv=None):
+    wp_export.rewrite_export_fields(argv, process_field, __doc__, "strong-to-h4-csv", DEFAULT_CSV)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,64 @@
+"""Scripts read an export through its snapshot only while the snapshot matches the CSV."""
+import csv
+import os
+
+import pytest
+
+import export_snapshot
+import wp_export
+
+ingest = wp_export.load_script("ingest-export")
+synthetic = wp_export.load_script("generate-synthetic-export")
+
+
+@pytest.fixture
+def export(tmp_path):
+    path = str(tmp_path / "export.csv")
+    synthetic.write_export(path, 40)
+    ingest.main([path])
+    return path
+
+
+def csv_records(path):
+    with open(path, encoding="utf-8", newline="") as f:
+        return list(csv.reader(f))[1:]
+
+
+def titles(path):
+    with wp_export.open_export_rows(path) as rows:
+        return [row.get("Title") for row in rows]
+
+
+def test_snapshot_matches_csv(export):
+    snapshot = export_snapshot.current(export)
+    assert snapshot is not None
+    snapshot.close()
+    with wp_export.open_records(export) as records:
+        assert [list(record) for record in records] == csv_records(export)
+
+
+def test_appended_row_invalidates(export, capsys):
+    with open(export, "a", encoding="utf-8", newline="") as f:
+        csv.writer(f).writerow(["999", "Appended"])
+    assert export_snapshot.current(export, warn=True) is None
+    assert "out of date" in capsys.readouterr().err
+    assert titles(export)[-1] == "Appended"
+
+
+def test_same_size_and_mtime_edit_invalidates(export):
+    stat = os.stat(export)
+    title = titles(export)[0].encode("utf-8")
+    edited = b"E" * len(title)
+    with open(export, "r+b") as f:
+        f.seek(f.read().index(title))
+        f.write(edited)
+    os.utime(export, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert os.path.getsize(export) == stat.st_size
+    assert export_snapshot.current(export, warn=False) is None
+    assert titles(export)[0] == edited.decode()
+
+    ingest.main([export])
+    snapshot = export_snapshot.current(export, warn=False)
+    assert snapshot is not None
+    snapshot.close()
+    assert titles(export)[0] == edited.decode()
@@ -0,0 +1,296 @@
+"""post_body's token rules against the original regex implementations of the Post body chain.
+
+The reference functions below are the regex versions posts-to-webflow-csv.py had before the chain moved
+to post_body, kept verbatim: whatever the token engine does, its output must match theirs, including on
+malformed HTML (unclosed <p>, tags cut short or holding a stray '<').
+"""
+import random
+import re
+
+import pytest
+
+import post_body
+import wp_export
+
+posts = wp_export.load_script("posts-to-webflow-csv")
+synthetic = wp_export.load_script("generate-synthetic-export")
+
+
+def ref_strip_first_image(html):
+    if not html:
+        return ""
+    return re.sub(r"<img\b[^>]*>", "", str(html), count=1, flags=re.IGNORECASE)
+
+
+def ref_convert_font_size_to_headings(html):
+    if not html:
+        return ""
+    text = str(html)
+    text = re.sub(
+        r'<strong>\s*<font\s+size=["\']\+2["\']\s*>([\s\S]*?)</font>\s*</strong>',
+        r'<h2>\1</h2>\n\n',
+        text,
+        flags=re.IGNORECASE,
+    )
+    text = re.sub(
+        r'<strong>\s*<font\s+size=["\']\+1["\']\s*>([\s\S]*?)</font>\s*</strong>',
+        r'<h3>\1</h3>\n\n',
+        text,
+        flags=re.IGNORECASE,
+    )
+    text = re.sub(r'<font\s+size=["\']\+2["\']\s*>([\s\S]*?)</font>', r'<h2>\1</h2>\n\n', text, flags=re.IGNORECASE)
+    text = re.sub(r'<font\s+size=["\']\+1["\']\s*>([\s\S]*?)</font>', r'<h3>\1</h3>\n\n', text, flags=re.IGNORECASE)
+    text = re.sub(
+        r'<p\s+class=["\']has-x-large-font-size["\'][^>]*>([\s\S]*?)</p>',
+        r'<h2>\1</h2>\n\n',
+        text,
+        flags=re.IGNORECASE,
+    )
+    text = re.sub(
+        r'<p\s+class=["\']has-large-font-size["\'][^>]*>([\s\S]*?)</p>',
+        r'<h3>\1</h3>\n\n',
+        text,
+        flags=re.IGNORECASE,
+    )
+    text = re.sub(r'(</h[23]>)([^\s<\n])', r'\1\n\n\2', text)
+    return text
+
+
+def ref_ensure_html_paragraphs(text):
+    if not text or not str(text).strip():
+        return "" if text is None else text
+    text = str(text)
+    if text.strip().startswith("<p>") and text.strip().endswith("</p>"):
+        return text
+    text = re.sub(r"(\r?\n)(\s*\r?\n)+", "</p><p>", text)
+    text = re.sub(r"([.!?])\s*(\r?\n)+(\s*)([A-Z])", r"\1</p><p>\2\3", text)
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = re.sub(r"(</p>|</h[1-6]>|</div>|</li>|</ul>|</ol>)\s*\n", r"\1", text, flags=re.IGNORECASE)
+    text = re.sub(r"\n", "<br />", text)
+    return "<p>" + text.strip() + "</p>"
+
+
+def ref_remove_leading_br_in_post_body(html):
+    if not html:
+        return html
+    text = str(html).strip()
+    text = re.sub(r"^<p>\s*<br\s*/?>\s*", "<p>", text, flags=re.IGNORECASE)
+    text = re.sub(r"^<p>\s*</p>\s*", "", text, flags=re.IGNORECASE)
+    return text
+
+
+def ref_fix_paragraphs_ending_with_br(html):
+    if not html:
+        return html
+    return re.sub(
+        r"(<p(?:\s[^>]*)?>)((?:(?!</p>).)*?)<br\s*/?>\s*",
+        r"\1\2</p>",
+        str(html),
+        flags=re.IGNORECASE | re.DOTALL,
+    )
+
+
+def ref_close_unclosed_paragraphs(html):
+    if not html:
+        return html
+    text = str(html)
+
+    def _repl(m):
+        return m.group(1) + m.group(2).rstrip() + "</p>" + m.group(3)
+    prev = None
+    while prev != text:
+        prev = text
+        text = re.sub(
+            r"(<p(?:\s[^>]*)?>)((?:(?!</p>).)*?)(<p(?:\s[^>]*)?>)",
+            _repl,
+            text,
+            flags=re.IGNORECASE | re.DOTALL,
+        )
+    text = re.sub(
+        r"(<p\s[^>]+>)((?:(?!</p>).)*?)(</p>\s*$)",
+        lambda m: m.group(1) + m.group(2).rstrip() + "</p>" + m.group(3),
+        text,
+        flags=re.IGNORECASE | re.DOTALL,
+    )
+    return text
+
+
+def ref_balance_paragraphs(html):
+    return ref_close_unclosed_paragraphs(ref_fix_paragraphs_ending_with_br(html))
+
+
+def ref_convert_text_align_center_to_class(html):
+    if not html:
+        return html
+    text = str(html)
+
+    def strip_center_style(attrs):
+        attrs = re.sub(
+            r'\s*style=["\'][^"\']*?text-align\s*:\s*center[^"\']*["\']',
+            "",
+            attrs,
+            flags=re.IGNORECASE,
+        ).strip()
+        return (" " + attrs) if attrs else ""
+
+    for tag in ["h1", "h2", "h3", "h4", "h5", "h6", "p"]:
+        pattern = (
+            r"(<"
+            + tag
+            + r")(\s+[^>]*style=[\"'][^\"']*?text-align\s*:\s*center[^\"']*[\"'][^>]*)>"
+            r"([\s\S]*?)"
+            r"(</"
+            + tag
+            + r">)"
+        )
+
+        def repl(m, t=tag):
+            attrs_str = strip_center_style(m.group(2)).strip()
+            inner = "<" + t + (" " + attrs_str if attrs_str else "") + ">" + m.group(3) + m.group(4)
+            return '<div class="w-richtext-align-center">' + inner + "</div>"
+
+        text = re.sub(pattern, repl, text, flags=re.IGNORECASE)
+    return text
+
+
+def ref_strip_strong_from_headings(html):
+    if not html:
+        return html
+    text = str(html)
+    for tag in ["h1", "h2", "h3", "h4", "h5", "h6"]:
+        text = re.sub(
+            r"(<" + tag + r"\b[^>]*>)\s*<strong>\s*([\s\S]*?)\s*</strong>\s*(</" + tag + r">)",
+            r"\1\2\3",
+            text,
+            flags=re.IGNORECASE,
+        )
+    return text
+
+
+def ref_post_body(html):
+    """The Post body expression of the original convert loop."""
+    body = ref_convert_font_size_to_headings(ref_strip_first_image(html))
+    return ref_remove_leading_br_in_post_body(
+        ref_strip_strong_from_headings(
+            ref_convert_text_align_center_to_class(
+                ref_close_unclosed_paragraphs(ref_fix_paragraphs_ending_with_br(ref_ensure_html_paragraphs(body)))
+            )
+        )
+    )
+
+
+# Wrapper in posts-to-webflow-csv.py -> its reference
+RULES = {
+    "strip_first_image": ref_strip_first_image,
+    "convert_font_size_to_headings": ref_convert_font_size_to_headings,
+    "ensure_html_paragraphs": ref_ensure_html_paragraphs,
+    "fix_paragraphs_ending_with_br": ref_fix_paragraphs_ending_with_br,
+    "close_unclosed_paragraphs": ref_close_unclosed_paragraphs,
+    "balance_paragraphs": ref_balance_paragraphs,
+    "convert_text_align_center_to_class": ref_convert_text_align_center_to_class,
+    "strip_strong_from_headings": ref_strip_strong_from_headings,
+    "remove_leading_br_in_post_body": ref_remove_leading_br_in_post_body,
+}
+
+CASES = [
+    "",
+    "   ",
+    "Plain text.\nSecond line.\n\nNext paragraph.",
+    "<p>Wrapped already.</p>",
+    '<p style="margin: 0">one<br>two<br />three</p>',
+    "<p>one<p>two<p>three</p>",
+    '<p class="a">last paragraph</p>',
+    '<p>outer<p class="x">inner  </p>',
+    "<p>unclosed<br>\n<p>another",
+    '<strong><font size="+2">Heading</font></strong>Body',
+    "<font size='+1'>Sub</font>text",
+    '<p class="has-x-large-font-size">Big</p><p class="has-large-font-size">Large</p>',
+    '<p style="text-align: center">Centered</p><h2 style="color: red; text-align:center">H</h2>',
+    "<h2> <strong>Bold heading</strong> </h2><h3 class='a'><strong>x</strong></h3>",
+    '<img src="a-300x200.jpg" /><p>After image</p><img src="b.jpg">',
+    "<p><br />Leading break</p>",
+    "<p></p>\n<p>Empty first</p>",
+    "1 < 2 and 3 > 2, <3",
+    # Tags cut short or holding a stray '<'
+    '<p style="text-align:\n<p style="m">text</p>',
+    '<p style="margin: 0 0 20<br /><h3>Heading</h3>',
+    '<p style="text-align: cent<br /><font size="+2"><h3>Tips</h3></font>',
+    "<p>text <a hr</p><h2>Next</h2>",
+    '<p style="a\n><p class="x">\n\n"&nbsp;<p></div>',
+    "<p>one<br<p>two</p",
+    '<p<br>x<p class="y"<p>z',
+    '<h2 style="text-align:center"<strong>x</strong></h2>',
+    "<!-- wp:paragraph --><p>a<!-- <p> --></p>",
+]
+
+FRAGMENTS = [
+    "<p>", "</p>", '<p style="text-align: center">', '<p class="x">', "<br>", "<br />", "\n", "\n\n", "\r\n", " ",
+    "Text.", "Word", "<strong>", "</strong>", '<font size="+2">', '<font size="+1">', "</font>", "<h2>", "</h2>",
+    '<h3 class="a">', "</h3>", '<img src="a.jpg">', "<", ">", '"', "a < b", "<3", '<p style="a', "<br", "</p",
+    '<p class="has-large-font-size">', "<div>", "</div>", "<!-- c -->", "<h2 style='text-align:center'>", "&nbsp;",
+]
+
+
+def soups(seed, count, longest=30):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, longest)))
+
+
+@pytest.mark.parametrize("html", CASES)
+@pytest.mark.parametrize("name", sorted(RULES))
+def test_rule_matches_reference(name, html):
+    assert getattr(posts, name)(html) == RULES[name](html)
+
+
+@pytest.mark.parametrize("html", CASES)
+def test_chain_matches_reference(html):
+    assert post_body.rewrite(html) == ref_post_body(html)
+
+
+def test_balance_paragraphs_random_soups():
+    for html in soups(1, 5000):
+        assert posts.balance_paragraphs(html) == ref_balance_paragraphs(html), html
+
+
+def test_chain_random_soups():
+    for html in soups(2, 5000):
+        assert post_body.rewrite(html) == ref_post_body(html), html
+
+
+def test_chain_synthetic_export():
+    # Posts 0-199 of generate-synthetic-export.py, whose "mixed" bodies have tags cut short
+    content = synthetic.EXPORT_HEADERS.index("Content")
+    for i in range(200):
+        html = synthetic.synthetic_row(0, i)[content]
+        assert post_body.rewrite(html) == ref_post_body(html), i
+
+
+def test_profile_rewrite_matches():
+    profile = posts.post_profile.Profile()
+    for html in CASES[1:]:
+        assert profile.rewrite(html) == post_body.rewrite(html)
+
+
+@pytest.mark.parametrize(
+    "html, compacted",
+    [
+        ("<p>a<br><br>b</p>", "<p>a<br><br>b</p>"),
+        ("<p><br>text</p>", "<p><br>text</p>"),
+        ("<p>a</p><br><p>b</p>", "<p>a</p><br><p>b</p>"),
+        ("<p>a&nbsp;&nbsp;&nbsp;b</p>", "<p>a&nbsp;&nbsp;&nbsp;b</p>"),
+        (
+            "<p><code>a   b\n c </code></p><textarea>  x\n\n y </textarea>",
+            "<p><code>a   b\n c </code></p><textarea>  x\n\n y </textarea>",
+        ),
+        ("<pre> x <br></pre>", "<pre> x <br></pre>"),
+        ("<p>text<br /></p><li><strong>a</strong><br> </li>", "<p>text</p><li><strong>a</strong></li>"),
+        ("<p>text<br><br></p><p><br></p>", "<p>text<br><br></p><p><br></p>"),
+        ("<p> \n </p><p>&nbsp;</p>a<strong> </strong>b<em></em>", "a<strong> </strong>b"),
+        ("<p>&nbsp; a&nbsp;b &#160;</p>\xa0\n<h2>&nbsp;</h2><p>c<br>&nbsp;</p>", "<p>a&nbsp;b</p><p>c</p>"),
+        ("<p>&nbsp;<br></p><p><code>&nbsp;</code></p>", "<p><br></p><p><code>&nbsp;</code></p>"),
+        ('<!-- wp:paragraph -->\n<h2 style="color:red">T</h2>\n\n<p> x  y <br> </p>\n', "<h2>T</h2><p>x  y</p>"),
+    ],
+)
+def test_compact_keeps_rendering(html, compacted):
+    assert posts.compact_post_body(html) == compacted
@@ -0,0 +1,21 @@
+import os
+
+import post_cache
+
+
+def test_size_limit_holds_during_a_run(tmp_path, monkeypatch):
+    monkeypatch.setattr(post_cache, "COMMIT_EVERY", 10)
+    path = str(tmp_path / "cache.sqlite")
+    cache = post_cache.PostCache(path, "v1", max_bytes=50_000)
+    body = "x" * 1000
+    for i in range(400):
+        cache.put(f"v1:{i}:hash", body, "")
+        (total,) = cache.conn.execute("SELECT SUM(size) FROM posts").fetchone()
+        assert total <= 50_000 + post_cache.COMMIT_EVERY * len(body)
+    # Never closed, as after a crash: what was committed is still within the limit
+    size = os.path.getsize(path)
+    cache.conn.close()
+    assert size < 400 * len(body) / 2
+    cache = post_cache.PostCache(path, "v1", max_bytes=50_000)
+    assert cache.get("v1:399:hash") == (body, "") and cache.get("v1:0:hash") is None
+    cache.close()
@@ -0,0 +1,100 @@
+"""--only patches single posts into a full run's output with the same bytes a new full run writes."""
+import csv
+
+import pytest
+
+import wp_export
+
+posts = wp_export.load_script("posts-to-webflow-csv")
+
+ROWS = [
+    # Its title holds a line that looks like the target's record start, inside a quoted field
+    {"ID": "1", "Title": 'Decoy "one"\n,target,\nend', "Slug": "decoy", "Content": "<p>a</p>", "Author ID": "1"},
+    {
+        "ID": "2",
+        "Title": 'Target "quoted"\nover two lines',
+        "Slug": "target",
+        "Content": "Line one\nLine two\n\nNext, \"para\"",
+        "Excerpt": 'Summary\n"with" newlines,\n',
+        "Categories": "News|Tips",
+        "Author ID": "2",
+        "Author First Name": "Jane",
+    },
+    {"ID": "3", "Title": "Last", "Slug": "last", "Content": "<p>c</p>", "Categories": "News", "Author ID": "1"},
+]
+
+
+def write_export(path, rows):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, wp_export.EXPORT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("key", ["target", "2"])
+def test_only_matches_full_run(tmp_path, monkeypatch, key):
+    export, patched, expected = (str(tmp_path / name) for name in ("export.csv", "patched.csv", "expected.csv"))
+    write_export(export, ROWS)
+    posts.main(["--input", export, "-o", patched, "--workers", "1"])
+
+    edited = dict(ROWS[1], Title='Target "edited"\n\n"again"', Content='New\n"body", longer\n\nthan before')
+    write_export(export, [ROWS[0], edited, ROWS[2]])
+    posts.main(["--input", export, "-o", expected, "--workers", "1"])
+    assert read(patched) != read(expected)
+
+    def no_rewrite(*args):
+        raise AssertionError("the record was not spliced in place")
+
+    monkeypatch.setattr(posts, "_rewrite_blog_csv", no_rewrite)
+    posts.main(["--input", export, "-o", patched, "--only", key])
+    assert read(patched) == read(expected)
+
+
+def test_find_record_skips_quoted_lines(tmp_path):
+    export, output = str(tmp_path / "export.csv"), str(tmp_path / "blog.csv")
+    write_export(export, ROWS)
+    posts.main(["--input", export, "-o", output, "--workers", "1"])
+    data = read(output)
+    start, end = posts._find_record(data, "target")
+    record = next(csv.reader([data[start:end].decode("utf-8")]))
+    assert record[:2] == ['Target "quoted"\nover two lines', "target"]
+    assert posts._find_record(data, "missing") is None
+
+
+def test_only_appends_and_removes(tmp_path):
+    export, output = str(tmp_path / "export.csv"), str(tmp_path / "blog.csv")
+    write_export(export, ROWS[:2])
+    posts.main(["--input", export, "-o", output, "--workers", "1"])
+    # decoy loses its title (so its row goes), last is not in the output yet (so it is appended)
+    write_export(export, [dict(ROWS[0], Title=""), ROWS[1], ROWS[2]])
+    posts.main(["--input", export, "-o", output, "--only", "decoy,last"])
+    with open(output, encoding="utf-8", newline="") as f:
+        assert [row["Slug"] for row in csv.DictReader(f)] == ["target", "last"]
+
+
+def test_only_rewrites_through_the_image_manifest(tmp_path):
+    export, patched, expected = (str(tmp_path / name) for name in ("export.csv", "patched.csv", "expected.csv"))
+    manifest = str(tmp_path / "images.json")
+    uploads = "https://example.com/wp-content/uploads/2020/01/"
+    body = (
+        f'<img src="{uploads}first.jpg?v=1"><p>text</p>'
+        f'<img src="{uploads}second.jpg?v=2" srcset="{uploads}x.jpg?a 2x">'
+    )
+    write_export(export, [dict(ROWS[1], Content=body)])
+    posts.main(["--input", export, "-o", patched, "--workers", "1", "--image-manifest", manifest])
+
+    edited = body.replace("<p>text</p>", f'<p>edited</p><img src="{uploads}new.jpg?v=3">')
+    write_export(export, [dict(ROWS[1], Content=edited)])
+    posts.main(["--input", export, "-o", expected, "--workers", "1", "--image-manifest", str(tmp_path / "new.json")])
+    assert "?v=" not in read(expected).decode("utf-8")
+
+    with open(manifest, "rb") as f:
+        saved = f.read()
+    posts.main(["--input", export, "-o", patched, "--only", "target", "--image-manifest", manifest])
+    assert read(patched) == read(expected)
+    assert read(manifest) == saved
@@ -0,0 +1,102 @@
+"""replace-font-headings-in-csv.py's chunked scan against one-shot regexes over the whole text."""
+import random
+import re
+
+import pytest
+
+import wp_export
+
+script = wp_export.load_script("replace-font-headings-in-csv")
+
+FRAGMENTS = [
+    '<strong><font size="+2">', '<strong><font size="+1">', '<STRONG><FONT SIZE="+2">', "</font></strong>",
+    "</FONT></STRONG>", "<strong>", "<font", ' size="+1">', "</font>", "</strong>", "Heading", "text ", "\n", '"',
+    '<strong><font size=""+2"">', '<strong><font size=""+1"">',
+]
+
+
+def combined_regex(text, quote='"'):
+    """Both rules as one regex: the leftmost opener takes the first closer after it."""
+    return re.sub(
+        rf"<strong><font size={quote}\+([12]){quote}>(.*?)</font></strong>",
+        lambda m: "<{0}>{1}</{0}>".format(script.HEADING_TAGS[m.group(1)], m.group(2)),
+        text,
+        flags=re.DOTALL | re.IGNORECASE,
+    )
+
+
+def two_passes(text):
+    """The original script: all +2 headings, then all +1 headings."""
+    text = re.sub(r'<strong><font size="\+2">(.*?)</font></strong>', r"<h2>\1</h2>", text, flags=re.DOTALL | re.I)
+    return re.sub(r'<strong><font size="\+1">(.*?)</font></strong>', r"<h3>\1</h3>", text, flags=re.DOTALL | re.I)
+
+
+def chunked(text, size, opener=script.FIELD_OPENER, spill_chars=script.CHUNK_CHARS):
+    chunks = [text[i: i + size] for i in range(0, len(text), size)]
+    return "".join(script.replace_headings(chunks, opener, spill_chars=spill_chars))
+
+
+def soups(seed, count):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 20)))
+
+
+CASES = [
+    "",
+    '<strong><font size="+2">Title</font></strong>',
+    'a<strong><font size="+1">Sub</font></strong>b<strong><font size="+2">T</font></strong>c',
+    '<strong><font size="+2">no closer',
+    '<strong><font size="+2">one</font></strong> two</font></strong>',
+    '<strong><font size="+2">x<strong><font size="+2">y</font></strong>',
+]
+
+
+@pytest.mark.parametrize("size", [1, 3, 7])
+@pytest.mark.parametrize("spill_chars", [0, 4, script.CHUNK_CHARS])
+def test_chunked_matches_one_shot(size, spill_chars):
+    for text in CASES + list(soups(size, 2000)):
+        assert chunked(text, size, spill_chars=spill_chars) == combined_regex(text), text
+
+
+@pytest.mark.parametrize("size", [1, 3, 7])
+def test_chunked_csv_opener(size):
+    for text in soups(10 + size, 1000):
+        assert chunked(text, size, script.CSV_OPENER) == combined_regex(text, '""'), text
+
+
+# An opener followed, before any closer, by another opener: the heading text would hold an opener
+NESTED_RE = re.compile(
+    r'<strong><font size="\+[12]">(?:(?!</font></strong>).)*<strong><font size="\+[12]">', re.IGNORECASE | re.DOTALL
+)
+
+
+def test_two_passes_agree_without_nested_openers():
+    for text in soups(20, 2000):
+        if not NESTED_RE.search(text):
+            assert script.process_field(text) == two_passes(text), text
+
+
+@pytest.mark.parametrize(
+    "text, passes, scan",
+    [
+        # The two passes closed the inner +2 heading first and left the +1 opener unmatched
+        (
+            '<strong><font size="+1">a<strong><font size="+2">b</font></strong>',
+            '<strong><font size="+1">a<h2>b</h2>',
+            '<h3>a<strong><font size="+2">b</h3>',
+        ),
+        # The +1 pass rewrote an opener inside a +2 heading, giving overlapping tags
+        (
+            '<strong><font size="+2">a<strong><font size="+1">b</font></strong></font></strong>',
+            "<h2>a<h3>b</h2></h3>",
+            '<h2>a<strong><font size="+1">b</h2></font></strong>',
+        ),
+    ],
+)
+def test_nested_opener_divergence(text, passes, scan):
+    # Documented in replace_headings: the leftmost opener takes the first closer, its text is kept as is
+    assert two_passes(text) == passes
+    assert script.process_field(text) == scan
+    for size in (1, 3, 7):
+        assert chunked(text, size) == scan
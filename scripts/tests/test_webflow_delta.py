@@ -0,0 +1,40 @@
+import csv
+import os
+
+import webflow_delta
+import wp_export
+
+posts = wp_export.load_script("posts-to-webflow-csv")
+
+
+def write_export(path, bodies):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, wp_export.EXPORT_COLUMNS)
+        writer.writeheader()
+        for i, (slug, body) in enumerate(bodies.items(), 1):
+            writer.writerow({"ID": str(i), "Title": slug.title(), "Slug": slug, "Content": body, "Author ID": "1"})
+
+
+def slugs(path):
+    with open(path, encoding="utf-8", newline="") as f:
+        return [row["Slug"] for row in csv.DictReader(f)]
+
+
+def test_since_previous_writes_added_changed_and_removed(tmp_path):
+    export, old, new = (str(tmp_path / name) for name in ("export.csv", "old.csv", "new.csv"))
+    write_export(export, {"kept": "<p>same</p>", "edited": "<p>before</p>", "dropped": "<p>gone</p>"})
+    posts.main(["--input", export, "-o", old, "--workers", "1"])
+
+    write_export(export, {"kept": "<p>same</p>", "edited": "<p>after</p>", "added": "<p>new</p>"})
+    posts.main(["--input", export, "-o", new, "--workers", "1", "--since-previous", old])
+
+    assert slugs(new) == ["kept", "edited", "added"]
+    assert slugs(str(tmp_path / "new-changed.csv")) == ["edited", "added"]
+    assert slugs(str(tmp_path / "new-removed.csv")) == ["dropped"]
+
+
+def test_delta_paths_follow_the_output():
+    assert webflow_delta.delta_paths(os.path.join("out", "blog.csv.gz")) == (
+        os.path.join("out", "blog-changed.csv.gz"),
+        os.path.join("out", "blog-removed.csv.gz"),
+    )
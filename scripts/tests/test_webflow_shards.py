@@ -0,0 +1,31 @@
+import json
+import os
+
+import pytest
+
+import webflow_shards
+
+
+def write(path, rows, fail=False):
+    with webflow_shards.ShardedWriter(path, ["Name"], max_rows=2) as writer:
+        for i in range(rows):
+            writer.writerow({"Name": f"post {i}"})
+        if fail:
+            raise RuntimeError("conversion crashed")
+
+
+def test_failed_run_keeps_last_manifest_and_shards(tmp_path):
+    path = str(tmp_path / "blog-webflow.csv")
+    write(path, 5)
+    with open(webflow_shards.manifest_path(path), encoding="utf-8") as f:
+        manifest = f.read()
+    with pytest.raises(RuntimeError):
+        write(path, 1, fail=True)
+    with open(webflow_shards.manifest_path(path), encoding="utf-8") as f:
+        assert f.read() == manifest
+    assert all(os.path.exists(webflow_shards.shard_path(path, n)) for n in (1, 2, 3))
+
+    write(path, 3)
+    with open(webflow_shards.manifest_path(path), encoding="utf-8") as f:
+        assert json.load(f)["rows"] == 3
+    assert not os.path.exists(webflow_shards.shard_path(path, 3))
@@ -0,0 +1,18 @@
+import wp_export
+
+
+def row(uid="", username="", first="", last=""):
+    return {"Author ID": uid, "Author Username": username, "Author First Name": first, "Author Last Name": last}
+
+
+def test_add_author_without_id_is_indexed():
+    authors = wp_export.SlugIndex()
+    assert wp_export.add_author(authors, row()) == "little-bee-speech"
+    assert wp_export.add_author(authors, row(username="bob")) == "bob"
+    assert wp_export.add_author(authors, row("7", first="Little Bee", last="Speech")) == "little-bee-speech-2"
+    assert wp_export.add_author(authors, row()) == "little-bee-speech"
+    assert list(authors.items()) == [
+        ("Little Bee Speech", "little-bee-speech"),
+        ("bob", "bob"),
+        ("Little Bee Speech", "little-bee-speech-2"),
+    ]
@@ -0,0 +1,131 @@
+"""A WXR export converts to the same blog CSV as the Posts export CSV of the same posts."""
+import csv
+
+import wp_export
+import wxr
+
+posts = wp_export.load_script("posts-to-webflow-csv")
+
+WP = "http://wordpress.org/export/1.2/"
+HEAD = f"""<?xml version="1.0" encoding="UTF-8" ?>
+<rss version="2.0" xmlns:excerpt="{WP}excerpt/" xmlns:content="http://purl.org/rss/1.0/modules/content/"
+ xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:wp="{WP}">
+<channel>
+<title>Blog</title>
+<wp:author><wp:author_id>3</wp:author_id><wp:author_login><![CDATA[jane]]></wp:author_login>
+<wp:author_first_name><![CDATA[Jane]]></wp:author_first_name><wp:author_last_name><![CDATA[Doe]]></wp:author_last_name>
+</wp:author>
+<wp:author><wp:author_id>4</wp:author_id><wp:author_login><![CDATA[bob]]></wp:author_login></wp:author>
+"""
+
+POSTS = [
+    {
+        "ID": "10",
+        "Title": "Hello & welcome",
+        "Slug": "hello",
+        "Content": 'Intro "quoted", with a comma.\n\n<img src="https://example.com/a.jpg">\nÜnïcode — line',
+        "Excerpt": "<p>Short <b>summary</b></p>",
+        "Date": "2020-01-02 10:00:00",
+        "Categories": "News|Tips",
+        "Image URL": "https://example.com/wp-content/uploads/featured.jpg",
+        "Author ID": "3",
+        "Author Username": "jane",
+        "Author First Name": "Jane",
+        "Author Last Name": "Doe",
+        "thumbnail": "11",
+    },
+    {
+        "ID": "12",
+        "Title": "Second",
+        "Slug": "second",
+        "Content": '<strong><font size="+2">Heading</font></strong>Body<p>unclosed<p>two',
+        "Excerpt": "",
+        "Date": "2020-02-03 08:30:00",
+        "Categories": "",
+        "Image URL": "",
+        "Author ID": "4",
+        "Author Username": "bob",
+        "Author First Name": "",
+        "Author Last Name": "",
+    },
+]
+
+
+def cdata(text):
+    return "<![CDATA[" + text.replace("]]>", "]]]]><![CDATA[>") + "]]>"
+
+
+def item(post, post_type="post", status="publish"):
+    categories = "".join(
+        f'<category domain="category" nicename="{name.lower()}">{cdata(name)}</category>'
+        for name in filter(None, post["Categories"].split("|"))
+    )
+    thumbnail = post.get("thumbnail")
+    meta = (
+        f"<wp:postmeta><wp:meta_key>_thumbnail_id</wp:meta_key><wp:meta_value>{thumbnail}</wp:meta_value></wp:postmeta>"
+        if thumbnail
+        else ""
+    )
+    return f"""<item>
+<title>{post["Title"].replace("&", "&amp;")}</title>
+<link>https://example.com/{post["Slug"]}/</link>
+<dc:creator>{cdata(post["Author Username"])}</dc:creator>
+<content:encoded>{cdata(post["Content"])}</content:encoded>
+<excerpt:encoded>{cdata(post["Excerpt"])}</excerpt:encoded>
+<wp:post_id>{post["ID"]}</wp:post_id>
+<wp:post_date>{post["Date"]}</wp:post_date>
+<wp:post_name>{post["Slug"]}</wp:post_name>
+<wp:status>{status}</wp:status>
+<wp:post_type>{post_type}</wp:post_type>
+{categories}{meta}
+</item>
+"""
+
+
+def write_wxr(path):
+    attachment = (
+        "<item><title>featured</title><wp:post_id>11</wp:post_id><wp:post_type>attachment</wp:post_type>"
+        "<wp:status>inherit</wp:status>"
+        "<wp:attachment_url>https://example.com/wp-content/uploads/featured.jpg</wp:attachment_url></item>\n"
+    )
+    trashed = dict(POSTS[1], ID="13", Slug="gone", Title="Gone")
+    page = dict(POSTS[1], ID="14", Slug="about", Title="About")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(HEAD)
+        f.write(item(POSTS[0]) + attachment + item(trashed, status="trash") + item(page, "page") + item(POSTS[1]))
+        f.write("</channel>\n</rss>\n")
+
+
+def write_csv(path):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, wp_export.EXPORT_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(POSTS)
+
+
+def test_read_posts(tmp_path):
+    path = str(tmp_path / "export.xml")
+    write_wxr(path)
+    assert wxr.is_wxr(path)
+    rows = list(wxr.read_posts(path))
+    assert [row["Slug"] for row in rows] == ["hello", "second"]
+    for row, post in zip(rows, POSTS):
+        assert {column: row[column] for column in wp_export.EXPORT_COLUMNS} == {
+            column: post[column] for column in wp_export.EXPORT_COLUMNS
+        }
+
+
+def test_wxr_converts_like_csv(tmp_path):
+    xml_path, csv_path = str(tmp_path / "export.xml"), str(tmp_path / "export.csv")
+    write_wxr(xml_path)
+    write_csv(csv_path)
+    for source in (xml_path, csv_path):
+        posts.main(["--input", source, "-o", source + ".blog.csv", "--workers", "1"])
+    with open(xml_path + ".blog.csv", "rb") as from_xml, open(csv_path + ".blog.csv", "rb") as from_csv:
+        assert from_xml.read() == from_csv.read()
+    with open(xml_path + ".blog.csv", encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [(row["Slug"], row["Author"], row["Image"]) for row in rows] == [
+        ("hello", "jane-doe", "https://example.com/a.jpg"),
+        ("second", "bob", ""),
+    ]
@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""Upload the converted Webflow CSVs to the Webflow CMS API v2: authors and categories first, then blog posts.
+
+Authors and categories go first so each post's Author and Category names can be resolved to the item IDs
+Webflow's reference fields need. CSV columns are matched to collection fields by display name or slug.
+Items are created up to 100 per request, with several requests in flight over a pool of keep-alive
+connections. A 429 pauses every request for its Retry-After and is then retried, without counting
+against --max-retries, until the request has been rate limited for --max-rate-limit-wait. 5xx and
+dropped connections are retried with exponential backoff. A create that failed that way may still have
+been applied, so before it is resent the collection is listed again and items whose slug is now there
+are left out. Items whose slug is already in the collection are skipped,
+so an interrupted upload can simply be run again.
+
+Try it offline with --mock, which runs mock-webflow-server.py in this process.
+"""
+import argparse
+import asyncio
+import csv
+import datetime
+import http.client
+import json
+import os
+import random
+import sys
+import time
+import urllib.parse
+
+import compressed
+import webflow_shards
+import wp_export
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+BLOG_CSV = os.path.join(PROJECT_DIR, "blog-webflow.csv")
+AUTHORS_CSV = os.path.join(PROJECT_DIR, "authors-webflow.csv")
+CATEGORIES_CSV = os.path.join(PROJECT_DIR, "categories-webflow.csv")
+
+API_BASE = "https://api.webflow.com/v2"
+TOKEN_ENV = "WEBFLOW_API_TOKEN"
+MAX_BATCH = 100  # Webflow's limit on items per create request
+MAX_BACKOFF = 60.0
+MAX_RATE_LIMIT_WAIT = 900.0  # seconds a request may keep getting 429s before the upload gives up
+
+
+class UploadError(Exception):
+    """The API rejected a request, or it still failed after all retries."""
+
+
+class UnconfirmedError(UploadError):
+    """A request that may have been applied failed without an answer (dropped connection or 5xx)."""
+
+
+def _retry_after(headers):
+    try:
+        return max(0.0, float(headers.get("Retry-After")))
+    except (TypeError, ValueError):
+        return None
+
+
+class WebflowClient:
+    """Minimal asyncio client for the Webflow API.
+
+    Requests run in worker threads on a pool of keep-alive http.client connections; the pool size bounds
+    how many are in flight. After a 429 no request is sent until its Retry-After has passed.
+    """
+
+    def __init__(
+        self, base_url, token, connections=4, max_retries=6, backoff=1.0, max_rate_limit_wait=MAX_RATE_LIMIT_WAIT
+    ):
+        url = urllib.parse.urlsplit(base_url)
+        self._scheme = url.scheme
+        self._netloc = url.netloc
+        self._prefix = url.path.rstrip("/")
+        self._headers = {
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/json",
+            "Content-Type": "application/json",
+        }
+        self._pool = asyncio.Queue()
+        for _ in range(connections):
+            self._pool.put_nowait(None)  # opened on first use
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_rate_limit_wait = max_rate_limit_wait
+        self._resume_at = 0.0  # time.monotonic() before which nothing is sent
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.confirmed = 0  # items of failed creates found in the collection when it was listed again
+
+    def _send(self, conn, method, path, body):
+        # Runs in a worker thread; returns the connection for reuse
+        if conn is None:
+            connection_class = http.client.HTTPSConnection if self._scheme == "https" else http.client.HTTPConnection
+            conn = connection_class(self._netloc, timeout=120)
+        try:
+            conn.request(method, self._prefix + path, body=body, headers=self._headers)
+            response = conn.getresponse()
+            data = response.read()
+        except BaseException:
+            conn.close()
+            raise
+        return conn, response.status, response.headers, data
+
+    def _backoff_delay(self, attempt):
+        return min(MAX_BACKOFF, self.backoff * 2**attempt) * random.uniform(0.5, 1.0)
+
+    async def request(self, method, path, payload=None, resend=True):
+        """Send a request and return its decoded JSON, retrying rate limits and transient failures.
+
+        A 429 waits for its Retry-After and does not count against max_retries, but a request still rate
+        limited max_rate_limit_wait seconds after its first 429 raises UploadError. With resend=False a
+        failure that may have reached the server (dropped connection or 5xx) raises UnconfirmedError instead
+        of being sent again.
+        """
+        body = None if payload is None else json.dumps(payload).encode("utf-8")
+        failures = rate_limits = 0
+        limited_since = None
+        while True:
+            while (wait := self._resume_at - time.monotonic()) > 0:
+                await asyncio.sleep(wait)
+            conn = await self._pool.get()
+            self.requests += 1
+            status = None
+            try:
+                conn, status, headers, data = await asyncio.to_thread(self._send, conn, method, path, body)
+            except (OSError, http.client.HTTPException) as exc:
+                conn = None
+                error = f"{type(exc).__name__}: {exc}"
+            else:
+                if status < 300:
+                    return json.loads(data) if data else {}
+                error = f"HTTP {status}: {data[:300].decode('utf-8', 'replace')}"
+                if status < 500 and status != 429:
+                    raise UploadError(f"{method} {path}: {error}")
+            finally:
+                self._pool.put_nowait(conn)
+            if status == 429:
+                self.rate_limited += 1
+                pause = _retry_after(headers)
+                pause = self._backoff_delay(rate_limits) if pause is None else pause
+                now = time.monotonic()
+                limited_since = now if limited_since is None else limited_since
+                if now + pause - limited_since > self.max_rate_limit_wait:
+                    raise UploadError(
+                        f"{method} {path}: still rate limited after {rate_limits + 1} attempts over "
+                        f"{now - limited_since:.0f}s ({error})"
+                    )
+                self._resume_at = max(self._resume_at, time.monotonic() + pause)
+                rate_limits += 1
+                continue
+            if not resend:
+                raise UnconfirmedError(f"{method} {path}: {error}")
+            if failures == self.max_retries:
+                raise UploadError(f"{method} {path}: still failing after {failures + 1} attempts ({error})")
+            self.retries += 1
+            await asyncio.sleep(self._backoff_delay(failures))
+            failures += 1
+
+    async def close(self):
+        while not self._pool.empty():
+            conn = self._pool.get_nowait()
+            if conn is not None:
+                conn.close()
+
+    async def collection_fields(self, collection_id):
+        return (await self.request("GET", f"/collections/{collection_id}"))["fields"]
+
+    async def list_items(self, collection_id):
+        """All items of a collection, 100 per request."""
+        items = []
+        while True:
+            page = await self.request("GET", f"/collections/{collection_id}/items?offset={len(items)}&limit=100")
+            items.extend(page.get("items") or [])
+            total = (page.get("pagination") or {}).get("total", 0)
+            if not page.get("items") or len(items) >= total:
+                return items
+
+    async def create_items(self, collection_id, items, live=False):
+        """Create items and return them as Webflow stored them.
+
+        A create that fails without an answer may still have been applied, so it is not simply sent again:
+        the collection is listed and only the items whose slug it does not have yet are resent.
+        """
+        path = f"/collections/{collection_id}/items" + ("/live" if live else "")
+        created = []
+        failures = 0
+        while True:
+            try:
+                response = await self.request("POST", path, {"items": items}, resend=False)
+                return created + (response.get("items") or [])
+            except UnconfirmedError as exc:
+                error = exc
+            if failures == self.max_retries:
+                raise UploadError(f"{error}; still failing after {failures + 1} attempts")
+            self.retries += 1
+            await asyncio.sleep(self._backoff_delay(failures))
+            failures += 1
+            present = {}
+            for item in await self.list_items(collection_id):
+                present[(item.get("fieldData") or {}).get("slug")] = item
+            sent = [item["fieldData"].get("slug") for item in items]
+            found = [present[slug] for slug in sent if slug in present]
+            self.confirmed += len(found)
+            created.extend(found)
+            items = [item for item, slug in zip(items, sent) if slug not in present]
+            if not items:
+                return created
+
+
+def _iso_date(value):
+    """"2020-01-01 10:00:00" -> "2020-01-01T10:00:00.000Z" (export dates are taken as UTC)."""
+    try:
+        moment = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        return value
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(datetime.timezone.utc)
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def _key(value):
+    return value.strip().lower()
+
+
+class Collection:
+    """One CMS collection being filled from a CSV: its field mapping and a name/slug -> item ID lookup."""
+
+    def __init__(self, label, collection_id, fields, headers):
+        self.label = label
+        self.id = collection_id
+        by_name = {}
+        for field in fields:
+            by_name.setdefault(_key(field["displayName"]), field)
+            by_name.setdefault(_key(field["slug"]), field)
+        self.fields = {header: by_name[_key(header)] for header in headers if _key(header) in by_name}
+        self.unmapped = [header for header in headers if header not in self.fields]
+        self.ids = {}  # lowercased name and slug -> item ID
+        self.slugs = set()
+        self.created = 0
+        self.skipped = 0
+
+    def remember(self, item):
+        data = item.get("fieldData") or {}
+        for value in (data.get("name"), data.get("slug")):
+            if value:
+                self.ids[_key(value)] = item["id"]
+        if data.get("slug"):
+            self.slugs.add(data["slug"])
+
+
+def _field_value(field, value, collections, missing):
+    """A CSV value as Webflow expects it for the field's type, or None to leave the field out."""
+    kind = field["type"]
+    if kind != "RichText":
+        value = value.strip()
+    if not value:
+        return False if kind == "Switch" else None
+    if kind == "Switch":
+        return value.lower() in ("true", "yes", "1")
+    if kind == "Number":
+        number = float(value)
+        return int(number) if number.is_integer() else number
+    if kind == "Image":
+        return {"url": value}
+    if kind == "DateTime":
+        return _iso_date(value)
+    if kind in ("Reference", "MultiReference"):
+        target = collections.get((field.get("validations") or {}).get("collectionId"))
+        ids = []
+        for name in value.split(";") if kind == "MultiReference" else [value]:
+            if not name.strip():
+                continue
+            item_id = target.ids.get(_key(name)) if target else None
+            if item_id is None:
+                missing.add(f"{field['displayName']}: {name.strip()}")
+            else:
+                ids.append(item_id)
+        if kind == "Reference":
+            return ids[0] if ids else None
+        return ids
+    return value
+
+
+def _csv_rows(path):
+    for csv_path in webflow_shards.csv_paths(path):
+        with compressed.open_text(csv_path) as f_in:
+            yield from csv.DictReader(f_in)
+
+
+def _csv_headers(path):
+    header = wp_export.read_csv_header(webflow_shards.csv_paths(path)[0])
+    return header or []
+
+
+async def upload_csv(client, collection, path, collections, args):
+    """Create an item for each CSV row whose slug the collection does not have yet."""
+    for item in await client.list_items(collection.id):
+        collection.remember(item)
+    missing = set()
+
+    def items():
+        for row in _csv_rows(path):
+            slug = (row.get("Slug") or "").strip()
+            if slug and slug in collection.slugs:
+                collection.skipped += 1
+                continue
+            collection.slugs.add(slug)
+            field_data = {}
+            for header, field in collection.fields.items():
+                value = _field_value(field, row.get(header) or "", collections, missing)
+                if value is not None:
+                    field_data[field["slug"]] = value
+            yield {"isArchived": False, "isDraft": args.draft, "fieldData": field_data}
+
+    async def send(batch):
+        created = await client.create_items(collection.id, batch, live=args.live)
+        for item in created:
+            collection.remember(item)
+        collection.created += len(created)
+
+    # Keep a bounded number of batches in flight so a large CSV is never held in memory
+    pending = done = set()
+    try:
+        batch = []
+        for item in items():
+            batch.append(item)
+            if len(batch) < args.batch_size:
+                continue
+            if len(pending) >= args.concurrency * 2:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    task.result()
+            pending.add(asyncio.create_task(send(batch)))
+            batch = []
+        if batch:
+            pending.add(asyncio.create_task(send(batch)))
+        for task in asyncio.as_completed(pending):
+            await task
+    except BaseException:
+        for task in pending:
+            task.cancel()
+        # Collect them all, so batches that failed at the same time are not reported again on exit
+        await asyncio.gather(*pending, *done, return_exceptions=True)
+        raise
+    return missing
+
+
+async def upload(args):
+    client = WebflowClient(
+        args.api_base,
+        args.token,
+        connections=args.concurrency,
+        max_retries=args.max_retries,
+        backoff=args.backoff,
+        max_rate_limit_wait=args.max_rate_limit_wait,
+    )
+    started = time.perf_counter()
+    collections = {}
+    try:
+        for label, collection_id, path in (
+            ("authors", args.authors_collection, args.authors_csv),
+            ("categories", args.categories_collection, args.categories_csv),
+            ("blog", args.blog_collection, args.blog_csv),
+        ):
+            collection = Collection(
+                label, collection_id, await client.collection_fields(collection_id), _csv_headers(path)
+            )
+            if collection.unmapped:
+                print(f"{label}: no collection field for column(s) {', '.join(collection.unmapped)}; not uploaded")
+            collections[collection_id] = collection
+            missing = await upload_csv(client, collection, path, collections, args)
+            print(f"{label}: created {collection.created} items, {collection.skipped} already present")
+            for reference in sorted(missing)[:20]:
+                print(f"  unresolved reference {reference}")
+            if len(missing) > 20:
+                print(f"  ... and {len(missing) - 20} more unresolved references")
+    finally:
+        await client.close()
+    seconds = time.perf_counter() - started
+    created = sum(collection.created for collection in collections.values())
+    print(
+        f"{created} items in {seconds:.1f}s ({created / seconds if seconds else 0:.0f} items/s): "
+        f"{client.requests} requests, {client.retries} retries, {client.rate_limited} rate-limited"
+        + (f", {client.confirmed} created by requests that failed" if client.confirmed else "")
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--blog-csv", default=BLOG_CSV, help=f"blog CSV or shard manifest (default {BLOG_CSV})")
+    parser.add_argument("--authors-csv", default=AUTHORS_CSV, help=f"default {AUTHORS_CSV}")
+    parser.add_argument("--categories-csv", default=CATEGORIES_CSV, help=f"default {CATEGORIES_CSV}")
+    parser.add_argument("--blog-collection", help="blog posts collection ID")
+    parser.add_argument("--authors-collection", help="authors collection ID")
+    parser.add_argument("--categories-collection", help="categories collection ID")
+    parser.add_argument("--token", default=os.environ.get(TOKEN_ENV), help=f"API token (default ${TOKEN_ENV})")
+    parser.add_argument("--api-base", default=API_BASE, help=f"default {API_BASE}")
+    parser.add_argument("--live", action="store_true", help="publish items as they are created")
+    parser.add_argument("--draft", action="store_true", help="create items as drafts")
+    parser.add_argument("--concurrency", type=int, default=4, help="requests in flight (default 4)")
+    parser.add_argument(
+        "--batch-size", type=int, default=MAX_BATCH, help=f"items per create request (default and max {MAX_BATCH})"
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=6,
+        help="retries per request after 5xx or dropped connections; 429s are not counted (default 6)",
+    )
+    parser.add_argument(
+        "--max-rate-limit-wait",
+        type=float,
+        default=MAX_RATE_LIMIT_WAIT,
+        metavar="SECONDS",
+        help=f"give up on a request still getting 429s this long after the first (default {MAX_RATE_LIMIT_WAIT:g})",
+    )
+    parser.add_argument("--backoff", type=float, default=1.0, help="first retry delay in seconds, doubled each time")
+    parser.add_argument(
+        "--mock", action="store_true", help="upload to mock-webflow-server.py started in this process (no network)"
+    )
+    parser.add_argument("--mock-rate-limit", type=int, default=600, help="--mock requests per minute (default 600)")
+    args = parser.parse_args(argv)
+    if not 1 <= args.batch_size <= MAX_BATCH:
+        parser.error(f"--batch-size must be between 1 and {MAX_BATCH}")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if not args.mock:
+        needed = ("--blog-collection", "--authors-collection", "--categories-collection", "--token")
+        absent = [flag for flag in needed if not getattr(args, flag[2:].replace("-", "_"))]
+        if absent:
+            parser.error(f"{', '.join(absent)} required (or --mock)")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    server = None
+    if args.mock:
+        mock = wp_export.load_script("mock-webflow-server")
+        server = mock.start(rate_limit=args.mock_rate_limit)
+        args.api_base = server.url
+        args.token = args.token or "mock"
+        args.blog_collection = args.blog_collection or "blog"
+        args.authors_collection = args.authors_collection or "authors"
+        args.categories_collection = args.categories_collection or "categories"
+        print(f"Uploading to the mock API at {server.url}")
+    try:
+        asyncio.run(upload(args))
+    except UploadError as exc:
+        sys.exit(f"Upload failed: {exc}")
+    finally:
+        if server is not None:
+            server.shutdown()
+            print(f"Mock server: {json.dumps(server.api.stats)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Compare a new Webflow CSV with the previously imported one, keyed by Slug.
+
+Both files are streamed: only a slug -> 16-byte digest index of the previous file is kept in memory.
+"""
+import csv
+import hashlib
+import os
+
+import compressed
+import webflow_shards
+
+
+def row_digest(row, fields):
+    """Digest of a CSV row's values for the given fields."""
+    digest = hashlib.blake2b(digest_size=16)
+    for field in fields:
+        digest.update((row.get(field) or "").encode("utf-8"))
+        digest.update(b"\0")
+    return digest.digest()
+
+
+def delta_paths(path):
+    """blog-webflow.csv -> (blog-webflow-changed.csv, blog-webflow-removed.csv) beside it (a .gz/.bz2/.xz
+    suffix is kept at the end)."""
+    base = compressed.strip_suffix(path)
+    root, ext = os.path.splitext(base)
+    return f"{root}-changed{ext}{path[len(base):]}", f"{root}-removed{ext}{path[len(base):]}"
+
+
+def read_index(path, fields, key="Slug"):
+    """Stream a Webflow CSV (or the shards in its manifest) into {slug: row digest}; rows without a slug
+    are not indexed."""
+    index = {}
+    for csv_path in webflow_shards.csv_paths(path):
+        with compressed.open_text(csv_path) as f_in:
+            for row in csv.DictReader(f_in):
+                slug = (row.get(key) or "").strip()
+                if slug:
+                    index[slug] = row_digest(row, fields)
+    return index
+
+
+def write_delta(previous, new_path, changed_path, removed_path, key="Slug"):
+    """Write rows of new_path (a CSV or shard manifest) that are new or differ from the previous index to
+    changed_path, and slugs only in the previous index to removed_path; return (changed, unchanged, removed).
+
+    Consumes previous: matched slugs are popped, so what is left afterwards is the removed set.
+    """
+    changed = 0
+    unchanged = 0
+    writer = None
+    with compressed.open_text(changed_path, "w") as f_out:
+        for csv_path in webflow_shards.csv_paths(new_path):
+            with compressed.open_text(csv_path) as f_in:
+                reader = csv.DictReader(f_in)
+                if writer is None:
+                    writer = csv.DictWriter(f_out, fieldnames=reader.fieldnames, quoting=csv.QUOTE_MINIMAL)
+                    writer.writeheader()
+                for row in reader:
+                    slug = (row.get(key) or "").strip()
+                    if slug and previous.pop(slug, None) == row_digest(row, reader.fieldnames):
+                        unchanged += 1
+                        continue
+                    writer.writerow(row)
+                    changed += 1
+
+    with compressed.open_text(removed_path, "w") as f_out:
+        writer = csv.writer(f_out)
+        writer.writerow([key])
+        writer.writerows([slug] for slug in previous)
+    return changed, unchanged, len(previous)
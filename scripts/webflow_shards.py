@@ -0,0 +1,142 @@
+"""Write a Webflow CSV as numbered shards that fit Webflow's per-import row and file size limits.
+
+blog-webflow.csv becomes blog-webflow-0001.csv, blog-webflow-0002.csv, ... each with its own header,
+plus blog-webflow-manifest.json listing them. Rows are encoded once, so the split happens during the
+single streaming write and sizes are the exact UTF-8 bytes written (before any .gz/.bz2/.xz compression).
+"""
+import csv
+import io
+import json
+import os
+
+import compressed
+import wp_export
+
+
+def shard_path(path, number):
+    """blog-webflow.csv -> blog-webflow-0001.csv (a .gz/.bz2/.xz suffix is kept at the end)."""
+    base = compressed.strip_suffix(path)
+    root, ext = os.path.splitext(base)
+    return f"{root}-{number:04d}{ext}{path[len(base):]}"
+
+
+def manifest_path(path):
+    """blog-webflow.csv -> blog-webflow-manifest.json"""
+    return os.path.splitext(compressed.strip_suffix(path))[0] + "-manifest.json"
+
+
+def csv_paths(path):
+    """The CSV files behind path: the shards listed in a manifest, or path itself."""
+    if not path.endswith(".json"):
+        return [path]
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    directory = os.path.dirname(path)
+    return [os.path.join(directory, shard["file"]) for shard in manifest["shards"]]
+
+
+def add_shard_arguments(parser):
+    """Add --shard-max-rows and --shard-max-mb to an argparse parser."""
+    parser.add_argument(
+        "--shard-max-rows",
+        type=int,
+        metavar="N",
+        help="split the output into <name>-0001.csv, <name>-0002.csv, ... of at most N rows each, "
+        "listed in <name>-manifest.json",
+    )
+    parser.add_argument(
+        "--shard-max-mb", type=float, metavar="MB", help="likewise, keep each shard under this many MB (with header)"
+    )
+
+
+def shard_limits(args):
+    """(max_rows, max_bytes) from --shard-max-rows/--shard-max-mb, or None when not sharding."""
+    if not args.shard_max_rows and not args.shard_max_mb:
+        return None
+    return args.shard_max_rows, int(args.shard_max_mb * 1e6) if args.shard_max_mb else None
+
+
+class ShardedWriter:
+    """A csv.DictWriter that starts a new shard whenever the next row would pass max_rows or max_bytes.
+
+    A single row bigger than max_bytes gets a shard to itself, flagged "over_max_bytes" in the manifest.
+    close() removes higher-numbered shards left by an earlier, longer run and writes the manifest. Leaving a
+    with block on an exception only closes the open shard: the manifest and shards of the last complete run
+    stay as they were.
+    """
+
+    def __init__(self, path, fieldnames, max_rows=None, max_bytes=None, **fmtparams):
+        self.path = path
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.shards = []  # {"file", "rows", "bytes"} per shard written
+        self._buffer = io.StringIO()
+        self._writer = csv.DictWriter(self._buffer, fieldnames, **fmtparams)
+        self._writer.writeheader()
+        self._header = self._take()
+        self._file = None
+
+    def _take(self):
+        text = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return text
+
+    @staticmethod
+    def _size(text):
+        return len(text) if text.isascii() else len(text.encode("utf-8"))
+
+    def _start_shard(self):
+        if self._file is not None:
+            self._file.close()
+        path = shard_path(self.path, len(self.shards) + 1)
+        self._file = compressed.open_text(path, "w")
+        self._file.write(self._header)
+        self.shards.append({"file": os.path.basename(path), "rows": 0, "bytes": self._size(self._header)})
+
+    def writerow(self, row):
+        self._writer.writerow(row)
+        text = self._take()
+        size = self._size(text)
+        shard = self.shards[-1] if self.shards else None
+        if shard is None or shard["rows"] and (
+            (self.max_rows and shard["rows"] >= self.max_rows)
+            or (self.max_bytes and shard["bytes"] + size > self.max_bytes)
+        ):
+            self._start_shard()
+            shard = self.shards[-1]
+        self._file.write(text)
+        shard["rows"] += 1
+        shard["bytes"] += size
+        if self.max_bytes and shard["bytes"] > self.max_bytes:
+            shard["over_max_bytes"] = True
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        self._close_file()
+        number = len(self.shards) + 1
+        while os.path.exists(shard_path(self.path, number)):
+            os.remove(shard_path(self.path, number))
+            number += 1
+        manifest = {
+            "max_rows": self.max_rows,
+            "max_bytes": self.max_bytes,
+            "rows": sum(shard["rows"] for shard in self.shards),
+            "bytes": sum(shard["bytes"] for shard in self.shards),
+            "shards": self.shards,
+        }
+        with wp_export.atomic_write(manifest_path(self.path)) as f:
+            json.dump(manifest, f, indent=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if exc_info[0] is None:
+            self.close()
+        else:
+            self._close_file()
@@ -0,0 +1,688 @@
+"""Shared helpers for the WordPress export -> Webflow scripts in this folder."""
+import argparse
+import contextlib
+import csv
+import functools
+import importlib.util
+import itertools
+import multiprocessing
+import multiprocessing.connection
+import operator
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import checkpoint
+import compressed
+import export_snapshot
+import wxr
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_CHUNK_SIZE = 100
+# Author for posts without one in the export
+DEFAULT_AUTHOR = "Little Bee Speech"
+
+_loaded_scripts = []  # names passed to load_script, re-loaded in worker processes
+
+# The export columns the converters read; everything else is dropped as each row is parsed
+EXPORT_COLUMNS = (
+    "ID",
+    "Title",
+    "Slug",
+    "Content",
+    "Excerpt",
+    "Date",
+    "Categories",
+    "Image URL",
+    "Author ID",
+    "Author Username",
+    "Author First Name",
+    "Author Last Name",
+)
+
+# Long posts can exceed csv's default 128 KB field limit; 2**31 - 1 still fits a C long on Windows
+csv.field_size_limit(2**31 - 1)
+
+
+class RowError(Exception):
+    """A row transform failed; the message names the row (post ID/title) that caused it."""
+
+
+class _ChunkError(Exception):
+    """Raised in a worker process: (index of the failing row in its chunk, error text)."""
+
+
+class ExportRow(tuple):
+    """A projected export row, (column -> position map, value, value, ...), read with .get() like a dict.
+
+    The map is shared by every row of a file, so a row costs one tuple instead of a dict of every column.
+    """
+
+    __slots__ = ()
+
+    def get(self, name, default=None):
+        position = self[0].get(name)
+        return default if position is None else self[position]
+
+    def keys(self):
+        return self[0].keys()
+
+    def items(self):
+        return ((name, self[position]) for name, position in self[0].items())
+
+
+def read_export_rows(f, columns=EXPORT_COLUMNS):
+    """Yield an ExportRow of just `columns` for each record of an open export CSV.
+
+    Column positions are resolved from the header once. Like csv.DictReader, blank lines are skipped,
+    fields missing from a short row read as None and a column absent from the header is absent from .get().
+    """
+    reader = csv.reader(f)
+    header = next(reader, None)
+    if header is not None:
+        yield from project_rows(header, reader, columns)
+
+
+def _projection(header, columns):
+    """The ExportRow field map for `columns` and the header positions to take them from."""
+    position_in_header = {name: i for i, name in enumerate(header)}  # last duplicate wins, as in DictReader
+    present = [name for name in columns if name in position_in_header]
+    return {name: k + 1 for k, name in enumerate(present)}, [position_in_header[name] for name in present]
+
+
+def project_rows(header, records, columns=EXPORT_COLUMNS):
+    """Yield an ExportRow of just `columns` for each csv.reader record (after the header) in records."""
+    fields, picks = _projection(header, columns)
+    if len(picks) > 1:
+        pick = operator.itemgetter(*picks)
+    else:
+        def pick(values):
+            return tuple(values[i] for i in picks)
+    needed = max(picks, default=-1) + 1
+    for values in records:
+        if not values:
+            continue
+        if len(values) >= needed:
+            yield ExportRow((fields, *pick(values)))
+        else:
+            yield ExportRow((fields, *(values[i] if i < len(values) else None for i in picks)))
+
+
+@contextlib.contextmanager
+def open_export_rows(path, columns=EXPORT_COLUMNS):
+    """Open a Posts export CSV or a WordPress WXR (XML) file, optionally compressed (see compressed.py),
+    and yield an iterator of its ExportRows.
+
+    WXR input is detected by extension or content and streamed with wxr.read_posts, so both formats
+    feed the converters the same rows. A CSV with a current export_snapshot is read from the snapshot,
+    decoding only `columns`.
+    """
+    if wxr.is_wxr(path):
+        fields = {name: k + 1 for k, name in enumerate(columns)}
+        posts = wxr.read_posts(path, featured_images="Image URL" in fields)
+        yield (ExportRow((fields, *(post.get(name) for name in columns))) for post in posts)
+        return
+    snapshot = export_snapshot.current(path)
+    if snapshot is None:
+        with compressed.open_text(path) as f:
+            yield read_export_rows(f, columns)
+    else:
+        with snapshot:
+            fields, picks = _projection(snapshot.header or [], columns)
+            yield (ExportRow((fields, *values)) for values in snapshot.select(picks))
+
+
+@contextlib.contextmanager
+def open_records(path):
+    """Yield an iterator of a CSV's csv.reader records after the header, from its snapshot when current."""
+    snapshot = export_snapshot.current(path)
+    if snapshot is None:
+        with compressed.open_text(path) as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            yield reader
+    else:
+        with export_snapshot.SnapshotRecords(snapshot) as records:
+            yield records
+
+
+@contextlib.contextmanager
+def open_dict_rows(path):
+    """Yield (fieldnames, iterator of csv.DictReader rows) for a CSV, from its snapshot when current."""
+    snapshot = export_snapshot.current(path)
+    if snapshot is None:
+        with compressed.open_text(path) as f:
+            reader = csv.DictReader(f)
+            yield reader.fieldnames, reader
+        return
+    with snapshot:
+        yield snapshot.header, _dict_rows(snapshot)
+
+
+def _dict_rows(snapshot):
+    # As csv.DictReader: blank records skipped, short ones padded with None, extra fields under None
+    fieldnames = snapshot.header or []
+    for i in range(snapshot.records):
+        values = snapshot.record(i)
+        if not values:
+            continue
+        row = dict(zip(fieldnames, values))
+        if len(values) > len(fieldnames):
+            row[None] = values[len(fieldnames):]
+        elif len(values) < len(fieldnames):
+            for name in fieldnames[len(values):]:
+                row[name] = None
+        yield row
+
+
+def column_indices(header, names):
+    """Positions in a csv.reader header of the given column names that are present."""
+    return tuple(header.index(name) for name in names if name in header)
+
+
+class TimedOut:
+    """Yielded by map_rows(..., timeout=...) in place of the result for a row that ran past the budget."""
+
+    def __init__(self, row, seconds):
+        self.row = row
+        self.seconds = seconds
+
+
+class QuarantineFile:
+    """CSV of rows set aside during a run (e.g. over the time budget), with a "Quarantine reason" column.
+
+    The file is created on the first add(); a stale one from an earlier run is removed up front, except
+    for its first `keep` rows when a resumed run carries on after them.
+    """
+
+    def __init__(self, path, keep=0):
+        self.path = path
+        self.count = 0
+        self._file = None
+        self._writer = None
+        kept = []
+        if keep and os.path.exists(path):
+            with compressed.open_text(path) as f:
+                kept = list(itertools.islice(csv.DictReader(f), keep))
+        if os.path.exists(path):
+            os.remove(path)
+        for row in kept:
+            self.add(row, row.pop("Quarantine reason"))
+
+    def add(self, row, reason):
+        if self._writer is None:
+            self._file = compressed.open_text(self.path, "w")
+            fieldnames = [*row.keys(), "Quarantine reason"]
+            self._writer = csv.DictWriter(self._file, fieldnames=fieldnames, extrasaction="ignore")
+            self._writer.writeheader()
+        self._writer.writerow({**dict(row.items()), "Quarantine reason": reason})
+        self.count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+def load_script(name):
+    """Import scripts/<name>.py (e.g. "posts-to-webflow-csv") as a module named with underscores."""
+    module_name = name.replace("-", "_")
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, os.path.join(SCRIPT_DIR, name + ".py"))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[module_name]
+            raise
+        _loaded_scripts.append(name)
+    return sys.modules[module_name]
+
+
+def _load_scripts(names):
+    for name in names:
+        load_script(name)
+
+
+@functools.lru_cache(maxsize=4096)  # the same few hundred author/category names repeat on every row
+def name_to_slug(name):
+    """Convert name to URL-safe slug: lowercase, spaces/special -> hyphens."""
+    if not name or not str(name).strip():
+        return ""
+    s = str(name).strip().lower()
+    s = re.sub(r"[^\w\s-]", "", s)  # remove non-word except space and hyphen
+    s = re.sub(r"[-\s]+", "-", s)  # collapse spaces and hyphens to single hyphen
+    return s.strip("-")
+
+
+AUTHOR_COLUMNS = ("Author ID", "Author Username", "Author First Name", "Author Last Name")
+CATEGORY_COLUMNS = ("Categories",)
+
+
+class SlugIndex:
+    """Key -> (name, slug) for a Webflow reference collection (authors by Author ID, categories by name).
+
+    A key keeps the slug it was first given. When a different key's name slugifies the same way (two
+    authors named "Jane Doe", categories "News" and "news"), the later one gets -2, -3, ... so every
+    item, and every post referencing it, stays distinct. Scripts that see the rows in the same order
+    assign the same slugs.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._taken = set()
+        self.collisions = []  # (name, disambiguated slug)
+
+    def add(self, key, name):
+        """Return the slug for key, assigning one from name the first time key is seen."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry[1]
+        base = slug = name_to_slug(name)
+        n = 2
+        while slug and slug in self._taken:
+            slug = f"{base}-{n}"
+            n += 1
+        if slug != base:
+            self.collisions.append((name, slug))
+        self._taken.add(slug)
+        self._entries[key] = (name, slug)
+        return slug
+
+    def items(self):
+        """(name, slug) pairs in first-seen order."""
+        return self._entries.values()
+
+    def entries(self, start=0):
+        """[key, name, slug] for each key from the start-th one seen, to save for restore()."""
+        return [[key, name, slug] for key, (name, slug) in itertools.islice(self._entries.items(), start, None)]
+
+    def restore(self, entries):
+        """Re-add saved entries() with their slugs as assigned then."""
+        for key, name, slug in entries:
+            if slug != name_to_slug(name):
+                self.collisions.append((name, slug))
+            self._taken.add(slug)
+            self._entries[key] = (name, slug)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def author_name(row):
+    """The row's author display name: "First Last", else the username ("" if neither)."""
+    first = (row.get("Author First Name") or "").strip()
+    last = (row.get("Author Last Name") or "").strip()
+    return f"{first} {last}".strip() if (first or last) else (row.get("Author Username") or "").strip()
+
+
+def add_author(authors, row):
+    """Record the row's author in a SlugIndex and return its slug. Authors are keyed by Author ID; rows
+    without one by "name:" + their author name (DEFAULT_AUTHOR if they have none), so they get a row too."""
+    uid = (row.get("Author ID") or "").strip()
+    if not uid:
+        name = author_name(row) or DEFAULT_AUTHOR
+        return authors.add("name:" + name, name)
+    return authors.add(uid, author_name(row) or f"Author {uid}")
+
+
+def add_categories(categories, row):
+    """Record the row's pipe-separated categories in a SlugIndex keyed by name; return their slugs."""
+    raw = (row.get("Categories") or "").strip()
+    if not raw:
+        return []
+    return [categories.add(name, name) for name in (part.strip() for part in raw.split("|")) if name]
+
+
+def collision_report(label, index):
+    """Console lines for slugs an index had to disambiguate."""
+    return [f"Slug collision among {label}: {name!r} -> {slug}" for name, slug in index.collisions]
+
+
+def write_name_slug_csv(path, items):
+    """Write (name, slug) pairs sorted by name to a Webflow Name/Slug CSV; return how many were written."""
+    items = sorted(items, key=lambda x: x[0].lower())
+    with compressed.open_text(path, "w") as f_out:
+        writer = csv.writer(f_out)
+        writer.writerow(["Name", "Slug"])
+        writer.writerows(items)
+    return len(items)
+
+
+def read_csv_header(path):
+    """Return the first record of a CSV file, or None if it is empty."""
+    with compressed.open_text(path) as f:
+        return next(csv.reader(f), None)
+
+
+@contextlib.contextmanager
+def atomic_write(path, binary=False):
+    """Open a temp file next to path for writing; when the block succeeds, fsync it and rename it over path.
+
+    If the block raises (or the process dies) the original file is left untouched. Close any reader of
+    path before the block ends: Windows cannot rename over an open file. A .gz/.bz2/.xz path is written
+    compressed. With binary, the file takes bytes (plain paths only).
+    """
+    if binary and compressed.codec(path) is not None:
+        raise ValueError(f"atomic_write(binary=True) does not compress: {path}")
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        if binary:
+            with os.fdopen(fd, "wb") as f:
+                yield f
+                f.flush()
+                os.fsync(f.fileno())
+        elif compressed.codec(path) is None:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+                yield f
+                f.flush()
+                os.fsync(f.fileno())
+        else:
+            with os.fdopen(fd, "wb") as raw:
+                with compressed.open_text(raw, "w", name=path) as f:
+                    yield f
+                raw.flush()
+                os.fsync(raw.fileno())
+        # mkstemp creates the file 0600; give it the original's mode, or the usual one for a new file
+        if not os.path.exists(path):
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp_path, 0o666 & ~umask)
+        replace_file(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+
+
+def replace_file(tmp_path, path):
+    """Rename a finished, fsynced tmp_path over path, keeping path's mode, and persist the rename."""
+    if os.path.exists(path):
+        shutil.copymode(path, tmp_path)
+    os.replace(tmp_path, path)
+    if os.name == "posix":
+        dir_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def add_io_arguments(parser, input_csv, output_csv):
+    """Add --input and -o/--output (defaulting to the script's usual paths) to an argparse parser.
+
+    Either may name a .gz, .bz2 or .xz file; see compressed.py.
+    """
+    parser.add_argument(
+        "--input", default=input_csv, help=f"WordPress Posts export CSV or WXR (XML) file (default {input_csv})"
+    )
+    parser.add_argument(
+        "-o", "--output", default=output_csv, help=f"CSV to write; .gz/.bz2/.xz is compressed (default {output_csv})"
+    )
+
+
+def add_parallel_arguments(parser):
+    """Add --workers and --chunk-size to an argparse parser."""
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="convert rows in N worker processes (0 = one per CPU, default 1 = no pool)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f"rows sent to a worker at a time (default {DEFAULT_CHUNK_SIZE})",
+    )
+
+
+def describe_post(post_id, title):
+    """Name a post in error messages: post ID 12 ('Title')."""
+    return f"post ID {(post_id or '').strip() or '?'} ({(title or '').strip()!r})"
+
+
+def list_row_describer(header):
+    """Return describe(row) for csv.reader rows of an export with the given header row."""
+    def column(row, name):
+        return row[header.index(name)] if name in header and header.index(name) < len(row) else ""
+
+    return lambda row: describe_post(column(row, "ID"), column(row, "Title"))
+
+
+def worker_count(workers):
+    """Resolve --workers: 0 (or less) means one per CPU."""
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _apply_to_chunk(func, chunk):
+    results = []
+    for index, row in enumerate(chunk):
+        try:
+            results.append(func(row))
+        except Exception as exc:
+            raise _ChunkError(index, f"{type(exc).__name__}: {exc}") from None
+    return results
+
+
+def _collect(chunk, future, describe):
+    try:
+        return future.result()
+    except _ChunkError as exc:
+        index, message = exc.args
+        raise RowError(f"{describe(chunk[index])}: {message}") from None
+
+
+def _guarded_worker(conn, func, scripts):
+    _load_scripts(scripts)
+    while True:
+        row = conn.recv()
+        if row is None:
+            return
+        try:
+            conn.send((True, func(row)))
+        except Exception as exc:
+            conn.send((False, f"{type(exc).__name__}: {exc}"))
+
+
+def _start_guarded_worker(func):
+    conn, child_conn = multiprocessing.Pipe()
+    process = multiprocessing.Process(
+        target=_guarded_worker, args=(child_conn, func, tuple(_loaded_scripts)), daemon=True
+    )
+    process.start()
+    child_conn.close()
+    return process, conn
+
+
+def _stop_guarded_worker(worker, kill=False):
+    process, conn = worker
+    if not kill:
+        try:
+            conn.send(None)
+        except OSError:
+            pass
+        process.join(1)
+    if process.is_alive():
+        process.kill()
+        process.join()
+    conn.close()
+
+
+def _map_rows_with_timeout(func, rows, workers, timeout, describe):
+    # Regex matching can't be interrupted from inside the process, so each row runs in a worker
+    # process that is killed (and replaced) when the row overruns its budget.
+    idle = [_start_guarded_worker(func) for _ in range(workers)]
+    busy = {}  # conn -> (worker, sequence number, row, deadline)
+    done = {}  # sequence number -> result, until every earlier row is done too
+    rows = iter(rows)
+    sent = 0
+    next_out = 0
+    exhausted = False
+    try:
+        while True:
+            while idle and not exhausted and sent - next_out < workers * 4:
+                row = next(rows, None)
+                if row is None:
+                    exhausted = True
+                    break
+                worker = idle.pop()
+                worker[1].send(row)
+                busy[worker[1]] = (worker, sent, row, time.monotonic() + timeout)
+                sent += 1
+            while next_out in done:
+                yield done.pop(next_out)
+                next_out += 1
+            if not busy:
+                if exhausted:
+                    return
+                continue
+
+            wait = max(0.0, min(entry[3] for entry in busy.values()) - time.monotonic())
+            for conn in multiprocessing.connection.wait(list(busy), timeout=wait):
+                worker, seq, row, _ = busy.pop(conn)
+                try:
+                    ok, value = conn.recv()
+                except EOFError:
+                    _stop_guarded_worker(worker, kill=True)
+                    raise RowError(f"{describe(row)}: worker process died") from None
+                if not ok:
+                    idle.append(worker)
+                    raise RowError(f"{describe(row)}: {value}")
+                done[seq] = value
+                idle.append(worker)
+            now = time.monotonic()
+            for conn, (worker, seq, row, deadline) in list(busy.items()):
+                if now >= deadline:
+                    del busy[conn]
+                    _stop_guarded_worker(worker, kill=True)
+                    done[seq] = TimedOut(row, timeout)
+                    idle.append(_start_guarded_worker(func))
+    finally:
+        for worker in idle + [entry[0] for entry in busy.values()]:
+            _stop_guarded_worker(worker, kill=worker not in idle)
+
+
+def map_rows(func, rows, workers=1, chunk_size=DEFAULT_CHUNK_SIZE, describe=repr, timeout=None):
+    """Yield func(row) for every row, in input order.
+
+    With workers > 1, rows are sent in chunks of chunk_size to a process pool; at most two chunks per
+    worker are in flight, so rows are still streamed rather than read up front. func must be a
+    module-level function. A failing row raises RowError naming it via describe(row).
+
+    With a timeout (seconds), each row runs in one of max(1, workers) worker processes and a row
+    still running after timeout seconds yields TimedOut(row, timeout) instead of a result.
+    """
+    if timeout:
+        yield from _map_rows_with_timeout(func, rows, max(1, workers), timeout, describe)
+        return
+    if workers <= 1:
+        for row in rows:
+            try:
+                yield func(row)
+            except Exception as exc:
+                raise RowError(f"{describe(row)}: {type(exc).__name__}: {exc}") from exc
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_load_scripts, initargs=(tuple(_loaded_scripts),)
+    ) as pool:
+        in_flight = deque()
+        try:
+            for chunk in _chunks(rows, max(1, chunk_size)):
+                in_flight.append((chunk, pool.submit(_apply_to_chunk, func, chunk)))
+                if len(in_flight) >= workers * 2:
+                    yield from _collect(*in_flight.popleft(), describe)
+            while in_flight:
+                yield from _collect(*in_flight.popleft(), describe)
+        except BaseException:
+            pool.shutdown(cancel_futures=True)
+            raise
+
+
+FIELD_COLUMNS = ("Content", "Excerpt")  # the HTML columns the cleaning scripts rewrite
+
+
+def _process_fields(row, process_field, columns):
+    if len(row) <= max(columns):
+        return row
+    for i in columns:
+        row[i] = process_field(row[i])
+    return row
+
+
+def rewrite_export_fields(argv, process_field, description, name, default_csv):
+    """main() of a cleaning script: apply process_field to the Content and Excerpt of every export row.
+
+    Rewrites csv_path in place (or to -o), with --workers, --resume and --checkpoint-every. process_field
+    must be module level (str -> str); name identifies the script in its checkpoint journal.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("csv_path", nargs="?", default=default_csv, help="export CSV to update in place")
+    parser.add_argument("-o", "--output", help="write the cleaned CSV here instead of updating csv_path in place")
+    add_parallel_arguments(parser)
+    checkpoint.add_checkpoint_arguments(parser)
+    args = parser.parse_args(argv)
+    input_path = os.path.normpath(args.csv_path)
+    output_path = os.path.normpath(args.output) if args.output else input_path
+
+    header = read_csv_header(input_path)
+    if not header:
+        print("No rows in CSV")
+        return
+    columns = column_indices(header, FIELD_COLUMNS)
+    if not columns:
+        print("CSV has no Content/Excerpt columns")
+        return
+
+    try:
+        journal = checkpoint.journal_for(args, input_path, output_path, {"script": name})
+    except checkpoint.ResumeError as exc:
+        sys.exit(str(exc))
+
+    # Stream rows into a temp file beside the output and rename it into place only once every row
+    # is written, so memory stays flat and an interrupted run leaves the original intact. A checkpointed
+    # run writes <output>.partial instead and keeps it, with its journal, for --resume.
+    try:
+        with contextlib.ExitStack() as stack:
+            if journal is None:
+                f_out = stack.enter_context(atomic_write(output_path))
+                reader = stack.enter_context(open_records(input_path))
+            else:
+                f_out = stack.enter_context(journal.write())
+                reader = journal.track(stack.enter_context(journal.open_input()))
+            writer = csv.writer(f_out)
+            if journal is None or not journal.resumed:
+                writer.writerow(header)
+            for row in map_rows(
+                functools.partial(_process_fields, process_field=process_field, columns=columns),
+                reader,
+                workers=worker_count(args.workers),
+                chunk_size=args.chunk_size,
+                describe=list_row_describer(header),
+            ):
+                writer.writerow(row)
+                if journal is not None:
+                    journal.row_done()
+    except RowError as exc:
+        sys.exit(f"Cleaning failed on {exc}")
+
+    print(f"Done. {'Updated' if output_path == input_path else 'Wrote'} {output_path}")
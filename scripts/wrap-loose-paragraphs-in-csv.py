@@ -1,16 +1,13 @@
 #!/usr/bin/env python3
 """Wrap loose text lines in <p> and collapse extra blank lines in Content/Excerpt of WordPress export CSV."""
-import csv
 import os
-import sys
+
+import wp_export
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
 DEFAULT_CSV = os.path.join(PROJECT_DIR, "Posts-Export-2026-February-03-0219.csv")
 
-CONTENT_COL = 2
-EXCERPT_COL = 3
-
 
 def process_field(text):
     """Wrap loose lines in <p>...</p> and collapse consecutive blank lines to one."""
@@ -45,35 +42,8 @@ def process_field(text):
     return joined
 
 
-def main():
-    input_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CSV
-    input_path = os.path.normpath(input_path)
-
-    with open(input_path, "r", encoding="utf-8", newline="") as f:
-        reader = csv.reader(f)
-        rows = list(reader)
-
-    if not rows:
-        print("No rows in CSV")
-        return
-
-    header = rows[0]
-    if len(header) <= max(CONTENT_COL, EXCERPT_COL):
-        print("CSV has no Content/Excerpt columns")
-        return
-
-    for i in range(1, len(rows)):
-        row = rows[i]
-        if len(row) <= max(CONTENT_COL, EXCERPT_COL):
-            continue
-        row[CONTENT_COL] = process_field(row[CONTENT_COL])
-        row[EXCERPT_COL] = process_field(row[EXCERPT_COL])
-
-    with open(input_path, "w", encoding="utf-8", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerows(rows)
-
-    print(f"Done. Updated {input_path}")
+def main(argv=None):
+    wp_export.rewrite_export_fields(argv, process_field, __doc__, "wrap-loose-paragraphs-in-csv", DEFAULT_CSV)
 
 
 if __name__ == "__main__":
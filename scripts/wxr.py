@@ -0,0 +1,160 @@
+"""Read posts from a WordPress WXR (Tools > Export) file as Posts-export-style rows.
+
+The XML is parsed incrementally with ElementTree.iterparse and each <item> is cleared once read, so
+memory stays bounded however large the export is. Featured images are resolved from attachment items
+in a first, equally streaming, pass that keeps only attachment ID -> URL.
+"""
+import xml.etree.ElementTree as ET
+
+import compressed
+
+CONTENT_NS = "http://purl.org/rss/1.0/modules/content/"
+WP_NS_PREFIX = "http://wordpress.org/export/"  # followed by the WXR version, e.g. 1.2/
+
+# Post statuses that are not real posts in the Posts export
+SKIPPED_STATUSES = {"trash", "auto-draft", "inherit"}
+
+
+def is_wxr(path):
+    """True if path looks like a WXR/XML file rather than a CSV export (either may be compressed)."""
+    if compressed.strip_suffix(path).lower().endswith((".xml", ".wxr")):
+        return True
+    with compressed.open_binary(path) as f:
+        start = f.read(256).lstrip(b"\xef\xbb\xbf \t\r\n")
+    return start.startswith((b"<?xml", b"<rss"))
+
+
+def _split(tag):
+    if tag.startswith("{"):
+        ns, _, name = tag[1:].partition("}")
+        return ns, name
+    return "", tag
+
+
+def _is_wp(ns):
+    return ns.startswith(WP_NS_PREFIX) and "excerpt" not in ns
+
+
+def _items(path, on_author=None):
+    """Yield each <item> element (complete), clearing it and the channel afterwards."""
+    channel = None
+    with compressed.open_binary(path) as f:
+        for event, elem in ET.iterparse(f, events=("start", "end")):
+            if event == "start":
+                if channel is None and elem.tag == "channel":
+                    channel = elem
+                continue
+            ns, name = _split(elem.tag)
+            if name == "item" and not ns:
+                yield elem
+            elif name == "author" and _is_wp(ns) and on_author is not None:
+                on_author(elem)
+            else:
+                continue
+            elem.clear()
+            if channel is not None:
+                channel.clear()
+
+
+def _child_text(elem, local):
+    for child in elem:
+        if _split(child.tag)[1] == local:
+            return child.text or ""
+    return ""
+
+
+def attachment_urls(path):
+    """Map attachment post ID -> attachment URL (first pass, for featured images)."""
+    urls = {}
+    for item in _items(path):
+        post_type = post_id = url = ""
+        for child in item:
+            ns, name = _split(child.tag)
+            if not _is_wp(ns):
+                continue
+            if name == "post_type":
+                post_type = child.text or ""
+            elif name == "post_id":
+                post_id = (child.text or "").strip()
+            elif name == "attachment_url":
+                url = (child.text or "").strip()
+        if post_type == "attachment" and post_id and url:
+            urls[post_id] = url
+    return urls
+
+
+def read_posts(path, featured_images=True):
+    """Yield one dict per post with the Posts export column names (ID, Title, Content, Excerpt, Date,
+    Post Type, Permalink, Image URL, Categories, Tags, Author ID/Username/First Name/Last Name, Slug, Status)."""
+    images = attachment_urls(path) if featured_images else {}
+    authors = {}  # login -> (id, first name, last name)
+
+    def on_author(elem):
+        login = _child_text(elem, "author_login")
+        authors[login] = (
+            _child_text(elem, "author_id"),
+            _child_text(elem, "author_first_name"),
+            _child_text(elem, "author_last_name"),
+        )
+
+    for item in _items(path, on_author):
+        post = {
+            "ID": "",
+            "Title": "",
+            "Content": "",
+            "Excerpt": "",
+            "Date": "",
+            "Post Type": "",
+            "Permalink": "",
+            "Slug": "",
+            "Status": "",
+        }
+        categories = []
+        tags = []
+        login = ""
+        thumbnail = ""
+        for child in item:
+            ns, name = _split(child.tag)
+            text = child.text or ""
+            if not ns:
+                if name == "title":
+                    post["Title"] = text
+                elif name == "link":
+                    post["Permalink"] = text
+                elif name == "category":
+                    if child.get("domain") == "category":
+                        categories.append(text)
+                    elif child.get("domain") == "post_tag":
+                        tags.append(text)
+            elif name == "encoded":
+                post["Content" if ns == CONTENT_NS else "Excerpt"] = text
+            elif name == "creator":
+                login = text
+            elif _is_wp(ns):
+                if name == "post_id":
+                    post["ID"] = text
+                elif name == "post_date":
+                    post["Date"] = text
+                elif name == "post_name":
+                    post["Slug"] = text
+                elif name == "status":
+                    post["Status"] = text
+                elif name == "post_type":
+                    post["Post Type"] = text
+                elif name == "postmeta" and _child_text(child, "meta_key") == "_thumbnail_id":
+                    thumbnail = _child_text(child, "meta_value").strip()
+        if post["Post Type"] != "post" or post["Status"] in SKIPPED_STATUSES:
+            continue
+        author_id, first, last = authors.get(login, ("", "", ""))
+        post.update(
+            {
+                "Image URL": images.get(thumbnail, ""),
+                "Categories": "|".join(categories),
+                "Tags": "|".join(tags),
+                "Author ID": author_id,
+                "Author Username": login,
+                "Author First Name": first,
+                "Author Last Name": last,
+            }
+        )
+        yield post